@@ -1,5 +1,6 @@
 import sqlite3
 import os
+import sys
 
 # --- PHIÊN BẢN ĐÃ SỬA LỖI - LUÔN TẠO FILE ĐÚNG CHỖ ---
 
@@ -85,6 +86,13 @@ CREATE TABLE IF NOT EXISTS group_tasks (
 )
 """)
 
+# 6. Đưa schema lên phiên bản mới nhất (cột bổ sung, chỉ mục) bằng migration chung
+logging.info("Đang áp dụng migration...")
+conn.commit()
+sys.path.insert(0, os.path.dirname(current_dir))
+from Managers.migrations import migrate
+migrate(conn)
+
 # Lưu các thay đổi và đóng kết nối
 conn.commit()
 conn.close()
@@ -1,83 +1,296 @@
 import os
+import json
+from collections import OrderedDict
 from pathlib import Path
-from PyQt5.QtGui import QPixmap, QPainter, QPainterPath, QPen, QColor
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QPainterPath, QPen, QColor
 from PyQt5.QtCore import Qt, QRectF
 import logging
 
+from config import AVATAR_CACHE_MAX_BYTES, AVATAR_THUMB_SIZES, AVATAR_MASTER_MAX_PX
+
+AVATAR_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+AVATAR_DIR = Path(__file__).resolve().parents[1] / 'assets' / 'avatars'
+THUMB_DIR = AVATAR_DIR / 'thumbs'
+MANIFEST_NAME = 'manifest.json'
+
+
+class AvatarThumbStore:
+    """Thumbnail PNG tròn (đã che và viền sẵn) của avatar theo các cỡ UI dùng.
+
+    File `thumbs/user_{id}_{size}.png` + `thumbs/manifest.json` ghi ảnh gốc
+    (tên file, mtime) mà mỗi thumbnail được tạo từ đó; thumbnail chỉ được dùng
+    khi ảnh gốc còn khớp, nên thay ảnh gốc bằng cách khác cũng không hiện ảnh cũ.
+    Thumbnail chỉ vài KB: lần tải đầu không phải giải mã và thu nhỏ ảnh gốc.
+    """
+
+    def __init__(self, directory=THUMB_DIR):
+        self.directory = Path(directory)
+        self._manifest = None
+
+    def load(self, user_id, size, source, source_mtime):
+        """QPixmap thumbnail còn hợp lệ của (user_id, size) hoặc None."""
+        entry = self._entries().get(str(user_id))
+        if not entry or entry.get('source') != source.name or entry.get('source_mtime_ns') != source_mtime:
+            return None
+        thumb = entry.get('sizes', {}).get(str(size))
+        if not thumb:
+            return None
+        pixmap = QPixmap(str(self.directory / thumb['file']))
+        return None if pixmap.isNull() else pixmap
+
+    def save(self, user_id, size, source, source_mtime, pixmap):
+        """Ghi thumbnail vừa render và cập nhật manifest."""
+        entries = self._entries()
+        entry = entries.get(str(user_id))
+        if not entry or entry.get('source') != source.name or entry.get('source_mtime_ns') != source_mtime:
+            self._remove_files(entry)
+            entry = entries[str(user_id)] = {'source': source.name, 'source_mtime_ns': source_mtime, 'sizes': {}}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f'user_{user_id}_{size}.png'
+            if not pixmap.save(str(self.directory / name), 'PNG'):
+                logging.warning('avatar_utils: không ghi được thumbnail %s', name)
+                return
+            entry['sizes'][str(size)] = {'file': name, 'bytes': (self.directory / name).stat().st_size}
+            self._write()
+        except OSError:
+            logging.exception('avatar_utils: lỗi ghi thumbnail user_id=%s size=%s', user_id, size)
+
+    def drop(self, user_id):
+        """Xóa mọi thumbnail của user_id (khi ảnh gốc bị thay)."""
+        entry = self._entries().pop(str(user_id), None)
+        if entry is not None:
+            self._remove_files(entry)
+            self._write()
+
+    def _remove_files(self, entry):
+        for thumb in (entry or {}).get('sizes', {}).values():
+            try:
+                (self.directory / thumb['file']).unlink()
+            except OSError:
+                pass
+
+    def _entries(self):
+        if self._manifest is None:
+            try:
+                with open(self.directory / MANIFEST_NAME, encoding='utf-8') as f:
+                    self._manifest = json.load(f).get('users', {})
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def _write(self):
+        path = self.directory / MANIFEST_NAME
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'users': self._manifest}, f, indent=2)
+        os.replace(tmp, path)
+
+
+class AvatarCache:
+    """LRU QPixmap avatar tròn, khóa (user_id, size, mtime file), giới hạn theo byte.
+
+    Đường dẫn file của mỗi user (kể cả "không có avatar") cũng được nhớ để không
+    phải dò lần lượt các đuôi file ở mỗi lần gọi; mỗi lần lấy chỉ còn một os.stat
+    để biết file có bị thay (mtime đổi) hay không. Khi ứng dụng tự thay avatar
+    (MainWindow._on_avatar_changed) phải gọi invalidate(user_id).
+    Chỉ dùng trên GUI thread (QPixmap).
+    """
+
+    def __init__(self, max_bytes=AVATAR_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._pixmaps = OrderedDict()   # (user_id, size, mtime_ns) -> QPixmap
+        self._paths = {}                # user_id -> Path | None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, size):
+        path = self._avatar_path(user_id)
+        if path is None:
+            return None
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            # file vừa bị xóa/đổi tên: dò lại ở lần gọi này
+            self._paths.pop(user_id, None)
+            path = self._avatar_path(user_id)
+            if path is None:
+                return None
+            mtime = path.stat().st_mtime_ns
+        key = (user_id, size, mtime)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+        pixmap = _thumbs.load(user_id, size, path, mtime)
+        if pixmap is None:
+            pixmap = _render_circular(QPixmap(str(path)), size)
+            if pixmap is None:
+                return None
+            # avatar có từ trước (chưa qua ingest_avatar): tạo thumbnail cho lần sau
+            if size in AVATAR_THUMB_SIZES:
+                _thumbs.save(user_id, size, path, mtime, pixmap)
+        self._drop_user(user_id, size)  # bản của mtime cũ (file đã bị thay)
+        self._pixmaps[key] = pixmap
+        self.current_bytes += _pixmap_bytes(pixmap)
+        while self.current_bytes > self.max_bytes and len(self._pixmaps) > 1:
+            _key, old = self._pixmaps.popitem(last=False)
+            self.current_bytes -= _pixmap_bytes(old)
+        return pixmap
+
+    def invalidate(self, user_id=None):
+        """Bỏ avatar đã cache của user_id (None = toàn bộ)."""
+        if user_id is None:
+            self._pixmaps.clear()
+            self._paths.clear()
+            self.current_bytes = 0
+            return
+        self._paths.pop(user_id, None)
+        self._drop_user(user_id)
+
+    def stats(self):
+        return {'size': len(self._pixmaps), 'bytes': self.current_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+    def _drop_user(self, user_id, size=None):
+        for key in [k for k in self._pixmaps if k[0] == user_id and (size is None or k[1] == size)]:
+            self.current_bytes -= _pixmap_bytes(self._pixmaps.pop(key))
+
+    def _avatar_path(self, user_id):
+        if user_id in self._paths:
+            return self._paths[user_id]
+        found = None
+        if AVATAR_DIR.exists():
+            for ext in AVATAR_EXTENSIONS:
+                p = AVATAR_DIR / f'user_{user_id}{ext}'
+                if p.exists():
+                    found = p
+                    break
+        if not found:
+            logging.debug('avatar_utils: no avatar file found for user_id=%s in %s', user_id, str(AVATAR_DIR))
+        self._paths[user_id] = found
+        return found
+
+
+def _pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+
+def _render_circular(src, size):
+    """Cắt QPixmap src vừa hình vuông `size` và che tròn (kèm viền trắng mờ)."""
+    if src.isNull():
+        return None
+    target = QPixmap(size, size)
+    target.fill(Qt.transparent)
+    painter = QPainter(target)
+    painter.setRenderHint(QPainter.Antialiasing)
+    rect = QRectF(0.0, 0.0, float(size), float(size))
+    clip = QPainterPath()
+    clip.addEllipse(rect)
+    painter.setClipPath(clip)
+    src_scaled = src.scaled(size, size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+    sx = (src_scaled.width() - size) // 2
+    sy = (src_scaled.height() - size) // 2
+    painter.drawPixmap(-sx, -sy, src_scaled)
+    pen = QPen(QColor(255, 255, 255, 200))
+    # viền 2px ở cỡ danh sách (44), 3px ở cỡ SidePanel (120)
+    pen.setWidth(max(2, size // 40))
+    painter.setPen(pen)
+    painter.setBrush(Qt.NoBrush)
+    painter.drawEllipse(rect.adjusted(1.0, 1.0, -1.0, -1.0))
+    painter.end()
+    return target
+
+
+# Cache và kho thumbnail dùng chung cho cả tiến trình
+_cache = AvatarCache()
+_thumbs = AvatarThumbStore()
+
+
+def ingest_avatar(user_id, src_path, sizes=AVATAR_THUMB_SIZES):
+    """Lưu ảnh người dùng chọn làm avatar của user_id; trả về Path ảnh gốc đã lưu.
+
+    Ảnh được thu nhỏ về cạnh dài AVATAR_MASTER_MAX_PX (ảnh chụp nhiều MB không
+    bị chép nguyên), thay mọi file user_{id}.* cũ, rồi tạo sẵn thumbnail tròn
+    cho từng cỡ trong `sizes`. Ném OSError/ValueError nếu không đọc/ghi được.
+    """
+    image = QImage(str(src_path))
+    if image.isNull():
+        raise ValueError(f"Không đọc được ảnh: {src_path}")
+    if max(image.width(), image.height()) > AVATAR_MASTER_MAX_PX:
+        image = image.scaled(AVATAR_MASTER_MAX_PX, AVATAR_MASTER_MAX_PX, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+    for old in AVATAR_DIR.glob(f'user_{user_id}.*'):
+        old.unlink()
+    _thumbs.drop(user_id)
+    # giữ alpha nếu có, còn lại JPEG cho nhỏ gọn
+    dest = AVATAR_DIR / (f'user_{user_id}.png' if image.hasAlphaChannel() else f'user_{user_id}.jpg')
+    if not image.save(str(dest), 'PNG' if dest.suffix == '.png' else 'JPEG', -1 if dest.suffix == '.png' else 90):
+        raise OSError(f"Không ghi được {dest}")
+    _cache.invalidate(user_id)
+
+    source = QPixmap.fromImage(image)
+    mtime = dest.stat().st_mtime_ns
+    for size in sizes:
+        pixmap = _render_circular(source, size)
+        if pixmap is not None:
+            _thumbs.save(user_id, size, dest, mtime, pixmap)
+    return dest
+
+
+def avatar_cache():
+    return _cache
+
+
+def invalidate_avatar(user_id=None):
+    """Gọi sau khi file avatar của user_id bị thay/xóa (None = mọi user)."""
+    _cache.invalidate(user_id)
+
+
 def load_avatar_pixmap(user_id, size=44):
     """Trả về QPixmap dạng tròn cho `user_id` nếu tồn tại file avatar.
 
     Tìm trong `src/assets/avatars` các file có tên `user_{id}.[png|jpg|jpeg|bmp]`.
     Trả về QPixmap kích thước `size` x `size`, hoặc `None` nếu không tìm thấy file hoặc tải thất bại.
+    Kết quả lấy từ AvatarCache nên các lần gọi lặp lại không giải mã lại ảnh.
     """
     try:
-        base = Path(__file__).resolve().parents[1]  # points to src/
-        avatar_dir = base / 'assets' / 'avatars'
-        # trỏ tới thư mục chứa ảnh đại diện
-        if not avatar_dir.exists():
-            return None
-        found = None
-        for ext in ('.png', '.jpg', '.jpeg', '.bmp'):
-            p = avatar_dir / f'user_{user_id}{ext}'
-            if p.exists():
-                found = p
-                break
-        if not found:
-            logging.debug('avatar_utils: no avatar file found for user_id=%s in %s', user_id, str(avatar_dir))
-            return None
-        src = QPixmap(str(found))
-        if src.isNull():
-            return None
-        target = QPixmap(size, size)
-        target.fill(Qt.transparent)
-        painter = QPainter(target)
-        painter.setRenderHint(QPainter.Antialiasing)
-        rect = QRectF(0.0, 0.0, float(size), float(size))
-        path = QPainterPath()
-        path.addEllipse(rect)
-        painter.setClipPath(path)
-        src_scaled = src.scaled(size, size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-        sx = (src_scaled.width() - size) // 2
-        sy = (src_scaled.height() - size) // 2
-        painter.drawPixmap(-sx, -sy, src_scaled)
-        pen = QPen(QColor(255, 255, 255, 200))
-        pen.setWidth(2)
-        painter.setPen(pen)
-        painter.setBrush(Qt.NoBrush)
-        painter.drawEllipse(rect.adjusted(1.0, 1.0, -1.0, -1.0))
-        painter.end()
-        return target
+        return _cache.get(user_id, size)
     except Exception:
         logging.exception('avatar_utils: failed to load avatar for user_id=%s', user_id)
         return None
 
 
-def load_avatar_for_task(task_data: dict, db=None, size=44):
-    """Cố gắng tải QPixmap avatar cho task được cung cấp dưới dạng dict.
+def load_avatar_for_task(task, db=None, size=44):
+    """Cố gắng tải QPixmap avatar cho người được giao một task (TaskRecord).
 
     Thứ tự ưu tiên:
-      1) sử dụng `task_data['assignee_id']` nếu có
-      2) nếu không có và `db` được cung cấp, cố gắng ánh xạ `task_data['assignee_name']` -> user_id qua DB
+      1) sử dụng `task.assignee_id` nếu có
+      2) nếu không có và `db` được cung cấp, cố gắng ánh xạ `task.assignee_name` -> user_id qua DB
     Trả về QPixmap hoặc `None`.
     Cũng ghi log các đường dẫn ứng viên để hỗ trợ gỡ lỗi.
     """
     try:
         assignee_id = None
-        if task_data is None:
+        if task is None:
             return None
-        assignee_id = task_data.get('assignee_id')
-        if not assignee_id and db and task_data.get('assignee_name'):
+        assignee_id = task.assignee_id
+        if not assignee_id and db and task.assignee_name:
             try:
-                assignee_id = db.get_user_id_by_name(task_data.get('assignee_name'))
-                logging.debug('avatar_utils: resolved assignee_name=%s -> id=%s', task_data.get('assignee_name'), assignee_id)
+                assignee_id = db.get_user_id_by_name(task.assignee_name)
+                logging.debug('avatar_utils: resolved assignee_name=%s -> id=%s', task.assignee_name, assignee_id)
             except Exception:
-                logging.exception('avatar_utils: DB lookup failed for name=%s', task_data.get('assignee_name'))
+                logging.exception('avatar_utils: DB lookup failed for name=%s', task.assignee_name)
         if assignee_id:
             pix = load_avatar_pixmap(assignee_id, size=size)
             if pix:
                 logging.debug('avatar_utils: loaded avatar for assignee_id=%s', assignee_id)
                 return pix
-        logging.debug('avatar_utils: no avatar available for task_data=%s', task_data)
+        logging.debug('avatar_utils: no avatar available for task=%r', task)
         return None
     except Exception:
         logging.exception('avatar_utils: unexpected error in load_avatar_for_task')
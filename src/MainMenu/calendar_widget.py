@@ -4,14 +4,21 @@ import calendar
 from datetime import datetime, timedelta
 import os
 import logging
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QGridLayout
-from PyQt5.QtGui import QFontDatabase, QFont, QGuiApplication
+import time
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDialog,
+                             QDialogButtonBox, QMessageBox)
+from PyQt5.QtGui import QFontDatabase, QFont
 from PyQt5.QtCore import Qt
-from MainMenu.components import DayWidget, TaskBadge
+from MainMenu.components import AddTaskDialog, DayDetailDialog, TaskDetailItemWidget
+from MainMenu.month_view import MonthGridView
 from Managers.database_manager import Database
+from Managers.db_worker import get_db_worker
+from Managers.task_records import TaskRecord, group_by_day
+from Managers.task_repository import TaskRepository
+from MainMenu.month_cache import MonthTaskCache
 from config import (
     CALENDAR_BG_GRADIENT_START, CALENDAR_BG_GRADIENT_END, CALENDAR_MONTH_PILL_START, 
-    CALENDAR_MONTH_PILL_END, FONT_PATH
+    CALENDAR_MONTH_PILL_END, FONT_PATH, MONTH_CACHE_SIZE
 )
 
 calendar.setfirstweekday(calendar.SUNDAY)
@@ -24,14 +31,26 @@ VIETNAMESE_MONTHS = [
 class CalendarWidget(QWidget):
     """Widget lịch tháng.
 
-    Hiển thị lưới ngày cho tháng hiện tại, chứa các `DayWidget` và `TaskBadge`.
+    Hiển thị lưới ngày cho tháng hiện tại bằng một `MonthGridView` (vẽ bằng QPainter).
     Hỗ trợ hai chế độ xem: 'personal' (công việc cá nhân) và 'group' (công việc nhóm).
     """
-    def __init__(self, user_id, db=None, parent=None):
+    def __init__(self, user_id, db=None, parent=None, repository=None):
         super().__init__(parent)
         self.user_id = user_id
         self.db = Database()
-            
+        # Ghi task qua repository; lịch (và các view khác) cập nhật theo tín hiệu của nó
+        self.repo = repository or TaskRepository(self.db, self)
+        self.repo.task_added.connect(self.apply_task_inserted)
+        self.repo.task_updated.connect(self._on_task_updated)
+        self.repo.task_deleted.connect(self.apply_task_deleted)
+        # Dữ liệu tháng được tải ở worker nền để không chặn GUI thread
+        self.db_worker = get_db_worker()
+        self._month_request = None
+        self._month_request_key = None
+        # tasks_by_day theo (chế độ, user/group, 'YYYY-MM'); tháng trước/sau được prefetch
+        self.month_cache = MonthTaskCache(MONTH_CACHE_SIZE)
+        self._prefetch_requests = {}
+
         self.current_date = datetime.now()
         
         # [MỚI] Thêm trạng thái để biết đang xem lịch cá nhân hay nhóm
@@ -102,15 +121,19 @@ class CalendarWidget(QWidget):
         header_layout.addStretch()
         self.main_layout.addLayout(header_layout)
 
-        # calendar grid
-        self.grid_layout = QGridLayout()
-        self.grid_layout.setSpacing(14)
-        self.main_layout.addLayout(self.grid_layout)
+        # calendar grid: một widget vẽ toàn bộ ô ngày và task
+        self.month_view = MonthGridView()
+        self.month_view.day_clicked.connect(self.open_day_detail)
+        self.month_view.task_toggle_requested.connect(self.toggle_task)
+        self.month_view.task_activated.connect(self.open_task_detail)
+        self.month_view.task_delete_requested.connect(self._delete_task_from_view)
+        self.month_view.add_task_requested.connect(self.prompt_new_task)
+        self.main_layout.addWidget(self.month_view, 1)
 
     def _get_current_group_id(self):
         """Trả về group id hiện tại nếu đã thiết lập; nếu chưa, cố gắng tìm nhóm cho người dùng.
 
-        Hàm này được DayWidget sử dụng khi thêm công việc nhóm từ ô lịch.
+        Hàm này được prompt_new_task sử dụng khi thêm công việc nhóm từ ô lịch.
         """
         if self.current_group_id:
             return self.current_group_id
@@ -147,315 +170,146 @@ class CalendarWidget(QWidget):
         except Exception:
             return []
 
-    def _parse_iso_datetime(self, s: str):
-        """Cố gắng parse nhiều dạng chuỗi datetime kiểu ISO sang đối tượng datetime.
-
-        Hỗ trợ các định dạng như:
-            - 2025-10-06 05:24:08
-            - 2025-10-06T05:24:08Z
-            - 2025-10-06
-        Trả về datetime hoặc None nếu không parse được.
-        """
-        if not s:
-            return None
-        if isinstance(s, datetime):
-            return s
-        s = str(s)
-        # try fromisoformat with Z -> +00:00 replacement
-        try:
-            if s.endswith('Z'):
-                return datetime.fromisoformat(s.replace('Z', '+00:00'))
-            return datetime.fromisoformat(s)
-        except Exception:
-            pass
-        # replace T with space and strip Z
-        try:
-            s2 = s.replace('T', ' ').rstrip('Z')
-            try:
-                return datetime.strptime(s2, '%Y-%m-%d %H:%M:%S')
-            except Exception:
-                return datetime.strptime(s2, '%Y-%m-%d')
-        except Exception:
-            return None
+    def task_for_id(self, task_id):
+        """TaskRecord đang hiển thị trên lưới với task_id (kể cả task gộp trong "+N"), hoặc None."""
+        return self.month_view.task(task_id)
 
-    # setup_week_headers and clear_calendar are implemented later in this file
-    # to keep a single canonical implementation (see below).
-                
-    def populate_calendar(self, tasks_by_day=None):
+    def populate_calendar(self):
         """
             Vẽ lại toàn bộ lịch cho tháng hiện tại (lưu trong self.current_date).
-            Args:
-                tasks_by_day (dict): Dictionary với key là ngày (int) và value là list các task tuple
+            Dữ liệu lấy từ cache, hoặc gửi truy vấn qua _request_month_tasks nếu chưa có.
         """
-        self.clear_calendar() # Xóa lịch cũ
-        self.setup_week_headers() # Vẽ lại tiêu đề tuần (vì cũng bị xóa ở trên)
-        
         month_name = VIETNAMESE_MONTHS[self.current_date.month - 1]
         self.month_label.setText(f"{month_name} {self.current_date.year}")
-        calendar.setfirstweekday(calendar.SUNDAY)
-        month_calendar = calendar.monthcalendar(self.current_date.year, self.current_date.month)
-        
-
-        # Duyệt qua từng tuần và từng ngày để tạo DayWidget
-        today = datetime.now()
-
-
-        for week_num, week_data in enumerate(month_calendar):
-            for day_num, day_data in enumerate(week_data):
-                if day_data != 0:
-                    day_widget = DayWidget(str(day_data), self.current_date.year, self.current_date.month, calendar_ref=self)
-                    self.grid_layout.addWidget(day_widget, week_num + 1, day_num)
-
-                    if(self.current_date.year == today.year and
-                       self.current_date.month == today.month and
-                       day_data == today.day):
-                        day_widget.set_today_highlight(True)
-                        day_widget.is_today = True
-
-                    # Thêm widget ngày vào lưới tại đúng vị trí hàng (tuần) và cột (thứ)
-                    # (đã thêm ở trên)
-        
-        # Nếu caller truyền sẵn tasks_by_day thì dùng nó (tránh fetch 2 lần).
-        # Ngược lại widget sẽ tự fetch từ DB theo current_view_mode.
-        for i in range(1, self.grid_layout.rowCount()): # Bắt đầu từ hàng 1 để bỏ qua header
-            self.grid_layout.setRowStretch(i, 1)
-        for i in range(self.grid_layout.columnCount()):
-            self.grid_layout.setColumnStretch(i, 1)
-        if tasks_by_day:
-            tasks = tasks_by_day
-        else:
-            if self.current_view_mode == 'personal':
-                tasks = self._fetch_personal_tasks_for_month()
-            else:
-                tasks = self._fetch_group_tasks_for_month()
-
-        if tasks:
-            self._display_tasks(tasks)
-        # Enforce column widths so calendar doesn't expand based on content: divide available width by 7
-        try:
-            # determine available width: prefer parent window width if available
-            parent_win = self.window()
-            screen = QGuiApplication.primaryScreen()
-            screen_w = screen.availableGeometry().width() if screen else 1920
-            side_w = 300
-            try:
-                if parent_win and hasattr(parent_win, 'side_panel'):
-                    side_w = parent_win.side_panel.frameGeometry().width()
-            except Exception:
-                side_w = side_w
-            try:
-                parent_w = parent_win.frameGeometry().width() if parent_win else screen_w
-            except Exception:
-                parent_w = screen_w
-            avail = max(600, min(parent_w - side_w - 80, screen_w - side_w - 80))
-            # compute per-day cell width
-            cell_w = max(100, avail // 7)
-            # apply column minimum and fix each DayWidget width
-            for c in range(self.grid_layout.columnCount()):
-                try:
-                    self.grid_layout.setColumnMinimumWidth(c, cell_w)
-                except Exception:
-                    pass
-            for row in range(1, self.grid_layout.rowCount()):
-                for col in range(self.grid_layout.columnCount()):
-                    item = self.grid_layout.itemAtPosition(row, col)
-                    if item and item.widget() is not None:
-                        try:
-                            w = item.widget()
-                            w.setMinimumWidth(cell_w)
-                            w.setMaximumWidth(cell_w)
-                            w.setFixedWidth(cell_w)
-                        except Exception:
-                            pass
-        except Exception:
-            pass
-        
+        self.month_view.set_month(self.current_date.year, self.current_date.month)
+
+        key = self._month_key()
+        tasks_by_day = self.month_cache.get(key)
+        if tasks_by_day is not None:
+            self.db_worker.cancel(self._month_request)
+            self._month_request = None
+            if tasks_by_day:
+                self._display_tasks(tasks_by_day)
+        elif not (self._month_request_key == key and self.db_worker.is_pending(self._month_request)):
+            # chưa có truy vấn nào đang chờ cho đúng tháng này thì mới gửi
+            self.db_worker.cancel(self._month_request)
+            self._request_month_tasks()
+        self._prefetch_adjacent_months()
+
+    def _track_month(self, tasks_by_day):
+        """Thay record trong tasks_by_day bằng bản dùng chung của repository (tại chỗ)."""
+        for day, tasks in tasks_by_day.items():
+            tasks_by_day[day] = self.repo.track(tasks, full=False)
+        return tasks_by_day
 
-    def add_tasks_from_data(self, tasks_by_day):
-        """
-            Thêm tasks từ dữ liệu thực tế vào lịch.
-            Args:
-                tasks_by_day (dict): Dictionary với key là ngày (int) và value là list các task tuple
+    def _month_key(self, month_date=None):
+        """Khóa cache của tháng month_date (mặc định tháng đang xem) ở chế độ hiện tại."""
+        month_date = month_date or self.current_date
+        owner = self.user_id if self.current_view_mode == 'personal' else self.current_group_id
+        return (self.current_view_mode, owner, month_date.strftime('%Y-%m'))
+
+    def _month_fetch(self, key):
+        """(hàm, args) để tải tháng của key trên worker."""
+        mode, owner, month_str = key
+        if mode == 'personal':
+            return self._fetch_personal_tasks_for_month, (month_str,)
+        return self._fetch_group_tasks_for_month, (month_str, owner)
+
+    def _request_month_tasks(self):
+        """Gửi truy vấn task của tháng đang xem sang worker; hiển thị khi có kết quả.
+
+        Khóa cache chụp lúc gửi cũng dùng để bỏ qua kết quả nếu người dùng đã
+        chuyển sang tháng/chế độ khác trước khi truy vấn xong; generation chụp
+        lúc gửi cho biết kết quả đã cũ (có ghi xen giữa) để tải lại.
         """
-        # Duyệt qua các ô trong lưới để tìm DayWidget tương ứng và thêm task
-        # Keep a per-day set of seen tasks to avoid duplicates
-        seen = {}
-        for row in range(1, self.grid_layout.rowCount()):
-            for col in range(self.grid_layout.columnCount()):
-                item = self.grid_layout.itemAtPosition(row, col)
-                if item and isinstance(item.widget(), DayWidget):
-                    day_widget = item.widget()
-                    day = int(day_widget.date_label.text()) # Lấy số ngày từ label
-                    if day in tasks_by_day:
-                        # ensure previous tasks (if any) are cleared before adding
-                        try:
-                            day_widget.clear_tasks()
-                        except Exception:
-                            pass
-                        if day not in seen:
-                            seen[day] = set()
-                        for task_data in tasks_by_day[day]:
-                            # normalize various forms (dict or tuple) into fields
-                            t = None
-                            if isinstance(task_data, dict):
-                                t = {
-                                    'task_id': task_data.get('task_id'),
-                                    'title': task_data.get('title'),
-                                    'is_done': task_data.get('is_done', False),
-                                    'note': task_data.get('note', ''),
-                                    'due_at': task_data.get('due_at'),
-                                    'assignee_name': task_data.get('assignee_name') or ''
-                                }
-                            else:
-                                # support tuple shapes like (task_id, title, is_done, note, due_at)
-                                try:
-                                    if len(task_data) >= 5:
-                                        t = {
-                                            'task_id': task_data[0],
-                                            'title': task_data[1],
-                                            'is_done': bool(task_data[2]),
-                                            'note': task_data[3],
-                                            'due_at': task_data[4],
-                                            'assignee_name': ''
-                                        }
-                                    else:
-                                        # fallback to (title, is_done, note)
-                                        title, is_done_val, note_text = task_data
-                                        t = {'task_id': None, 'title': title, 'is_done': bool(is_done_val), 'note': note_text, 'due_at': None, 'assignee_name': ''}
-                                except Exception:
-                                    continue
-
-                            title = t['title']
-                            is_done = t['is_done']
-                            note_text = t.get('note', '')
-                            due_at = t.get('due_at')
-                            assignee_name = t.get('assignee_name', '')
-                    
-                            is_group_flag = bool(t.get('is_group')) or (self.current_view_mode != 'personal') or bool(assignee_name)
-                          
-                            assignee_display = assignee_name if assignee_name else ('Chưa phân công' if is_group_flag else '')
-                            key = ('id', t['task_id']) if t.get('task_id') else (title, due_at, assignee_display)
-                            if key in seen[day]:
-                                continue
-                            seen[day].add(key)
-                   
-                            if is_group_flag:
-                                badge = TaskBadge(title, color='#5c6bc0', note=note_text, assignee_name=assignee_display, parent=None, task_id=t.get('task_id'), is_group=True, calendar_ref=self, due_at=due_at)
-
-                                try:
-                                    badge.assignee_id = t.get('assignee_id')
-                                except Exception:
-                                    pass
-                                try:
-                                    # set checked state without emitting toggled signal to avoid recursion
-                                    badge.checkbox.blockSignals(True)
-                                    badge.checkbox.setChecked(bool(is_done))
-                                    badge.checkbox.setText('\u2713' if bool(is_done) else '')
-                                    badge.checkbox.blockSignals(False)
-                                except Exception:
-                                    pass
-                                if is_done:
-                                    badge.setStyleSheet("background: #bdbdbd; border-radius: 12px; padding: 4px;")
-                                    badge.label.setStyleSheet('color:#fff; text-decoration: line-through; font-size:11px;')
-                                day_widget.add_task(badge)
-                            else:
-                                badge = TaskBadge(title, color='#66bb6a', note=note_text, parent=None, task_id=t.get('task_id'), is_group=False, calendar_ref=self, due_at=due_at)
-                                try:
-                                    badge.assignee_id = t.get('assignee_id')
-                                except Exception:
-                                    pass
-                                try:
-                                    badge.checkbox.setChecked(bool(is_done))
-                                except Exception:
-                                    pass
-                                if is_done:
-                                    badge.setStyleSheet("background: #bdbdbd; border-radius: 12px; padding: 4px;")
-                                    badge.label.setStyleSheet('color:#fff; text-decoration: line-through; font-size:11px;')
-                                day_widget.add_task(badge)
-
-    def _fetch_personal_tasks_for_month(self):
+        key = self._month_key()
+        generation = self.month_cache.generation
+        fetch, args = self._month_fetch(key)
+
+        def on_result(tasks):
+            self._month_request = None
+            self._track_month(tasks)
+            fresh = self.month_cache.put(key, tasks, generation)
+            if self._month_key() != key:
+                return
+            if not fresh:
+                # có thêm/sửa/xóa task trong lúc truy vấn chạy: kết quả đã cũ, tải lại
+                self._request_month_tasks()
+            elif tasks:
+                self._display_tasks(tasks)
+
+        self._month_request_key = key
+        self._month_request = self.db_worker.submit(fetch, *args, on_result=on_result)
+
+    def _prefetch_adjacent_months(self):
+        """Tải sẵn tháng trước và tháng sau vào cache (chạy sau truy vấn tháng hiện tại)."""
+        first = self.current_date.replace(day=1)
+        days_in_month = calendar.monthrange(first.year, first.month)[1]
+        for month_date in (first - timedelta(days=1), first + timedelta(days=days_in_month)):
+            key = self._month_key(month_date)
+            if key in self.month_cache or key in self._prefetch_requests:
+                continue
+            generation = self.month_cache.generation
+            fetch, args = self._month_fetch(key)
+
+            def on_result(tasks, key=key, generation=generation):
+                self._prefetch_requests.pop(key, None)
+                self._track_month(tasks)
+                self.month_cache.put(key, tasks, generation)
+
+            self._prefetch_requests[key] = self.db_worker.submit(
+                fetch, *args, on_result=on_result,
+                on_error=lambda _e, key=key: self._prefetch_requests.pop(key, None))
+
+    def _fetch_personal_tasks_for_month(self, month_str=None, day_str=None):
         # Đổi tên hàm cũ _fetch_tasks_for_month thành _fetch_personal_tasks_for_month
-        # Logic bên trong giữ nguyên
-        tasks_by_day = {}
-        month_str = self.current_date.strftime('%Y-%m')
+        # month_str được truyền vào khi chạy trên worker thread (không đọc self.current_date)
+        # day_str ('YYYY-MM-DD') chỉ lấy một ngày, dùng khi làm mới một ô
+        month_str = month_str or self.current_date.strftime('%Y-%m')
         try:
-            all_tasks = self.db.get_tasks_for_user_month(self.user_id, month_str)
-            # all_tasks: list of tuples (task_id, title, is_done, note, due_at)
-            for task in all_tasks:
-                task_id, title, is_done_int, note, due_at_str = task
-                if due_at_str:
-                    dt = self._parse_iso_datetime(due_at_str)
-                    if not dt:
-                        continue
-                    day = dt.day
-                    if day not in tasks_by_day:
-                        tasks_by_day[day] = []
-                    tasks_by_day[day].append({
-                        'task_id': task_id,
-                        'title': title,
-                        'is_done': bool(is_done_int),
-                        'note': note,
-                        'due_at': due_at_str,
-                        'assignee_id': None,
-                        'assignee_name': None,
-                    })
+            if day_str:
+                all_tasks = self.db.get_tasks_for_user_day(self.user_id, day_str)
+            else:
+                all_tasks = self.db.get_tasks_for_user_month(self.user_id, month_str)
             # Note: Personal view only shows personal tasks (not group tasks).
             # Group tasks assigned to the user are shown in group view when appropriate.
+            return group_by_day(TaskRecord.from_month_row(row) for row in all_tasks)
         except Exception as e:
             logging.exception("Lỗi khi lấy task cá nhân")
-        return tasks_by_day
+        return {}
 
     # [MỚI] Hàm để lấy task của nhóm
-    def _fetch_group_tasks_for_month(self):
-        tasks_by_day = {}
-        month_str = self.current_date.strftime('%Y-%m')
+    def _fetch_group_tasks_for_month(self, month_str=None, group_id=None, day_str=None):
+        month_str = month_str or self.current_date.strftime('%Y-%m')
         try:
-            # Prefer explicit current_group_id if set; otherwise find first group for user
-            group_id = self.current_group_id
+            # Prefer explicit group id (snapshot from caller) or current_group_id; otherwise find first group for user
+            group_id = group_id or self.current_group_id
             if not group_id:
                 groups = self.db.get_groups_for_user(self.user_id)
                 if not groups:
                     return {}
                 group_id = groups[0][0]
 
-            all_tasks = self.db.get_group_tasks_for_month(group_id, month_str)
-            # all_tasks: list of tuples (task_id, group_id, assignee_id, title, note, is_done, due_at)
+            if day_str:
+                all_tasks = self.db.get_group_tasks_for_day_with_assignee(group_id, day_str)
+            else:
+                all_tasks = self.db.get_group_tasks_for_month_with_assignee(group_id, month_str)
+            # all_tasks: list of tuples (task_id, group_id, assignee_id, title, note, is_done, due_at, assignee_name)
             # Determine whether current user is leader of this group
             try:
                 leader_id = self.db.get_group_leader(group_id)
             except Exception:
                 leader_id = None
 
-            for task_data in all_tasks:
-                task_id, g_group_id, assignee_id, title, note, is_done_int, due_at_str = task_data
-                # If current user is not leader, only include tasks assigned to this user
-                if leader_id is None or self.user_id != leader_id:
-                    if assignee_id is None or assignee_id != self.user_id:
-                        continue
-                if due_at_str:
-                    dt = self._parse_iso_datetime(due_at_str)
-                    if not dt:
-                        continue
-                    day = dt.day
-                    try:
-                        assignee_name = self.db.get_user_name(assignee_id) if assignee_id else ''
-                    except Exception:
-                        assignee_name = ''
-                    if day not in tasks_by_day:
-                        tasks_by_day[day] = []
-                    tasks_by_day[day].append({
-                        'task_id': task_id,
-                        'title': title,
-                        'is_done': bool(is_done_int),
-                        'note': note,
-                        'due_at': due_at_str,
-                        'assignee_id': assignee_id,
-                        'assignee_name': assignee_name,
-                    })
+            tasks = [TaskRecord.from_group_row(row) for row in all_tasks]
+            # If current user is not leader, only include tasks assigned to this user
+            if leader_id is None or self.user_id != leader_id:
+                tasks = [t for t in tasks if t.assignee_id == self.user_id]
+            return group_by_day(tasks)
         except Exception as e:
             logging.exception("Lỗi khi lấy task nhóm")
-        return tasks_by_day
-    
+        return {}
+
     def _get_user_name(self, user_id):
         if not user_id:
             return "Chưa giao"
@@ -469,99 +323,11 @@ class CalendarWidget(QWidget):
 
     # [THAY ĐỔI] Sửa lại để xử lý cấu trúc dữ liệu mới (có thêm assignee_name)
     def _display_tasks(self, tasks):
-        # Dedupe per day to prevent duplicate renderings
-        seen = {}
-        for row in range(1, self.grid_layout.rowCount()):
-            for col in range(self.grid_layout.columnCount()):
-                item = self.grid_layout.itemAtPosition(row, col)
-                if item and isinstance(item.widget(), DayWidget):
-                    day_widget = item.widget()
-                    try:
-                        day_text = day_widget.date_label.text().strip()
-                        if not day_text:
-                            continue
-                        day_from_widget = int(day_text)
-                        if day_from_widget in tasks:
-                            # clear existing tasks before populating
-                            try:
-                                day_widget.clear_tasks()
-                            except Exception:
-                                pass
-                            if day_from_widget not in seen:
-                                seen[day_from_widget] = set()
-                            for task_data in tasks[day_from_widget]:
-                                # normalize
-                                t = None
-                                if isinstance(task_data, dict):
-                                    t = {
-                                        'task_id': task_data.get('task_id'),
-                                        'title': task_data.get('title'),
-                                        'is_done': task_data.get('is_done', False),
-                                        'note': task_data.get('note', ''),
-                                        'due_at': task_data.get('due_at'),
-                                        'assignee_name': task_data.get('assignee_name') or ''
-                                    }
-                                else:
-                                    try:
-                                        if len(task_data) >= 5:
-                                            t = {
-                                                'task_id': task_data[0],
-                                                'title': task_data[1],
-                                                'is_done': bool(task_data[2]),
-                                                'note': task_data[3],
-                                                'due_at': task_data[4],
-                                                'assignee_name': ''
-                                            }
-                                        else:
-                                            title, is_done_val, note_text = task_data
-                                            t = {'task_id': None, 'title': title, 'is_done': bool(is_done_val), 'note': note_text, 'due_at': None, 'assignee_name': ''}
-                                    except Exception:
-                                        continue
-
-                                title = t['title']
-                                is_done = t['is_done']
-                                note = t.get('note', '')
-                                due_at = t.get('due_at')
-                                assignee_name = t.get('assignee_name', '')
-                                key = ('id', t['task_id']) if t.get('task_id') else (title, due_at, assignee_name)
-
-                                if key in seen[day_from_widget]:
-                                    continue
-                                seen[day_from_widget].add(key)
-
-                                # Use visual TaskBadge inside calendar tiles; keep TaskWidget for detail dialogs
-                                color = '#66bb6a' if not assignee_name else '#5c6bc0'
-                                badge = TaskBadge(title, color=color, note=note, assignee_name=assignee_name, task_id=t.get('task_id'), is_group=bool(assignee_name), calendar_ref=self, due_at=due_at)
-                                # ensure badge checkbox matches DB state and apply done style (block signals while doing so)
-                                try:
-                                    badge.checkbox.blockSignals(True)
-                                    badge.checkbox.setChecked(bool(is_done))
-                                    badge.checkbox.setText('✓' if bool(is_done) else '')
-                                    badge.checkbox.blockSignals(False)
-                                except Exception:
-                                    pass
-                                if is_done:
-                                    badge.setStyleSheet("background: #bdbdbd; border-radius: 12px; padding: 4px;")
-                                    badge.label.setStyleSheet('color:#fff; text-decoration: line-through; font-size:11px;')
-                                day_widget.add_task(badge)
-                    except Exception as e:
-                        logging.exception("Lỗi khi hiển thị task")
-                        
-    def clear_calendar(self):
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-
-    def setup_week_headers(self):
-        days = ["Chủ Nhật", "Thứ Hai", "Thứ Ba", "Thứ Tư", "Thứ Năm", "Thứ Sáu", "Thứ Bảy"]
-        for i, day in enumerate(days):
-            label = QLabel(day)
-            label.setObjectName("WeekDayLabel")
-            label.setAlignment(Qt.AlignCenter)
-            label.setStyleSheet('color: #02457a; font-weight:700; background: qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #bfe9ff, stop:1 #e6f7ff); padding:8px; border-radius:6px;')
-            self.grid_layout.addWidget(label, 0, i)
+        """Hiển thị task của từng ngày có trong `tasks` (các ngày khác giữ nguyên)."""
+        try:
+            self.month_view.set_tasks(tasks)
+        except Exception:
+            logging.exception("Lỗi khi hiển thị task")
 
     def prev_month(self):
         self.current_date = self.current_date.replace(day=1) - timedelta(days=1)
@@ -574,7 +340,7 @@ class CalendarWidget(QWidget):
 
     def add_task_to_db(self, date_obj, task_desc, note_text="", estimated_minutes=None, priority=4):
         """
-        Nhận tín hiệu từ DayWidget để thêm công việc cá nhân vào database.
+        Được prompt_new_task gọi để thêm công việc cá nhân vào database.
         """
         try:
             # Chuyển đổi đối tượng datetime thành chuỗi 'YYYY-MM-DD HH:MM:SS'
@@ -583,16 +349,9 @@ class CalendarWidget(QWidget):
             except Exception:
                 # fallback for date-only
                 due_date_str = date_obj.strftime('%Y-%m-%d')
-            # Use the richer API which supports estimate/priority; keep defaults
-            # add_task is a compatibility wrapper but call add_task_with_meta to be explicit
-            try:
-                self.db.add_task_with_meta(self.user_id, task_desc, note_text, 0, due_date_str, estimated_minutes=estimated_minutes, priority=priority)
-            except Exception:
-                # fallback to wrapper
-                self.db.add_task(self.user_id, task_desc, note_text, 0, due_date_str)
-            
-            # Sau khi thêm thành công, vẽ lại lịch để hiển thị công việc mới
-            self.populate_calendar()
+            # task mới vào đúng ô của nó (và vào trang chủ) qua tín hiệu task_added
+            self.repo.add_personal_task(self.user_id, task_desc, note_text, due_date_str,
+                                        estimated_minutes=estimated_minutes, priority=priority)
             logging.info(f"Đã thêm công việc cá nhân thành công: '{task_desc}' vào ngày {due_date_str}")
 
         except Exception as e:
@@ -601,31 +360,8 @@ class CalendarWidget(QWidget):
     def open_day_detail(self, day: int):
         """Open DayDetailDialog for the given day (uses self.current_date year/month)."""
         try:
-            from MainMenu.components import DayDetailDialog
-            # build tasks_data for that day by scanning current grid
-            tasks_data = []
-            for row in range(1, self.grid_layout.rowCount()):
-                for col in range(self.grid_layout.columnCount()):
-                    item = self.grid_layout.itemAtPosition(row, col)
-                    if item and isinstance(item.widget(), DayWidget):
-                        day_widget = item.widget()
-                        if int(day_widget.date_label.text()) == day:
-                            # extract child widgets
-                            for i in range(day_widget.tasks_layout.count()):
-                                w = day_widget.tasks_layout.itemAt(i).widget()
-                                if not w:
-                                    continue
-                                # try to normalize
-                                if hasattr(w, 'task_id'):
-                                            title = w.text() if hasattr(w, 'text') else getattr(w, 'label', lambda: '')()
-                                            is_done = getattr(w, 'checkbox', None) and getattr(w.checkbox, 'isChecked', lambda: False)()
-                                            note = getattr(w, 'note', '')
-                                            assignee = getattr(w, 'assignee_name', None)
-                                            # attempt to read assignee_id from the badge/widget (added by calendar when available)
-                                            assignee_id = getattr(w, 'assignee_id', None)
-                                            tasks_data.append({'title': title, 'is_done': is_done, 'note': note, 'assignee_name': assignee, 'assignee_id': assignee_id, 'task_id': getattr(w, 'task_id', None), 'is_group': getattr(w, 'is_group', False)})
-                            break
-            # open dialog
+            # gồm cả task bị gộp sau "+N"
+            tasks_data = self.month_view.day_tasks(day)
             full_date = datetime(self.current_date.year, self.current_date.month, day)
 
             dialog = DayDetailDialog(full_date, tasks_data, calendar_ref=self)
@@ -633,9 +369,84 @@ class CalendarWidget(QWidget):
         except Exception as e:
             logging.exception("Lỗi khi mở chi tiết ngày")
 
+    def open_task_detail(self, task):
+        """Double-click một task trên lưới: hộp thoại chi tiết của riêng task đó."""
+        try:
+            dlg = QDialog(self)
+            dlg.setWindowTitle('Chi tiết công việc')
+            dlg.setMinimumWidth(420)
+            layout = QVBoxLayout(dlg)
+            layout.addWidget(TaskDetailItemWidget(task, calendar_ref=self))
+            buttons = QDialogButtonBox(QDialogButtonBox.Close)
+            buttons.rejected.connect(dlg.reject)
+            layout.addWidget(buttons)
+            dlg.exec_()
+        except Exception:
+            logging.exception("Lỗi khi mở chi tiết công việc")
+
+    def prompt_new_task(self, day: int):
+        """Context menu "Thêm công việc mới" trên một ô: hỏi thông tin rồi thêm vào DB."""
+        group_mode = self.current_view_mode == 'group'
+        if group_mode:
+            # KIỂM TRA QUYỀN TRƯỚC KHI LÀM BẤT CỨ ĐIỀU GÌ
+            # (current_group_leader_id có thể chưa có nếu chưa gọi set_group_context)
+            try:
+                leader_id = self.current_group_leader_id
+                if leader_id is None:
+                    grp = self._get_current_group_id()
+                    if grp:
+                        leader_id = self.current_group_leader_id = self.db.get_group_leader(grp)
+            except Exception:
+                leader_id = None
+            if leader_id is None or self.user_id != leader_id:
+                QMessageBox.warning(self, "Không có quyền", "Chỉ trưởng nhóm mới có thể thêm công việc.")
+                return
+
+        default_date = datetime(self.current_date.year, self.current_date.month, day)
+        try:
+            members = (self._get_current_group_members() or []) if group_mode else None
+        except Exception:
+            members = []
+        dialog = AddTaskDialog(parent=self, default_date=default_date, members=members,
+                               mode='group' if group_mode else 'personal')
+
+        # Nếu người dùng nhấn "Thêm" và có nhập tiêu đề
+        if dialog.exec_() == QDialog.Accepted and dialog.title():
+            due_datetime_obj = dialog.due_datetime().toPyDateTime()
+            if group_mode:
+                try:
+                    assignee_id = dialog.assignee()
+                except Exception:
+                    assignee_id = None
+                self.add_group_task_to_db(due_datetime_obj, dialog.title(), assignee_id=assignee_id if assignee_id else None, note_text=dialog.note())
+            else:
+                self.add_task_to_db(due_datetime_obj, dialog.title(), note_text=dialog.note(),
+                                    estimated_minutes=dialog.estimated_minutes(), priority=dialog.priority())
+
+    def toggle_task(self, task):
+        """Click ô check của một task: kiểm tra hạn chót và quyền rồi đổi trạng thái xong/chưa xong."""
+        task_id, is_group = task.task_id, task.is_group
+        if task.due_epoch is not None and task.due_epoch < time.time():
+            QMessageBox.warning(self, "Không thể thay đổi", "Không thể thay đổi trạng thái công việc đã quá hạn.")
+            return
+        try:
+            allowed, msg = self.can_toggle_task(task_id, is_group)
+        except Exception:
+            allowed, msg = False, 'Lỗi kiểm tra quyền.'
+        if not allowed:
+            QMessageBox.warning(self, 'Không có quyền', msg)
+            return
+        # update_task_status cập nhật cache và vẽ lại đúng ô chứa task
+        if not self.update_task_status(task_id, 0 if task.is_done else 1, is_group):
+            QMessageBox.warning(self, 'Lỗi', 'Không thể cập nhật trạng thái lên server.')
+
+    def _delete_task_from_view(self, task):
+        if not self.delete_task(task.task_id, task.is_group):
+            QMessageBox.warning(self, 'Lỗi', 'Không thể xóa nhiệm vụ (không có quyền hoặc lỗi).')
+
     def add_group_task_to_db(self, date_obj, task_desc, assignee_id=None, note_text=""):
         """
-        Nhận tín hiệu từ DayWidget để thêm công việc nhóm vào database.
+        Được prompt_new_task gọi để thêm công việc nhóm vào database.
         """
         try:
             try:
@@ -652,11 +463,10 @@ class CalendarWidget(QWidget):
                 except Exception:
                     logging.debug("Không thể lấy leader của nhóm trước khi thêm task")
 
-                # db.add_group_task(group_id, creator_id, title, note="", is_done=0, due_at=None, assignee_id=None)
                 # For group tasks we intentionally do not pass estimate/priority - group area does not use them
-                self.db.add_group_task(group_id, self.user_id, task_desc, note_text, 0, due_date_str, assignee_id)
-                # refresh calendar so new task appears with correct group styling
-                self.populate_calendar()
+                # new task appears with correct group styling (via task_added), without reloading the month
+                self.repo.add_group_task(group_id, self.user_id, task_desc, note_text, due_date_str, assignee_id,
+                                         assignee_name=self._get_user_name(assignee_id) if assignee_id else None)
                 logging.info(f"Đã giao công việc nhóm thành công: '{task_desc}' cho user_id {assignee_id}")
             else:
                 logging.warning(f"Người dùng {self.user_id} không thuộc nhóm nào.")
@@ -678,11 +488,12 @@ class CalendarWidget(QWidget):
                     # Caller will show the appropriate message; just return failure here
                     logging.warning(f"User {self.user_id} attempted to delete group task {task_id} but is not leader")
                     return False
-                self.db.delete_group_task(task_id)
+                self.repo.delete(task_id, is_group=True)
             else:
-                # Only owner may delete personal task
+                # Only owner may delete personal task (task trên lịch cá nhân luôn là task của user)
                 try:
-                    data = self.db.get_task_by_id(task_id)
+                    shown = self.month_view.task(task_id)
+                    data = None if shown is not None and not shown.is_group else self.db.get_task_by_id(task_id)
                     if data:
                         owner_id = data[1]
                         if owner_id != self.user_id:
@@ -690,9 +501,8 @@ class CalendarWidget(QWidget):
                             return False
                 except Exception:
                     pass
-                self.db.delete_task(task_id)
-            # refresh
-            self.populate_calendar()
+                self.repo.delete(task_id)
+            # task được gỡ khỏi đúng ô của nó qua tín hiệu task_deleted
             logging.info(f"Đã xóa task id={task_id} group={is_group}")
             return True
         except Exception as e:
@@ -701,18 +511,14 @@ class CalendarWidget(QWidget):
     def update_task_status(self, task_id: int, is_done: int, is_group: bool = False):
         """Update the is_done status for a personal or group task.
 
-        This is called by TaskWidget when the user toggles the checkbox.
-        We persist the change. Caller may refresh specific day via refresh_day(day) to avoid full redraw.
+        This is called by toggle_task when the user clicks a task's check box.
+        We persist the change and apply it to the cached month and the month view.
         """
         try:
             if not task_id:
                 return
-            if is_group:
-                # group tasks table
-                self.db.update_group_task_status(task_id, is_done)
-            else:
-                self.db.update_task_status(task_id, is_done)
-            # Do not call populate_calendar here to avoid full redraw; caller should call refresh_day(day)
+            # cache và ô của task được cập nhật tại chỗ qua tín hiệu task_updated, không truy vấn lại
+            self.repo.set_done(task_id, bool(is_done), is_group)
             logging.info(f"Cập nhật trạng thái task id={task_id} group={is_group} -> is_done={is_done}")
             return True
         except Exception as e:
@@ -722,26 +528,66 @@ class CalendarWidget(QWidget):
     def refresh_day(self, day: int):
         """Refresh widgets for a single day (day = 1..31) without re-rendering whole calendar.
 
-        This fetches tasks for the current month and updates only the targeted DayWidget.
+        Dùng dữ liệu tháng trong cache nếu có; nếu không chỉ truy vấn đúng ngày đó.
         """
         try:
-            # collect tasks for the month then pick the single day
-            if self.current_view_mode == 'personal':
-                tasks = self._fetch_personal_tasks_for_month()
-            else:
-                tasks = self._fetch_group_tasks_for_month()
-
-            tasks_for_day = {}
-            if isinstance(tasks, dict) and day in tasks:
-                tasks_for_day[day] = tasks[day]
-            else:
-                tasks_for_day[day] = []
-
-            # delegate to _display_tasks which handles clearing/adding for days present in dict
-            self._display_tasks(tasks_for_day)
+            tasks = self.month_cache.peek(self._month_key())
+            if tasks is None:
+                day_str = self.current_date.replace(day=day).strftime('%Y-%m-%d')
+                fetch, args = self._month_fetch(self._month_key())
+                tasks = self._track_month(fetch(*args, day_str=day_str))
+            self._refresh_cell(day, tasks.get(day, []))
         except Exception as e:
             logging.exception(f"Lỗi khi refresh day {day}")
 
+    def _refresh_cell(self, day, day_tasks):
+        self.month_view.set_day_tasks(day, day_tasks)
+
+    def _mode_for(self, is_group):
+        return 'group' if is_group else 'personal'
+
+    def apply_task_inserted(self, task):
+        """TaskRepository.task_added: cập nhật tháng của task trong cache và ô ngày của nó.
+
+        Task có thể thuộc chế độ xem khác chế độ đang mở (ví dụ thêm từ trang chủ).
+        Không truy vấn lại tháng; nếu tháng đang xem còn đang tải thì gửi lại truy vấn tháng.
+        """
+        dt = task.due_datetime
+        if dt is None:
+            return  # task không có hạn chót không hiện trên lịch
+        if task.is_group:
+            # thành viên thường chỉ thấy task được giao cho mình
+            leader_id = self.current_group_leader_id if task.group_id == self.current_group_id else None
+            if leader_id is not None and leader_id != self.user_id and task.assignee_id != self.user_id:
+                return
+            key = ('group', task.group_id, dt.strftime('%Y-%m'))
+        else:
+            key = ('personal', self.user_id, dt.strftime('%Y-%m'))
+        tasks_by_day = self.month_cache.add_task(key, dt.day, task)
+        if key != self._month_key():
+            return
+        if tasks_by_day is None or self.db_worker.is_pending(self._month_request):
+            self.populate_calendar()
+            return
+        self._refresh_cell(dt.day, tasks_by_day.get(dt.day, []))
+
+    def _on_task_updated(self, task):
+        self.apply_task_toggled(task.task_id, task.is_done, task.is_group)
+
+    def apply_task_deleted(self, task_id, is_group=False):
+        """Gỡ task_id khỏi cache và khỏi ô đang hiển thị nó."""
+        self.month_cache.remove_task(self._mode_for(is_group), task_id)
+        shown = self.month_view.task(task_id)
+        if shown is not None and shown.is_group == bool(is_group):
+            self.refresh_day(self.month_view.day_of_task(task_id))
+
+    def apply_task_toggled(self, task_id, is_done, is_group=False):
+        """Cập nhật trạng thái xong/chưa xong của task_id trong cache và trên lưới (chỉ vẽ lại ô của nó)."""
+        self.month_cache.update_task(self._mode_for(is_group), task_id, is_done=bool(is_done))
+        shown = self.month_view.task(task_id)
+        if shown is not None and shown.is_group == bool(is_group):
+            self.month_view.set_task_done(task_id, is_done)
+
     def can_toggle_task(self, task_id: int, is_group: bool = False) -> tuple:
         """Check whether the current user is allowed to toggle the given task.
 
@@ -750,6 +596,16 @@ class CalendarWidget(QWidget):
         For personal tasks: only task owner can toggle.
         """
         try:
+            # task đang hiển thị đã có đủ dữ liệu: lịch cá nhân chỉ chứa task của chính user,
+            # lịch nhóm cần leader (đã cache) hoặc assignee của task
+            shown = self.month_view.task(task_id)
+            if shown is not None and shown.is_group == bool(is_group):
+                if not is_group:
+                    return True, ""
+                if self.current_group_leader_id is not None:
+                    if self.user_id == self.current_group_leader_id or shown.assignee_id == self.user_id:
+                        return True, ""
+                    return False, "Bạn không có quyền thay đổi trạng thái công việc này."
             if is_group:
                 data = self.db.get_group_task_by_id(task_id)
                 if not data:
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+    Biểu đồ thống kê vẽ bằng QPainter: donut, thanh xếp chồng và sparkline.
+
+    Các hàm paint_* vẽ thẳng lên một QPainter trong một QRectF cho trước nên vừa
+    dùng được trong paintEvent của widget, vừa dùng được khi xuất ra QImage.
+    Không cần matplotlib trên đường hiển thị; matplotlib chỉ được import khi
+    người dùng xuất biểu đồ (export_chart) và vẫn có đường dự phòng nếu thiếu.
+"""
+import logging
+
+from PyQt5.QtWidgets import QWidget, QMenu, QFileDialog, QSizePolicy
+from PyQt5.QtCore import Qt, QRectF, QPointF, QSize
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QFontMetrics, QPainterPath, QImage
+
+STATUS_LABELS = ['Hoàn thành', 'Quá hạn', 'Chưa tới hạn']
+# Xanh lá (hoàn thành), Đỏ (quá hạn), Vàng (sắp tới)
+STATUS_COLORS = ['#2ecc71', '#e74c3c', '#f1c40f']
+
+COLOR_EMPTY = "#e0e0e0"
+COLOR_TEXT = "#2E3A4B"
+COLOR_TEXT_MUTED = "#8FA0B3"
+COLOR_SPARKLINE = "#4A90E2"
+
+DONUT_HOLE = 0.58           # bán kính lỗ / bán kính ngoài
+LEGEND_ROW_HEIGHT = 22
+LEGEND_SWATCH = 12
+EXPORT_SIZE = QSize(500, 500)
+
+
+def _font(point_size, bold=False):
+    font = QFont()
+    font.setPointSizeF(point_size)
+    font.setBold(bold)
+    return font
+
+
+def paint_donut(painter, rect, values, colors=STATUS_COLORS, labels=STATUS_LABELS, hole=DONUT_HOLE):
+    """Donut các phần values (bắt đầu từ 12 giờ, theo chiều kim đồng hồ) + chú thích bên dưới.
+
+    Giữa donut ghi tỉ lệ phần đầu tiên (hoàn thành); tổng bằng 0 thì vẽ vòng xám
+    và dòng "Không có công việc".
+    """
+    total = sum(values)
+    legend_height = LEGEND_ROW_HEIGHT * len(labels) if labels else 0
+    side = min(rect.width(), rect.height() - legend_height - 8)
+    if side <= 0:
+        return
+    outer = QRectF(rect.center().x() - side / 2, rect.top(), side, side)
+    inner_side = side * hole
+    inner = QRectF(outer.center().x() - inner_side / 2, outer.center().y() - inner_side / 2,
+                   inner_side, inner_side)
+
+    painter.save()
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    if total <= 0:
+        ring = QPainterPath()
+        ring.addEllipse(outer)
+        ring.addEllipse(inner)
+        painter.setBrush(QColor(COLOR_EMPTY))
+        painter.drawPath(ring)
+        painter.setPen(QColor(COLOR_TEXT_MUTED))
+        painter.setFont(_font(10))
+        painter.drawText(outer, Qt.AlignCenter, "Không có công việc")
+    else:
+        start = 90.0
+        for value, color in zip(values, colors):
+            if value <= 0:
+                continue
+            span = -360.0 * value / total
+            slice_path = QPainterPath()
+            slice_path.arcMoveTo(outer, start)
+            slice_path.arcTo(outer, start, span)
+            slice_path.arcTo(inner, start + span, -span)
+            slice_path.closeSubpath()
+            painter.setBrush(QColor(color))
+            painter.drawPath(slice_path)
+            start += span
+        painter.setPen(QColor(COLOR_TEXT))
+        painter.setFont(_font(max(9.0, side / 14), bold=True))
+        painter.drawText(inner, Qt.AlignCenter, f"{values[0] / total * 100:.0f}%")
+
+    if labels:
+        painter.setFont(_font(9.5))
+        metrics = QFontMetrics(painter.font())
+        text_width = max(metrics.horizontalAdvance(f"{label}: {value}") for label, value in zip(labels, values))
+        block_width = LEGEND_SWATCH + 8 + text_width
+        x = rect.center().x() - block_width / 2
+        y = outer.bottom() + 8
+        for label, value, color in zip(labels, values, colors):
+            row = QRectF(x, y, block_width, LEGEND_ROW_HEIGHT)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(QRectF(row.left(), row.center().y() - LEGEND_SWATCH / 2,
+                                           LEGEND_SWATCH, LEGEND_SWATCH), 3, 3)
+            painter.setPen(QColor(COLOR_TEXT))
+            painter.drawText(row.adjusted(LEGEND_SWATCH + 8, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter,
+                             f"{label}: {value}")
+            y += LEGEND_ROW_HEIGHT
+    painter.restore()
+
+
+def paint_stacked_bar(painter, rect, values, colors=STATUS_COLORS, radius=4):
+    """Một thanh ngang chia theo tỉ lệ values; tổng bằng 0 thì vẽ thanh xám."""
+    total = sum(values)
+    painter.save()
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    clip = QPainterPath()
+    clip.addRoundedRect(rect, radius, radius)
+    painter.setClipPath(clip)
+    painter.fillRect(rect, QColor(COLOR_EMPTY))
+    if total > 0:
+        x = rect.left()
+        for value, color in zip(values, colors):
+            if value <= 0:
+                continue
+            width = rect.width() * value / total
+            painter.fillRect(QRectF(x, rect.top(), width, rect.height()), QColor(color))
+            x += width
+    painter.restore()
+
+
+def paint_sparkline(painter, rect, points, color=COLOR_SPARKLINE):
+    """Đường xu hướng của points (các giá trị cách đều), tô nhạt phần dưới đường."""
+    if len(points) < 2 or rect.width() <= 0:
+        return
+    peak = max(points) or 1
+    step = rect.width() / (len(points) - 1)
+    # chừa 1px trên/dưới để nét vẽ không bị cắt
+    usable = rect.height() - 2
+    coords = [QPointF(rect.left() + i * step, rect.bottom() - 1 - usable * value / peak)
+              for i, value in enumerate(points)]
+
+    line = QPainterPath(coords[0])
+    for point in coords[1:]:
+        line.lineTo(point)
+    area = QPainterPath(line)
+    area.lineTo(rect.right(), rect.bottom())
+    area.lineTo(rect.left(), rect.bottom())
+    area.closeSubpath()
+
+    base = QColor(color)
+    fill = QColor(base)
+    fill.setAlpha(50)
+    painter.save()
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(fill)
+    painter.drawPath(area)
+    painter.setPen(QPen(base, 1.6))
+    painter.setBrush(Qt.NoBrush)
+    painter.drawPath(line)
+    painter.setBrush(base)
+    painter.setPen(Qt.NoPen)
+    painter.drawEllipse(coords[-1], 2.5, 2.5)
+    painter.restore()
+
+
+class _ChartWidget(QWidget):
+    """Cơ sở cho các widget biểu đồ: giữ values, vẽ lại khi đổi."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._values = ()
+
+    def set_values(self, values):
+        values = tuple(values)
+        if values == self._values:
+            return
+        self._values = values
+        self.update()
+
+    def values(self):
+        return self._values
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.paint_chart(painter, QRectF(self.rect()))
+        painter.end()
+
+    def paint_chart(self, painter, rect):
+        """Lớp con vẽ biểu đồ vào rect; lớp cơ sở không vẽ gì."""
+
+
+class DonutChart(_ChartWidget):
+    """Donut hoàn thành / quá hạn / chưa tới hạn; chuột phải để xuất ảnh."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title = ""
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def sizeHint(self):
+        return QSize(360, 360)
+
+    def minimumSizeHint(self):
+        return QSize(120, 120 + LEGEND_ROW_HEIGHT * len(STATUS_LABELS))
+
+    def paint_chart(self, painter, rect):
+        if self._values:
+            paint_donut(painter, rect.adjusted(8, 8, -8, -8), self._values)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        export_action = menu.addAction("Lưu biểu đồ...")
+        if menu.exec_(event.globalPos()) is not export_action:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Lưu biểu đồ", f"{self.title or 'thong_ke'}.png",
+                                              "Ảnh PNG (*.png);;SVG (*.svg);;PDF (*.pdf)")
+        if path:
+            export_chart(self._values, path, title=self.title)
+
+
+class StackedBarChart(_ChartWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(12)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def paint_chart(self, painter, rect):
+        if self._values:
+            paint_stacked_bar(painter, rect, self._values)
+
+
+class Sparkline(_ChartWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(36)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def paint_chart(self, painter, rect):
+        paint_sparkline(painter, rect.adjusted(2, 2, -4, -2), self._values)
+
+
+def export_chart(values, path, title=""):
+    """Xuất donut ra file; trả về True nếu thành công.
+
+    Dùng matplotlib (import lúc gọi) để có ảnh vector SVG/PDF; nếu máy không có
+    matplotlib thì vẽ bằng QPainter ra PNG.
+    """
+    try:
+        return _export_with_matplotlib(values, path, title)
+    except ImportError:
+        logging.info("[CHART EXPORT] không có matplotlib, xuất PNG bằng QPainter")
+    except Exception:
+        logging.exception("[CHART EXPORT] matplotlib lỗi, xuất PNG bằng QPainter")
+    if not path.lower().endswith(".png"):
+        path = path.rsplit(".", 1)[0] + ".png"
+    image = QImage(EXPORT_SIZE, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    paint_donut(painter, QRectF(16, 16, EXPORT_SIZE.width() - 32, EXPORT_SIZE.height() - 32), values)
+    painter.end()
+    return image.save(path)
+
+
+def _export_with_matplotlib(values, path, title):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(5, 5))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    if sum(values) > 0:
+        ax.pie(values, labels=STATUS_LABELS, colors=STATUS_COLORS, autopct='%1.1f%%', startangle=90,
+               counterclock=False, pctdistance=(1 + DONUT_HOLE) / 2, wedgeprops={'width': 1 - DONUT_HOLE},
+               textprops={'fontsize': 11})
+    else:
+        ax.text(0.5, 0.5, 'Không có công việc', ha='center', va='center', color='gray')
+        ax.axis('off')
+    ax.axis('equal')
+    if title:
+        ax.set_title(title)
+    figure.tight_layout()
+    figure.savefig(path)
+    return True
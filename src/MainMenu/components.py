@@ -6,11 +6,11 @@ from datetime import datetime
 from PyQt5.QtWidgets import (QDialog, QFrame, QHBoxLayout, QCheckBox, QLabel, QVBoxLayout,
                             QMenu, QStyle, QPushButton,
                              QScrollArea, QWidget, QLineEdit, QDateTimeEdit, QTextEdit, QDialogButtonBox, QMessageBox,
-                             QGraphicsDropShadowEffect, QGraphicsOpacityEffect, QComboBox, QAction, QCalendarWidget, QTimeEdit)
-from PyQt5.QtCore import Qt, QDateTime, QPropertyAnimation, QEasingCurve
+                             QGraphicsDropShadowEffect, QComboBox, QAction, QCalendarWidget, QTimeEdit)
+from PyQt5.QtCore import Qt, QDateTime
 from PyQt5.QtGui import QCursor, QFont, QColor, QFontMetrics, QIcon
 from MainMenu.avatar_utils import load_avatar_pixmap, load_avatar_for_task
-from config import TEXT_MUTED,  COLOR_TEXT_PRIMARY, ACCENT_GROUP, ACCENT_PERSONAL, FONT_UI, PRIORITY_COLORS, ICON_DIR, COLOR_SUCCESS, COLOR_PRIMARY_BLUE
+from config import TEXT_MUTED,  COLOR_TEXT_PRIMARY, ACCENT_GROUP, ACCENT_PERSONAL, FONT_UI, PRIORITY_COLORS, ICON_DIR, COLOR_SUCCESS, COLOR_PRIMARY_BLUE, AVATAR_LIST_SIZE
 
 # Thiết lập ngôn ngữ Tiếng Việt để hiển thị đúng Thứ trong tuần
 try:
@@ -33,38 +33,33 @@ class TaskDetailItemWidget(QFrame):
 
     Hiển thị: tiêu đề, trạng thái, người được phân công, ngày hết hạn, ghi chú và hành động xóa.
     """
-    def __init__(self, task_data: dict, calendar_ref=None, parent=None):
+    def __init__(self, task, calendar_ref=None, parent=None):
         super().__init__(parent)
         self.setObjectName("TaskDetailItem")
         self.setFrameShape(QFrame.StyledPanel)
         self.calendar_ref = calendar_ref
 
-        # normalize
-        title = task_data.get('title') or ''
-        is_done = bool(task_data.get('is_done', False))
-        note_text = task_data.get('note') or ''
-        assignee = task_data.get('assignee_name') or ''
-        due_at = task_data.get('due_at') or ''
-        task_id = task_data.get('task_id')
-        is_group = bool(task_data.get('is_group', False))
+        # task: TaskRecord (Managers.task_records)
+        title = task.title
+        is_done = task.is_done
+        note_text = task.note
+        assignee = task.assignee_name or ''
+        due_at = task.due_at or ''
+        task_id = task.task_id
+        is_group = task.is_group
 
     # Thử lấy dữ liệu estimate/priority mới nhất từ DB khi có thể (chỉ cho công việc cá nhân)
-        priority_val = task_data.get('priority')
-        estimate_minutes = task_data.get('estimate_minutes') or task_data.get('estimated_minutes') or task_data.get('estimate')
+        # task của lịch tháng không kèm estimate/priority: lấy từ DB (chỉ task cá nhân)
+        priority_val = task.priority
+        estimate_minutes = task.estimated_minutes
         try:
             # Only query personal tasks from tasks table. Group tasks have different storage and should not be queried here.
-            if not is_group and (priority_val is None or estimate_minutes is None) and self.calendar_ref and hasattr(self.calendar_ref, 'db') and task_id:
+            if not is_group and estimate_minutes is None and self.calendar_ref and hasattr(self.calendar_ref, 'db') and task_id:
                 row = self.calendar_ref.db.get_task_by_id(task_id)
-                # Dòng trả về kỳ vọng có dạng (task_id, user_id, title, note, is_done, due_at, estimate_minutes, priority)
-                if row:
-                    # defensive mapping by length
-                    try:
-                        estimate_minutes = estimate_minutes or row[6]
-                        priority_val = priority_val if priority_val is not None else row[7]
-                    except Exception:
-                        if len(row) >= 8:
-                            estimate_minutes = estimate_minutes or row[6]
-                            priority_val = priority_val if priority_val is not None else row[7]
+                # Dòng trả về có dạng (task_id, user_id, title, note, is_done, due_at, estimate_minutes, priority)
+                if row and len(row) >= 8:
+                    estimate_minutes = row[6]
+                    priority_val = row[7] if row[7] is not None else priority_val
         except Exception:
             pass
 
@@ -87,7 +82,7 @@ class TaskDetailItemWidget(QFrame):
 
         # Avatar / accent block — use shared helper to load circular avatar pixmap
         avatar = QLabel()
-        avatar.setFixedSize(44, 44)
+        avatar.setFixedSize(AVATAR_LIST_SIZE, AVATAR_LIST_SIZE)
         avatar.setAlignment(Qt.AlignCenter)
         avatar_text = (assignee[:1] or '').upper()
         avatar.setText(avatar_text)
@@ -95,13 +90,11 @@ class TaskDetailItemWidget(QFrame):
         try:
             pix = None
             if is_group:
-                # group: prefer assignee (via task_data or DB lookup)
+                # group: prefer assignee (via task or DB lookup)
                 if self.calendar_ref and hasattr(self.calendar_ref, 'db'):
-                    pix = load_avatar_for_task(task_data, db=self.calendar_ref.db, size=44)
-                if not pix:
-                    assignee_id = task_data.get('assignee_id')
-                    if assignee_id:
-                        pix = load_avatar_pixmap(assignee_id, size=44)
+                    pix = load_avatar_for_task(task, db=self.calendar_ref.db, size=AVATAR_LIST_SIZE)
+                if not pix and task.assignee_id:
+                    pix = load_avatar_pixmap(task.assignee_id, size=AVATAR_LIST_SIZE)
             else:
                 # Cá nhân: cố gắng tải avatar chủ sở hữu nếu có task_id và DB
                 try:
@@ -111,7 +104,7 @@ class TaskDetailItemWidget(QFrame):
                         if row and len(row) >= 2:
                             owner_id = row[1]
                             if owner_id:
-                                pix = load_avatar_pixmap(owner_id, size=44)
+                                pix = load_avatar_pixmap(owner_id, size=AVATAR_LIST_SIZE)
                 except Exception:
                     pass
 
@@ -276,6 +269,7 @@ class TaskDetailItemWidget(QFrame):
 # ==============================================================================
 class DayDetailDialog(QDialog):
     def __init__(self, full_date, tasks_data: list, calendar_ref=None, parent=None):
+        """tasks_data: list TaskRecord của ngày full_date."""
         super().__init__(parent)
         self.setWindowTitle("Chi Tiết Công Việc Trong Ngày")
         self.setMinimumSize(520, 460)
@@ -443,311 +437,6 @@ class TaskWidget(QFrame):
         self._update_note_icon()
 
 
-class TaskBadge(QFrame):
-    """Compact task badge shown in calendar tile with an interactive checkbox on the right.
-
-    Provides: title label, optional tooltip (note), and a checkbox that toggles completion
-    with permission checks via calendar_ref.
-    """
-    def __init__(self, title, color='#66bb6a', note='', assignee_name=None, parent=None, task_id=None, is_group=False, calendar_ref=None, due_at=None):
-        super().__init__(parent)
-        self.setObjectName('TaskBadge')
-        self.task_id = task_id
-        self.is_group = is_group
-        self.calendar_ref = calendar_ref
-        self.note = note
-        self.assignee_name = assignee_name
-        self.title = title or ''
-        self.due_at = due_at
-
-        self.setContentsMargins(0, 0, 0, 0)
-        # make badges compact and cap width so long titles don't expand the calendar
-        self.setFixedHeight(34)
-        self.setMinimumHeight(34)
-        # chỉnh sửa chiều rộng tối đa để phù hợp với thiết kế
-        BADGE_MAX_W = 240
-        self.setMaximumWidth(BADGE_MAX_W)
-            
-
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(8, 2, 6, 2)
-        layout.setSpacing(8)
-
-        # optional left indicator: group icon or assignee initial
-        self.icon_label = QLabel()
-        self.icon_label.setFixedSize(20, 20)
-        self.icon_label.setStyleSheet('border-radius:8px;')
-        # default empty, will be set below when is_group / assignee present
-        layout.addWidget(self.icon_label, 0, Qt.AlignVCenter)
-
-        self.label = ElidedLabel(self.title)
-        self.label.setStyleSheet('color: white; font-size: 13px; font-weight:600;')
-        self.label.setWordWrap(False)
-        self.label.setAlignment(Qt.AlignVCenter | Qt.AlignLeft)
-        try:
-            # ensure the label doesn't request excessive width
-            self.label.setMaximumWidth(BADGE_MAX_W - 40)
-        except Exception:
-            pass
-        # allow widget to shrink text with elide if too long in layout (handled by QLabel width)
-        layout.addWidget(self.label, 1)
-
-        # interactive check control on the right — use a small checkable QPushButton
-        # We keep the attribute name `checkbox` for backward compatibility so other code can call
-        # .setChecked/.isChecked and we connect to toggled events.
-        from PyQt5.QtWidgets import QPushButton
-        self.checkbox = QPushButton('')
-        self.checkbox.setCheckable(True)
-        # larger clickable area for touch and visibility
-        self.checkbox.setFixedSize(24, 24)
-        # show a visible check mark when checked; no text when unchecked
-        self.checkbox.setStyleSheet(
-            'QPushButton { background: rgba(255,255,255,0.12); border-radius: 6px; border: none; color: white; font-weight: bold; }'
-            'QPushButton:checked { background: white; color: #2b2b2b; }'
-        )
-        layout.addWidget(self.checkbox, 0, Qt.AlignRight)
-
-        # visual style
-        base_style = f'background: {color}; border-radius: 12px; padding: 4px;'
-        self.setStyleSheet(base_style)
-        # if group task, show a subtle left marker and slightly different tint
-        try:
-            if self.is_group:
-                # small white circle with group emoji (keeps compact)
-                self.icon_label.setText('👥')
-                self.icon_label.setStyleSheet('font-size:11px; color: white; background: rgba(0,0,0,0.12); border-radius:8px;')
-            else:
-                # hide icon area by setting transparent background
-                self.icon_label.setText('')
-                self.icon_label.setStyleSheet('background: transparent;')
-        except Exception:
-            pass
-        # add drop shadow for depth
-        try:
-            shadow = QGraphicsDropShadowEffect(self)
-            shadow.setBlurRadius(12)
-            shadow.setOffset(0, 4)
-            shadow.setColor(QColor(0, 0, 0, 80))
-            self.setGraphicsEffect(shadow)
-        except Exception:
-            pass
-        # add opacity effect and an animation to highlight changes
-        try:
-            opacity = QGraphicsOpacityEffect(self)
-            opacity.setOpacity(1.0)
-            self._opacity_effect = opacity
-            self.setGraphicsEffect(opacity)
-            self._anim = QPropertyAnimation(opacity, b"opacity")
-            self._anim.setDuration(220)
-            self._anim.setEasingCurve(QEasingCurve.InOutQuad)
-        except Exception:
-            self._anim = None
-        # tooltip is handled by ElidedLabel for title; keep separate tooltip for note
-        try:
-            if note:
-                self.setToolTip(note)
-        except Exception:
-            pass
-
-        # connect toggled to our handler; handler will accept bool or int
-        self.checkbox.toggled.connect(self._on_checkbox_changed)
-
-        # interaction state for dragging
-        self.drag_start_position = None
-
-    def text(self):
-        return self.title
-
-    def mousePressEvent(self, event):
-        try:
-            # register drag start position on left click; do NOT open detail on single click
-            if event.button() == Qt.LeftButton:
-                self.drag_start_position = event.pos()
-        except Exception:
-            pass
-
-    def mouseDoubleClickEvent(self, event):
-        # double-clicking a TaskBadge opens a single-task detail dialog
-        try:
-            if event.button() == Qt.LeftButton and self.calendar_ref:
-                try:
-                    # build a small dialog containing TaskDetailItemWidget for this task
-                    from PyQt5.QtWidgets import QDialog, QVBoxLayout, QDialogButtonBox
-                    dlg = QDialog(self)
-                    dlg.setWindowTitle('Chi tiết công việc')
-                    dlg.setMinimumWidth(420)
-                    data = {
-                        'title': self.title,
-                        'is_done': bool(self.checkbox.isChecked()),
-                        'note': self.note,
-                        'assignee_name': self.assignee_name,
-                        'assignee_id': getattr(self, 'assignee_id', None),
-                        'due_at': None,
-                        'task_id': self.task_id,
-                        'is_group': self.is_group
-                    }
-                    content = TaskDetailItemWidget(data, calendar_ref=self.calendar_ref)
-                    layout = QVBoxLayout(dlg)
-                    layout.addWidget(content)
-                    buttons = QDialogButtonBox(QDialogButtonBox.Close)
-                    buttons.rejected.connect(dlg.reject)
-                    layout.addWidget(buttons)
-                    dlg.exec_()
-                    return
-                except Exception:
-                    pass
-            super().mouseDoubleClickEvent(event)
-        except Exception:
-            try:
-                super().mouseDoubleClickEvent(event)
-            except Exception:
-                pass
-
-    def enterEvent(self, event):
-        # subtle brighten on hover
-        try:
-            self.setStyleSheet(self.styleSheet() + 'border: 1px solid rgba(255,255,255,0.18); transform: scale(1.01);')
-        except Exception:
-            pass
-
-    def leaveEvent(self, event):
-        try:
-            # revert to base by resetting to original background color (approx)
-            # keep the background color part of stylesheet unchanged; simple reset
-            self.setStyleSheet(self.styleSheet().replace('border: 1px solid rgba(255,255,255,0.18); transform: scale(1.01);', ''))
-        except Exception:
-            pass
-
-    def mouseMoveEvent(self, event):
-        # Dragging disabled: do nothing to prevent creating drag actions
-        return
-
-    def mouseReleaseEvent(self, event):
-        """Clear drag start position on mouse release to avoid stale state."""
-        try:
-            self.drag_start_position = None
-        except Exception:
-            pass
-
-    def contextMenuEvent(self, event):
-        context_menu = QMenu(self)
-        delete_action = context_menu.addAction('Xóa công việc này')
-        action = context_menu.exec_(self.mapToGlobal(event.pos()))
-        if action == delete_action:
-            try:
-                if self.task_id and self.calendar_ref:
-                    success = self.calendar_ref.delete_task(self.task_id, self.is_group)
-                    if not success:
-                        QMessageBox.warning(self, 'Lỗi', 'Không thể xóa nhiệm vụ (không có quyền hoặc lỗi).')
-                    else:
-                        self.deleteLater()
-            except Exception:
-                pass
-
-    def _on_checkbox_changed(self, state):
-        # state may be bool (QPushButton.toggled) or int (Qt.Checked from QCheckBox)
-        if isinstance(state, bool):
-            is_done = 1 if state else 0
-        else:
-            is_done = 1 if state == Qt.Checked else 0
-        # Optimistic UI: update visuals immediately, then persist; revert on failure
-        try:
-            if not self.task_id or not self.calendar_ref:
-                return
-
-            # Check if task is in the past and prevent toggling
-            try:
-                if hasattr(self, 'due_at') and self.due_at:
-                    from datetime import datetime
-                    due_date = datetime.strptime(self.due_at, '%Y-%m-%d %H:%M:%S')
-                    if due_date < datetime.now():
-                        QMessageBox.warning(self, "Không thể thay đổi", "Không thể thay đổi trạng thái công việc đã quá hạn.")
-                        # revert immediately
-                        self.checkbox.blockSignals(True)
-                        self.checkbox.setChecked(not bool(is_done))
-                        try:
-                            self.checkbox.setText('✓' if self.checkbox.isChecked() else '')
-                        except Exception:
-                            pass
-                        self.checkbox.blockSignals(False)
-                        return
-            except Exception:
-                pass
-
-            # permission check first
-            try:
-                allowed, msg = self.calendar_ref.can_toggle_task(self.task_id, self.is_group)
-            except Exception:
-                allowed, msg = False, 'Lỗi kiểm tra quyền.'
-            if not allowed:
-                # revert immediately
-                self.checkbox.blockSignals(True)
-                # set checked state back
-                self.checkbox.setChecked(not bool(is_done))
-                # update visible tick for QPushButton
-                try:
-                    self.checkbox.setText('✓' if self.checkbox.isChecked() else '')
-                except Exception:
-                    pass
-                self.checkbox.blockSignals(False)
-                QMessageBox.warning(self, 'Không có quyền', msg)
-                return
-
-            # optimistic style
-            # show tick mark on the QPushButton if used
-            try:
-                self.checkbox.setText('✓' if bool(is_done) else '')
-            except Exception:
-                pass
-            if is_done:
-                self.setStyleSheet('background: #bdbdbd; border-radius: 12px; padding: 4px; color: #fff;')
-                self.label.setStyleSheet('color: #fff; text-decoration: line-through; font-size:11px;')
-            else:
-                self.setStyleSheet('background: #66bb6a; border-radius: 12px; padding: 4px;')
-                self.label.setStyleSheet('color: #fff; font-size:11px;')
-
-            # persist change via calendar API which now returns boolean success
-            try:
-                success = self.calendar_ref.update_task_status(self.task_id, is_done, self.is_group)
-            except Exception:
-                success = False
-
-            if not success:
-                # revert visuals and checkbox
-                self.checkbox.blockSignals(True)
-                self.checkbox.setChecked(not bool(is_done))
-                try:
-                    self.checkbox.setText('✓' if self.checkbox.isChecked() else '')
-                except Exception:
-                    pass
-                self.checkbox.blockSignals(False)
-                # revert styles
-                if not is_done:
-                    self.setStyleSheet('background: #bdbdbd; border-radius: 12px; padding: 4px;')
-                    self.label.setStyleSheet('color:#fff; text-decoration: line-through; font-size:11px;')
-                else:
-                    self.setStyleSheet('background: #66bb6a; border-radius: 12px; padding: 4px;')
-                    self.label.setStyleSheet('color:#fff; font-size:11px;')
-                QMessageBox.warning(self, 'Lỗi', 'Không thể cập nhật trạng thái lên server.')
-            else:
-                # animate a subtle highlight to show success
-                try:
-                    if self._anim:
-                        self._anim.stop()
-                        self._anim.setStartValue(0.6)
-                        self._anim.setEndValue(1.0)
-                        self._anim.start()
-                except Exception:
-                    pass
-                # refresh only this day to avoid full calendar redraw
-                try:
-                    if hasattr(self, 'day') and self.calendar_ref:
-                        self.calendar_ref.refresh_day(self.day)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
 # ==============================================================================
 # LỚP 4: GroupTaskWidget (Widget cho group tasks với thông tin assignee)
 # ==============================================================================
@@ -985,286 +674,4 @@ class AddTaskDialog(QDialog):
         self.priority_button.setText(f"P{priority}")
 
 
-class DayWidget(QFrame):
-    def __init__(self, date_text, year, month, parent=None, calendar_ref=None):
-        super().__init__(parent)
-        self.setObjectName("DayWidget")
-        self.setFrameShape(QFrame.StyledPanel)
-        self.setAcceptDrops(True)
-
-        self.day = int(date_text)
-        self.year = year
-        self.month = month
-        self.calendar_ref = calendar_ref
-        self.is_today = False
-
-        self.main_layout = QVBoxLayout(self)
-        self.main_layout.setAlignment(Qt.AlignTop)
-        self.main_layout.setContentsMargins(2, 2, 2, 2)
-
-        self.date_label = QLabel(date_text)
-        self.date_label.setObjectName("DateLabel")
-        self.date_label.setAlignment(Qt.AlignRight)
-        self.date_label.setStyleSheet("background: transparent;")
-        self.date_label.setCursor(QCursor(Qt.PointingHandCursor))
-        self.main_layout.addWidget(self.date_label)
-
-        # Create a simple container for tasks (no scrolling) so we can display
-        # a compact overflow indicator (+N) instead of letting the cell scroll.
-        tasks_container = QWidget()
-        self.tasks_layout = QVBoxLayout(tasks_container)
-        self.tasks_layout.setAlignment(Qt.AlignTop)
-        self.tasks_layout.setContentsMargins(0, 0, 0, 0)
-        self.tasks_layout.setSpacing(4)  # spacing between task widgets
-        # chiều cao tối đa để hiển thị 3 badges với khoảng cách
-        self.MAX_VISIBLE_BADGES = 2
-        self.BADGE_HEIGHT = 30
-        spacing = max(0, self.tasks_layout.spacing())
-        visible_height = self.MAX_VISIBLE_BADGES * self.BADGE_HEIGHT + max(0, (self.MAX_VISIBLE_BADGES - 1)) * spacing + 6
-        try:
-            tasks_container.setFixedHeight(visible_height)
-        except Exception:
-            pass
-
-        # keep a reference so add_task/others can access the container and adjust if needed
-        self.tasks_container = tasks_container
-        self.main_layout.addWidget(tasks_container)
-        # overflow footer (separate from the tasks layout) so +N is never clipped
-        try:
-            self._total_tasks = 0
-            self.overflow_footer = QPushButton()
-            self.overflow_footer.setObjectName('OverflowFooter')
-            self.overflow_footer.setProperty('is_overflow_footer', True)
-            self.overflow_footer.setVisible(False)
-            self.overflow_footer.setFixedHeight(self.BADGE_HEIGHT)
-            self.overflow_footer.setCursor(QCursor(Qt.PointingHandCursor))
-            self.overflow_footer.setFlat(True)
-            self.overflow_footer.setStyleSheet('background: #f5f5f5; color: #444; border-radius:8px; padding:6px;')
-            try:
-                self.overflow_footer.clicked.connect(self.open_all_tasks_dialog)
-            except Exception:
-                pass
-            self.main_layout.addWidget(self.overflow_footer)
-        except Exception:
-            # if QPushButton is unavailable for some reason, skip footer
-            self.overflow_footer = None
-        # keep full list of tasks (both visible and hidden) so dialog can list all
-        self._all_task_widgets = []
-            
-    def _prompt_for_new_task(self):
-        # KIỂM TRA QUYỀN TRƯỚC KHI LÀM BẤT CỨ ĐIỀU GÌ
-        if self.calendar_ref and self.calendar_ref.current_view_mode == 'group':
-            # Ensure we have the correct leader id; some flows may not have called
-            # calendar_ref.set_group_context so current_group_leader_id can be None.
-            try:
-                leader_id = self.calendar_ref.current_group_leader_id
-                if leader_id is None:
-                    # try to resolve from the current group id
-                    try:
-                        grp = self.calendar_ref._get_current_group_id()
-                        if grp:
-                            leader_id = self.calendar_ref.db.get_group_leader(grp)
-                            # cache it on calendar_ref for subsequent checks
-                            try:
-                                self.calendar_ref.current_group_leader_id = leader_id
-                            except Exception:
-                                pass
-                    except Exception:
-                        leader_id = None
-                is_leader = (self.calendar_ref.user_id == leader_id)
-            except Exception:
-                is_leader = False
-
-            # Nếu không phải là trưởng nhóm
-            if not is_leader:
-                QMessageBox.warning(self, "Không có quyền", "Chỉ trưởng nhóm mới có thể thêm công việc.")
-                return # Dừng hàm tại đây, không cho thực hiện thêm
-
-        # Sử dụng self.day để tạo ngày mặc định
-        default_date = datetime(self.year, self.month, self.day)
-        
-        # Prepare member list (for possible assignment) — only for group mode
-        members = []
-        try:
-            if self.calendar_ref and self.calendar_ref.current_view_mode == 'group':
-                members = self.calendar_ref._get_current_group_members() or []
-        except Exception:
-            members = []
-
-        # Pass mode so dialog can style itself separately for personal vs group
-        mode = 'group' if (self.calendar_ref and self.calendar_ref.current_view_mode == 'group') else 'personal'
-        dialog = AddTaskDialog(parent=self, default_date=default_date, members=members if mode == 'group' else None, mode=mode)
-
-        # Nếu người dùng nhấn "Thêm" và có nhập tiêu đề
-        if dialog.exec_() == QDialog.Accepted and dialog.title():
-            title = dialog.title()
-            due_datetime_obj = dialog.due_datetime().toPyDateTime()
-            note = dialog.note()
-            try:
-                assignee_id = dialog.assignee()
-            except Exception:
-                assignee_id = None
-            estimated_minutes = dialog.estimated_minutes()
-            priority = dialog.priority()
-
-            if self.calendar_ref:
-                # Dựa vào chế độ xem hiện tại để quyết định thêm việc cá nhân hay nhóm
-                if self.calendar_ref.current_view_mode == 'group':
-                    # pass assignee_id (may be None or empty) to add_group_task_to_db
-                    self.calendar_ref.add_group_task_to_db(due_datetime_obj, title, assignee_id=assignee_id if assignee_id else None, note_text=note)
-                else:
-                    self.calendar_ref.add_task_to_db(due_datetime_obj, title, note_text=note, estimated_minutes=estimated_minutes, priority=priority)
-
-    def set_today_highlight(self, enabled=True):
-        self.is_today = enabled
-        if enabled:
-            self.setStyleSheet(
-                "background-color: rgba(255, 0, 0, 60);"
-                "border-radius: 6px;"
-                "padding: 4px;"
-            )
-        else:
-            self.setStyleSheet("")
-
-    def mouseDoubleClickEvent(self, event):
-        child_widget = self.childAt(event.pos())
-        if child_widget is None or child_widget == self:
-            self.open_all_tasks_dialog()
-        else:
-            super().mouseDoubleClickEvent(event)
-
-    def mousePressEvent(self, event):
-        # single click on empty area or date label should also open day detail
-        try:
-            if event.button() == Qt.LeftButton:
-                child_widget = self.childAt(event.pos())
-                if child_widget is None or child_widget == self or child_widget == self.date_label:
-                    self.open_all_tasks_dialog()
-                    return
-        except Exception:
-            pass
-        try:
-            super().mousePressEvent(event)
-        except Exception:
-            pass
-
-    def open_all_tasks_dialog(self):
-        # build tasks_data for that day by scanning current tasks_layout
-        tasks_data = []
-        # use the full list so hidden tasks (overflow) are included
-        for widget in getattr(self, '_all_task_widgets', []):
-            try:
-                if widget is None:
-                    continue
-                if hasattr(widget, 'task_id'):
-                    tasks_data.append({
-                        'title': widget.text() if hasattr(widget, 'text') else getattr(widget, 'label', lambda: '')(),
-                        'is_done': getattr(widget, 'checkbox', None) and getattr(widget.checkbox, 'isChecked', lambda: False)(),
-                        'note': getattr(widget, 'note', ''),
-                        'assignee_name': getattr(widget, 'assignee_name', None) or None,
-                        'assignee_id': getattr(widget, 'assignee_id', None),
-                        'due_at': None,
-                        'task_id': getattr(widget, 'task_id', None),
-                        'is_group': getattr(widget, 'is_group', False)
-                    })
-            except Exception:
-                continue
-        full_date = datetime(self.year, self.month, self.day)
-        dialog = DayDetailDialog(full_date, tasks_data, calendar_ref=self.calendar_ref, parent=self)
-        # Lưu trạng thái ban đầu
-        was_today = self.is_today
-        # Tắt highlight ngày hôm nay khi mở dialog
-        if self.is_today:
-            self.set_today_highlight(False)
-        dialog.exec_()
-        # Bật lại highlight sau khi đóng dialog nếu ban đầu là today
-        if was_today:
-            self.set_today_highlight(True)
-
-    def add_task(self, task_widget):
-        # If given a TaskBadge, attach day info and limit number displayed with an overflow indicator
-        try:
-            # detect TaskBadge by objectName to support both old QLabel badges and new QFrame-based badges
-            is_badge = getattr(task_widget, 'objectName', lambda: '')() == 'TaskBadge'
-            if is_badge:
-                # record in full list so open_all_tasks_dialog can include it
-                try:
-                    self._all_task_widgets.append(task_widget)
-                except Exception:
-                    self._all_task_widgets = [task_widget]
-                # set day and calendar_ref if missing
-                if not hasattr(task_widget, 'day'):
-                    task_widget.day = self.day
-                if not getattr(task_widget, 'calendar_ref', None):
-                    task_widget.calendar_ref = self.calendar_ref
-                # ensure badge checkbox reflects current state (if attribute exists)
-                try:
-                    if hasattr(task_widget, 'checkbox'):
-                        # leave checked state as-is if already set, otherwise default to unchecked
-                        if not hasattr(task_widget.checkbox, 'isChecked'):
-                            pass
-                except Exception:
-                    pass
-                # increment total tasks and decide whether to add visibly or update footer
-                try:
-                    self._total_tasks += 1
-                except Exception:
-                    self._total_tasks = 1
-                # count visible badges currently in layout
-                badges = [self.tasks_layout.itemAt(i).widget() for i in range(self.tasks_layout.count()) if self.tasks_layout.itemAt(i).widget() is not None]
-                badge_widgets = [b for b in badges if getattr(b, 'objectName', lambda: '')() == 'TaskBadge']
-                if len(badge_widgets) < self.MAX_VISIBLE_BADGES:
-                    self.tasks_layout.addWidget(task_widget)
-                else:
-                    # show/update footer instead of putting overflow inside tasks_layout
-                    try:
-                        hidden = max(1, self._total_tasks - self.MAX_VISIBLE_BADGES)
-                        if self.overflow_footer:
-                            self.overflow_footer.setText(f"+{hidden}")
-                            self.overflow_footer.setVisible(True)
-                    except Exception:
-                        pass
-            else:
-                # generic widget (TaskWidget or others)
-                self.tasks_layout.addWidget(task_widget)
-        except Exception:
-            try:
-                self.tasks_layout.addWidget(task_widget)
-            except Exception:
-                pass
-
-    def clear_tasks(self):
-        """Xóa tất cả widget công việc trong ô ngày trước khi thêm mới."""
-        while self.tasks_layout.count():
-            item = self.tasks_layout.takeAt(0)
-            w = item.widget()
-            if w is not None:
-                w.deleteLater()
-        # reset footer
-        try:
-            self._total_tasks = 0
-            if getattr(self, 'overflow_footer', None):
-                self.overflow_footer.setVisible(False)
-                try:
-                    self.overflow_footer.setText('')
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-    def dragEnterEvent(self, event):
-        # Drag-and-drop disabled: do not accept any external drag events
-        return
-
-    def dropEvent(self, event):
-        # Drag-and-drop disabled: ignore drops
-        return
-
-    def contextMenuEvent(self, event):
-        context_menu = QMenu(self)
-        add_task_action = context_menu.addAction("Thêm công việc mới")
-        action = context_menu.exec_(self.mapToGlobal(event.pos()))
-        if action == add_task_action:
-            self._prompt_for_new_task()
-
-    
\ No newline at end of file
+    
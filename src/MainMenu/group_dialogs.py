@@ -1,4 +1,5 @@
 from Managers.database_manager import Database
+from Managers.db_worker import get_db_worker
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, 
                              QPushButton, QInputDialog, QMessageBox, QLabel, QLineEdit)
 from PyQt5.QtCore import Qt, pyqtSignal
@@ -33,18 +34,21 @@ class GroupSelectionDialog(QDialog):
         self.load_groups()
 
     def load_groups(self):
-        """Tải danh sách các nhóm mà người dùng là thành viên."""
+        """Tải (ở worker nền) danh sách các nhóm mà người dùng là thành viên."""
         self.group_list_widget.clear()
-        try:
-            db = Database()
-            groups = db.get_groups_for_user(self.user_id)
-            
-            for group_id, group_name in groups:
-                item = QListWidgetItem(group_name)
-                item.setData(Qt.UserRole, group_id) # Lưu group_id vào item
-                self.group_list_widget.addItem(item)
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi CSDL", f"Không thể tải danh sách nhóm: {e}")
+        worker = get_db_worker()
+        worker.submit(worker.db.get_groups_for_user, self.user_id,
+                      on_result=self._on_groups_loaded, on_error=self._on_groups_failed)
+
+    def _on_groups_loaded(self, groups):
+        self.group_list_widget.clear()
+        for group_id, group_name in groups:
+            item = QListWidgetItem(group_name)
+            item.setData(Qt.UserRole, group_id) # Lưu group_id vào item
+            self.group_list_widget.addItem(item)
+
+    def _on_groups_failed(self, e):
+        QMessageBox.critical(self, "Lỗi CSDL", f"Không thể tải danh sách nhóm: {e}")
 
     def create_new_group(self):
         """Mở hộp thoại để tạo nhóm mới."""
@@ -85,28 +89,39 @@ class MemberListDialog(QDialog):
         self.member_list = QListWidget()
         layout.addWidget(self.member_list)
 
-        try:
-            db = Database()
-            members = db.get_group_members(group_id)
-            for row in members:
-                # Hỗ trợ các hàng là (user_id, user_name) hoặc (user_id, user_name, email)
+        worker = get_db_worker()
+        worker.submit(self._fetch_members, worker.db, group_id,
+                      on_result=self._on_members_loaded, on_error=self._on_members_failed)
+
+    @staticmethod
+    def _fetch_members(db, group_id):
+        """Chạy trên worker thread: trả về danh sách (name, email)."""
+        result = []
+        for row in db.get_group_members(group_id):
+            # Hỗ trợ các hàng là (user_id, user_name) hoặc (user_id, user_name, email)
+            try:
+                uid = row[0]
+                name = row[1] if len(row) > 1 else str(uid)
+                email = row[2] if len(row) > 2 else None
+            except Exception:
+                # fallback: bỏ qua hàng malformed
+                continue
+            if not email:
+                # thử lấy email từ user record nếu thiếu
                 try:
-                    uid = row[0]
-                    name = row[1] if len(row) > 1 else str(uid)
-                    email = row[2] if len(row) > 2 else None
+                    user = db.get_user_by_id(uid)
+                    email = user[2] if user and len(user) > 2 else 'unknown'
                 except Exception:
-                    # fallback: bỏ qua hàng malformed
-                    continue
-                if not email:
-                    # thử lấy email từ user record nếu thiếu
-                    try:
-                        user = db.get_user_by_id(uid)
-                        email = user[2] if user and len(user) > 2 else 'unknown'
-                    except Exception:
-                        email = 'unknown'
-                self.member_list.addItem(f"{name} ({email})")
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi CSDL", f"Không thể tải danh sách thành viên: {e}")
+                    email = 'unknown'
+            result.append((name, email))
+        return result
+
+    def _on_members_loaded(self, members):
+        for name, email in members:
+            self.member_list.addItem(f"{name} ({email})")
+
+    def _on_members_failed(self, e):
+        QMessageBox.critical(self, "Lỗi CSDL", f"Không thể tải danh sách thành viên: {e}")
 
 class AddMemberDialog(QDialog):
     """Cửa sổ để thêm thành viên mới vào nhóm."""
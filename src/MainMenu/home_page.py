@@ -1,178 +1,61 @@
 # -*- coding: utf-8 -*-
 import os
-from datetime import datetime, timedelta
 import time
+from datetime import datetime, timedelta
 
 from Managers.database_manager import Database
+from Managers.db_worker import get_db_worker
+from Managers.search_text import is_refinement, matches as matches_search, search_tokens
+from Managers.task_records import TaskRecord, nocase_key, parse_due_epoch, urgency_key
+from Managers.task_repository import TaskRepository
+from MainMenu.notifications import show_toast
+from MainMenu.reminder_scheduler import ReminderScheduler
+from MainMenu.task_list_view import TaskListView
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QLineEdit, QScrollArea, QFrame,
+                             QLabel, QLineEdit, QFrame, QStackedWidget,
                              QGridLayout, QGroupBox, QComboBox, QMessageBox,
-                             QDateTimeEdit, QGraphicsDropShadowEffect, QMenu, QAction)
+                             QDateTimeEdit, QMenu, QAction)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QDateTime
-from PyQt5.QtGui import QIcon, QColor
+from PyQt5.QtGui import QIcon
 
 from config import (
     ICON_DIR, COLOR_BACKGROUND, COLOR_PRIMARY, 
-    COLOR_SUCCESS, COLOR_DANGER, COLOR_TEXT_PRIMARY, 
-    COLOR_TEXT_SECONDARY, COLOR_BORDER, COLOR_HOVER, 
-    PRIORITY_COLORS, COLOR_WHITE
+    COLOR_TEXT_PRIMARY, COLOR_TEXT_SECONDARY, COLOR_BORDER,
+    COLOR_HOVER, COLOR_WHITE, TASK_PAGE_SIZE, SEARCH_DEBOUNCE_MS,
+    REMINDER_LEAD_MINUTES, REMINDER_HORIZON_HOURS
 )
 
-def _parse_iso_datetime_module(s: str):
-    """Chuyển chuỗi ISO sang datetime; trả None nếu không parse được.
-
-    Dùng chung cho các widget trong `home_page.py`.
-    """
-    if not s:
-        return None
-    if isinstance(s, datetime):
-        return s
-    s = str(s)
-    try:
-        if s.endswith('Z'):
-            return datetime.fromisoformat(s.replace('Z', '+00:00'))
-        return datetime.fromisoformat(s)
-    except Exception:
-        pass
-    try:
-        s2 = s.replace('T', ' ').rstrip('Z')
-        try:
-            return datetime.strptime(s2, '%Y-%m-%d %H:%M:%S')
-        except Exception:
-            return datetime.strptime(s2, '%Y-%m-%d')
-    except Exception:
-        return None
-
-class TaskItemWidget(QFrame):
-    task_toggled = pyqtSignal(str)
-    task_deleted = pyqtSignal(str)
-
-    def __init__(self, task_data, meta_data, parent=None):
-        super().__init__(parent)
-        self.task_id = task_data['id']
-        self.task_data = task_data
-        self.meta_data = meta_data
-        self.setupUI()
-        self.apply_shadow()
-
-    def setupUI(self):
-        self.setObjectName("TaskItemWidget")
-        is_done = self.task_data['is_done']
-        
-        self.setStyleSheet(f"""
-            #TaskItemWidget {{
-                background-color: {COLOR_WHITE};
-                border: 1px solid {COLOR_BORDER};
-                border-radius: 8px; padding: 12px; margin: 4px 8px;
-            }}
-            #TaskItemWidget[done="true"] {{ background-color: #F8F9FA; }}
-            QLabel {{ background-color: transparent; border: none; }}
-        """)
-        self.setProperty("done", is_done)
-
-        main_layout = QHBoxLayout(self)
-        main_layout.setContentsMargins(10, 5, 10, 5)
-        
-        content_layout = QVBoxLayout()
-        title_label = QLabel(self.task_data['title'])
-        title_font_style = f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};"
-        if is_done:
-            title_font_style = f"font-size: 15px; text-decoration: line-through; color: {COLOR_TEXT_SECONDARY};"
-        title_label.setStyleSheet(title_font_style)
-        content_layout.addWidget(title_label)
-
-        # Hiện ghi chú nếu có
-        note_text = self.task_data.get('note', '')
-        if note_text:
-            note_label = QLabel(note_text)
-            note_label.setStyleSheet(f"font-size:12px; color: {COLOR_TEXT_SECONDARY}; padding-top:4px;")
-            content_layout.addWidget(note_label)
-        
-        details_text = []
- 
-        priority = self.task_data.get('priority', 4)
-        if priority < 4:
-            priority_color = PRIORITY_COLORS.get(priority, COLOR_TEXT_SECONDARY)
-            details_text.append(f"<b style='color:{priority_color};'>P{priority}</b>")
-
-        assignee_name = self.task_data.get('assignee_name')
-        if assignee_name:
-            details_text.append(f"👤 {assignee_name}")
-
-        if self.task_data['due_at']:
-            try:
-                due_date = _parse_iso_datetime_module(self.task_data['due_at'])
-                if due_date:
-                    details_text.append(f"📅 {due_date.strftime('%d/%m %H:%M')}")
-                else:
-                    details_text.append(f"📅 {self.task_data['due_at']}")
-            except Exception:
-                details_text.append(f"📅 {self.task_data['due_at']}")
-
-        if self.task_data['estimated_minutes']:
-             details_text.append(f"⏱️ {self.task_data['estimated_minutes']}m")
-        if self.meta_data and 'actual' in self.meta_data:
-             details_text.append(f"✅ {self.meta_data['actual']}m")
-
-        if details_text:
-            details_label = QLabel("  •  ".join(details_text))
-            details_label.setStyleSheet(f"font-size: 11px; color: {COLOR_TEXT_SECONDARY}; padding-top: 4px;")
-            content_layout.addWidget(details_label)
-
-        action_layout = QHBoxLayout()
-        action_layout.setSpacing(5)
-        action_layout.setAlignment(Qt.AlignRight)
-
-        if not is_done:
-            complete_btn = self._create_icon_button(os.path.join(ICON_DIR, 'check-circle.svg'), "Mark as Complete", COLOR_SUCCESS)
-            complete_btn.clicked.connect(lambda: self.task_toggled.emit(self.task_id))
-            action_layout.addWidget(complete_btn)
-        else:
-            undo_btn = self._create_icon_button(os.path.join(ICON_DIR, 'rotate-ccw.svg'), "Mark as Pending", COLOR_TEXT_SECONDARY)
-            undo_btn.clicked.connect(lambda: self.task_toggled.emit(self.task_id))
-            action_layout.addWidget(undo_btn)
-            
-        delete_btn = self._create_icon_button(os.path.join(ICON_DIR, 'x-circle.svg'), "Delete Task", COLOR_DANGER)
-        delete_btn.clicked.connect(lambda: self.task_deleted.emit(self.task_id))
-        action_layout.addWidget(delete_btn)
-
-        main_layout.addLayout(content_layout)
-        main_layout.addStretch()
-        main_layout.addLayout(action_layout)
-
-    def _create_icon_button(self, icon_path, tooltip, color):
-        button = QPushButton()
-        if os.path.exists(icon_path):
-            button.setIcon(QIcon(icon_path))
-        button.setFixedSize(28, 28)
-        button.setToolTip(tooltip)
-        button.setStyleSheet(f"""
-            QPushButton {{ border-radius: 14px; background-color: transparent; padding: 4px; }}
-            QPushButton:hover {{ background-color: {color}; }}
-        """)
-        return button
-        
-    def apply_shadow(self):
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(25)
-        shadow.setXOffset(0)
-        shadow.setYOffset(5)
-        shadow.setColor(QColor(0, 0, 0, 25))
-        self.setGraphicsEffect(shadow)
-
-
 class DoNowView(QWidget):
     """View trang chính (My Tasks) cho người dùng.
 
     Hiển thị danh sách nhiệm vụ, form thêm nhanh và các bộ lọc.
     """
-    def __init__(self, user_id=None, db=None, parent=None):
+    # phát mỗi khi trang đầu của danh sách đã hiển thị (main.py dùng để đo khởi động)
+    first_page_loaded = pyqtSignal()
+
+    def __init__(self, user_id=None, db=None, parent=None, repository=None):
         super().__init__(parent)
         self.user_id = user_id
         self.db = Database()
-        self.tasks, self.meta, self.history = [], {}, {}
-        self.search_text, self.filter_status, self.page, self.page_size = "", "all", 1, 10
+        # Mọi lệnh ghi task đi qua repository; danh sách cập nhật theo tín hiệu của nó
+        self.repo = repository or TaskRepository(self.db, self)
+        self.repo.task_added.connect(self._on_task_added)
+        self.repo.task_updated.connect(self._on_task_updated)
+        self.repo.task_deleted.connect(self._on_task_deleted)
+        # Các truy vấn đọc chạy trên worker nền; kết quả trả về qua tín hiệu Qt
+        self.db_worker = get_db_worker()
+        self._load_request = None
+        self.meta, self.history = {}, {}
+        self.search_text, self.filter_status = "", "all"
+        # Lọc/sắp xếp/phân trang chạy trong SQL; self.tasks chỉ giữ các trang đã tải
+        self.sort_order = 'urgency'
+        self.total_tasks = 0
+        self._page_query = None
+        self._page_cursor = None
+        # mốc "bây giờ + 1 giờ" của thứ tự urgency, cố định theo từng lần tải
+        self._page_soon = None
+        self._assignee_filter = None
         
         # [THÊM] State để lưu priority được chọn trong form
         self.current_priority = 4
@@ -181,11 +64,15 @@ class DoNowView(QWidget):
         self.group_id = None
         self.is_leader = False
         
+        # Nhắc hạn chót: heap + một QTimer hẹn đúng lần nhắc kế tiếp (không quét định kỳ)
+        self.reminders = ReminderScheduler(REMINDER_LEAD_MINUTES * 60, REMINDER_HORIZON_HOURS * 3600, self)
+        self.reminders.reminder_due.connect(self._show_deadline_reminder)
+        self.reminders.refill_needed.connect(self._reload_reminders)
+        self._reminder_request = None
+        self._reminder_scope = None
+
         self.setupUI()
         self.load_data_from_db()
-        self.notification_timer = QTimer(self)
-        self.notification_timer.timeout.connect(self._check_deadlines)
-        self.notification_timer.start(60 * 1000)
 
     def setupUI(self):
         self.setStyleSheet(f"""
@@ -196,11 +83,7 @@ class DoNowView(QWidget):
             QLineEdit:focus, QDateTimeEdit:focus, QComboBox:focus {{ border: 1px solid {COLOR_PRIMARY}; }}
             QPushButton#MainCTA {{ background-color: {COLOR_PRIMARY}; color: {COLOR_WHITE}; font-weight: bold; font-size: 13px; border: none; border-radius: 6px; padding: 10px; }}
             QPushButton#MainCTA:hover {{ background-color: {COLOR_HOVER}; }}
-            QPushButton#PaginationButton {{ background-color: {COLOR_WHITE}; color: {COLOR_TEXT_PRIMARY}; border: 1px solid {COLOR_BORDER}; border-radius: 6px; padding: 8px 16px; }}
-            QPushButton#PaginationButton:disabled {{ background-color: #F8F9FA; color: {COLOR_TEXT_SECONDARY}; }}
-            QPushButton#PaginationButton:hover {{ border-color: {COLOR_PRIMARY}; }}
-            QScrollArea {{ border: none; background-color: transparent; }}
-            #TasksContainer {{ background-color: transparent; }}
+            #TaskListStack {{ background-color: transparent; }}
         """)
         self.setObjectName("DoNowView")
         main_layout = QVBoxLayout(self)
@@ -214,7 +97,6 @@ class DoNowView(QWidget):
         main_layout.addWidget(self._create_form_group())
         main_layout.addWidget(self._create_filter_bar())
         main_layout.addWidget(self._create_task_list_group(), 1)
-        main_layout.addLayout(self._create_pagination_controls())
 
     def _create_form_group(self):
         group = QGroupBox("✨ Add New Task")
@@ -358,7 +240,13 @@ class DoNowView(QWidget):
         self.status_filter_combo.addItems(["All Status", "Pending", "Done"])
         layout.addWidget(self.search_input, 1)
         layout.addWidget(self.status_filter_combo)
+        # Gõ phím chỉ khởi động lại timer; truy vấn chạy khi người dùng ngừng gõ
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_search)
         self.search_input.textChanged.connect(self._handle_search_change)
+        self.search_input.returnPressed.connect(self._apply_search)
         self.status_filter_combo.currentIndexChanged.connect(self._handle_filter_change)
         return container
 
@@ -366,150 +254,136 @@ class DoNowView(QWidget):
         group = QGroupBox("📌 Task List")
         layout = QVBoxLayout(group)
         layout.setContentsMargins(0, 5, 0, 5)
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        self.tasks_container = QWidget()
-        self.tasks_container.setObjectName("TasksContainer")
-        self.tasks_layout = QVBoxLayout(self.tasks_container)
-        self.tasks_layout.setAlignment(Qt.AlignTop)
-        self.tasks_layout.setSpacing(5)
-        scroll_area.setWidget(self.tasks_container)
-        layout.addWidget(scroll_area)
+        # Một QListView duy nhất (model + delegate tự vẽ), thay cho widget/dòng + phân trang
+        self.task_list_view = TaskListView()
+        self.task_list_view.task_toggled.connect(self._handle_toggle_task)
+        self.task_list_view.task_deleted.connect(self._handle_delete_task)
+        self.task_list_view.task_model.fetch_more_requested.connect(self._load_next_page)
+        self.no_tasks_label = QLabel("🎉 Bạn không có nhiệm vụ nào.")
+        self.no_tasks_label.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        self.no_tasks_label.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY}; font-size: 14px; padding: 40px;")
+        self.task_list_stack = QStackedWidget()
+        self.task_list_stack.setObjectName("TaskListStack")
+        self.task_list_stack.addWidget(self.task_list_view)
+        self.task_list_stack.addWidget(self.no_tasks_label)
+        layout.addWidget(self.task_list_stack)
+        self.task_list_group = group
         return group
 
-    def _create_pagination_controls(self):
-        layout = QHBoxLayout()
-        self.prev_btn = QPushButton("Previous")
-        self.next_btn = QPushButton("Next")
-        self.prev_btn.setObjectName("PaginationButton")
-        self.next_btn.setObjectName("PaginationButton")
-        self.page_label = QLabel(f"Page {self.page}")
-        self.page_label.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY}; font-weight: bold;")
-        self.page_label.setAlignment(Qt.AlignCenter)
-        layout.addStretch()
-        layout.addWidget(self.prev_btn)
-        layout.addWidget(self.page_label)
-        layout.addWidget(self.next_btn)
-        layout.addStretch()
-        self.prev_btn.clicked.connect(lambda: self._handle_page_change(-1))
-        self.next_btn.clicked.connect(lambda: self._handle_page_change(1))
-        return layout
-
-    def load_data_from_db(self):
-        self.tasks = []
+    def load_data_from_db(self, keep_loaded=False):
+        """Yêu cầu tải lại trang đầu của danh sách task ở nền; render khi có kết quả.
+
+        Bộ lọc trạng thái, chuỗi tìm kiếm và thứ tự được đẩy xuống SQL
+        (Database.get_tasks_page / get_group_tasks_page). keep_loaded=True tải lại
+        ít nhất bằng số dòng đang hiển thị để vị trí cuộn không bị mất.
+        Request cũ chưa xong sẽ bị hủy để kết quả trễ không ghi đè dữ liệu mới.
+        """
+        self.db_worker.cancel(self._load_request)
+        # áp dụng luôn chuỗi tìm kiếm đang chờ debounce (nếu có)
+        self._search_timer.stop()
+        self.search_text = self.search_input.text()
+        if self._reminder_scope != (self.view_mode, self.group_id):
+            self._reload_reminders()
+        if self.view_mode == 'group' and not self.group_id:
+            self._load_request = None
+            self.total_tasks, self._page_cursor = 0, None
+            self.render_tasks([])
+            return
+        # chụp lại tham số trên GUI thread; các trang sau dùng đúng bộ tham số này
+        self._page_query = (self.view_mode, self.group_id, self.filter_status, self.search_text, self.sort_order)
+        self._page_soon = datetime.now() + timedelta(hours=1)
+        limit = max(TASK_PAGE_SIZE, len(self.tasks)) if keep_loaded else TASK_PAGE_SIZE
+        self._load_request = self.db_worker.submit(
+            self._fetch_page, self._page_query, None, limit, self._page_soon.strftime('%Y-%m-%d %H:%M:%S'),
+            on_result=self._on_first_page_loaded, on_error=self._on_load_failed)
+
+    def _load_next_page(self):
+        """TaskListModel.fetchMore(): tải trang kế tiếp theo cursor."""
+        if self._page_cursor is None or self._page_query is None or self.db_worker.is_pending(self._load_request):
+            self.task_list_view.task_model.cancel_fetch()
+            return
+        self._load_request = self.db_worker.submit(
+            self._fetch_page, self._page_query, self._page_cursor, TASK_PAGE_SIZE, None,
+            on_result=self._on_next_page_loaded, on_error=self._on_next_page_failed)
+
+    def _fetch_page(self, query, cursor, limit, soon):
+        """Chạy trên worker thread: (TaskRecords, total, next_cursor, assignee_filter)."""
+        mode, group_id, status, search, sort = query
+        if mode == 'personal':
+            rows, total, next_cursor = self.db.get_tasks_page(
+                self.user_id, status, search, sort, cursor, limit, soon=soon)
+            return [TaskRecord.from_personal_row(r) for r in rows], total, next_cursor, None
+        assignee_filter = self._assignee_filter_for(group_id)
+        # tên người được giao lấy sẵn trong cùng truy vấn (LEFT JOIN users)
+        rows, total, next_cursor = self.db.get_group_tasks_page(
+            group_id, assignee_filter, status, search, sort, cursor, limit, soon=soon)
+        return [TaskRecord.from_group_row(r) for r in rows], total, next_cursor, assignee_filter
+
+    def _assignee_filter_for(self, group_id):
+        """Leader thấy tất cả task nhóm; members chỉ thấy task được giao cho họ."""
         try:
-            if self.view_mode == 'personal':
-                rows = self.db.get_tasks_for_user(self.user_id)
-                for r in rows:
-                    self.tasks.append({
-                        "id": str(r[0]), "title": r[1], "is_done": bool(r[2]),
-                        "due_at": r[3], "estimated_minutes": r[4], 
-                        "priority": r[5] if len(r) > 5 else 4,
-                        "note": r[6] if len(r) > 6 else ""
-                    })
-            elif self.view_mode == 'group' and self.group_id:
-                # leader thấy tất cả task; members chỉ thấy task được giao cho họ
-                try:
-                    leader_id = self.db.get_group_leader(self.group_id)
-                except Exception:
-                    leader_id = None
-                rows = self.db.get_group_tasks(self.group_id)
-                for r in rows:
-                    assignee_id = r[2]
-                    # nếu không phải leader và task không được giao cho user hiện tại, bỏ qua
-                    if leader_id is None or self.user_id != leader_id:
-                        if assignee_id is None or assignee_id != self.user_id:
-                            continue
-                    assignee_name = self.db.get_user_name(assignee_id) if assignee_id else "Unassigned"
-                    self.tasks.append({
-                        "id": str(r[0]), "title": r[3], "note": r[4],
-                        "is_done": bool(r[5]), "due_at": r[6],
-                        "assignee_name": assignee_name,
-                        "priority": 4,
-                        "estimated_minutes": None,
-                    })
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi", f"Không thể tải nhiệm vụ: {e}")
-        self.render_tasks()
+            leader_id = self.db.get_group_leader(group_id)
+        except Exception:
+            leader_id = None
+        return None if leader_id is not None and self.user_id == leader_id else self.user_id
+
+    def _sort_key_for(self, sort):
+        """Khóa sắp xếp trong bộ nhớ tương ứng thứ tự SQL của sort."""
+        if sort == 'urgency':
+            soon_epoch = self._page_soon.timestamp()
+            return lambda task: urgency_key(task, soon_epoch)
+        if sort == 'newest':
+            return lambda task: -task.task_id
+        if sort == 'title':
+            return lambda task: (nocase_key(task.title), task.task_id)
+        return lambda task: (task.due_epoch is None, task.due_epoch or 0.0, task.task_id)
+
+    def _on_first_page_loaded(self, result):
+        self._load_request = None
+        tasks, self.total_tasks, self._page_cursor, self._assignee_filter = result
+        self.task_list_view.task_model.set_sort_key(self._sort_key_for(self._page_query[4]))
+        self.render_tasks(self.repo.track(tasks))
+        self.first_page_loaded.emit()
+
+    def _on_next_page_loaded(self, result):
+        self._load_request = None
+        # total_tasks giữ nguyên: tổng của trang đầu đã được cộng/trừ theo các lần thêm/xóa
+        tasks, _total, self._page_cursor, _ = result
+        self.task_list_view.append_tasks(self.repo.track(tasks), has_more=self._page_cursor is not None)
+        self._update_task_count()
+
+    def _on_next_page_failed(self, error):
+        self._load_request = None
+        self.task_list_view.task_model.cancel_fetch()
+
+    def _on_load_failed(self, error):
+        self._load_request = None
+        self.total_tasks, self._page_cursor = 0, None
+        QMessageBox.critical(self, "Lỗi", f"Không thể tải nhiệm vụ: {error}")
+        self.render_tasks([])
+
+    @property
+    def tasks(self):
+        """Các TaskRecord đã tải, theo đúng thứ tự đang hiển thị."""
+        return self.task_list_view.task_model.tasks()
 
     # Wrapper tương thích: caller cũ gọi `load_data()`
     def load_data(self):
         """Backward-compatible alias used by MainWindow: load and render tasks."""
+        # MainWindow gọi sau khi task thay đổi ở view khác -> nạp lại cả nhắc nhở
+        self._reminder_scope = None
         self.load_data_from_db()
 
-    def _parse_iso_datetime(self, s: str):
-        if not s:
-            return None
-        if isinstance(s, datetime):
-            return s
-        s = str(s)
-        try:
-            if s.endswith('Z'):
-                return datetime.fromisoformat(s.replace('Z', '+00:00'))
-            return datetime.fromisoformat(s)
-        except Exception:
-            pass
-        try:
-            s2 = s.replace('T', ' ').rstrip('Z')
-            try:
-                return datetime.strptime(s2, '%Y-%m-%d %H:%M:%S')
-            except Exception:
-                return datetime.strptime(s2, '%Y-%m-%d')
-        except Exception:
-            return None
+    def render_tasks(self, tasks=None):
+        """Hiển thị tasks (mặc định: danh sách hiện tại) — không sắp xếp lại."""
+        if tasks is None:
+            tasks = list(self.tasks)
+        self.task_list_view.set_tasks(tasks, self.meta, has_more=self._page_cursor is not None)
+        self._update_task_count()
 
-    def get_visible_tasks(self):
-        def sort_key(task):
-            # Sắp xếp theo is_done (chưa xong trước), sau đó là priority (1 là cao nhất), sau đó là điểm urgency
-            return (task['is_done'], task.get('priority', 4), -calculate_urgency_score(task))
-
-        now = time.time() * 1000
-        def calculate_urgency_score(task):
-            deadline_ms = float('-inf') # Dùng -inf để task không có deadline bị đẩy xuống dưới
-            if task['due_at']:
-                try:
-                    dt_obj = _parse_iso_datetime_module(task['due_at'])
-                    if dt_obj is None:
-                        raise ValueError('unparsed')
-                    deadline_ms = dt_obj.timestamp() * 1000
-                except (ValueError, TypeError): pass
-            urgency_hours = max(1, (deadline_ms - now) / (3600000))
-            history_score = self.history.get(task['id'], 0) * 10
-            return (1 / urgency_hours) * 100 + history_score
-        
-        sorted_tasks = sorted(self.tasks, key=sort_key)
-        
-        def filter_func(task):
-            match_status = (self.filter_status == "all" or (self.filter_status == "pending" and not task['is_done']) or (self.filter_status == "done" and task['is_done']))
-            match_search = self.search_text.lower() in task['title'].lower()
-            return match_status and match_search
-        
-        filtered_tasks = list(filter(filter_func, sorted_tasks))
-        start = (self.page - 1) * self.page_size
-        return filtered_tasks, filtered_tasks[start:start + self.page_size]
-
-    def render_tasks(self):
-        while self.tasks_layout.count():
-            child = self.tasks_layout.takeAt(0)
-            if child.widget(): child.widget().deleteLater()
-
-        all_filtered, visible_tasks = self.get_visible_tasks()
-
-        if not visible_tasks:
-            no_tasks_label = QLabel("🎉 Bạn không có nhiệm vụ nào.")
-            no_tasks_label.setAlignment(Qt.AlignCenter)
-            no_tasks_label.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY}; font-size: 14px; padding: 40px;")
-            self.tasks_layout.addWidget(no_tasks_label)
-        else:
-            for task in visible_tasks:
-                task_widget = TaskItemWidget(task, self.meta.get(task['id']))
-                task_widget.task_toggled.connect(self._handle_toggle_task)
-                task_widget.task_deleted.connect(self._handle_delete_task)
-                self.tasks_layout.addWidget(task_widget)
-        self.tasks_layout.addStretch()
-        self.page_label.setText(f"Page {self.page}")
-        self.prev_btn.setEnabled(self.page > 1)
-        self.next_btn.setEnabled(len(all_filtered) > self.page * self.page_size)
+    def _update_task_count(self):
+        self.task_list_group.setTitle(f"📌 Task List ({self.total_tasks})")
+        self.task_list_stack.setCurrentWidget(self.task_list_view if self.tasks else self.no_tasks_label)
 
     def _handle_add_task(self):
         title = self.title_input.text().strip()
@@ -525,21 +399,16 @@ class DoNowView(QWidget):
         
         try:
             if self.view_mode == 'personal':
-                self.db.add_task_with_meta(
-                    self.user_id, title, note=note, is_done=0, due_at=due_at, 
+                record = self.repo.add_personal_task(
+                    self.user_id, title, note=note, due_at=due_at,
                     estimated_minutes=est_mins, priority=self.current_priority
                 )
             elif self.view_mode == 'group' and self.is_leader:
                 assignee_id = self.member_selector.currentData()
-                # Sử dụng keyword args để tránh lỗi thứ tự tham số (creator_id phải là tham số thứ hai)
-                self.db.add_group_task(
-                    self.group_id,
-                    creator_id=self.user_id,
-                    title=title,
-                    note=note,
-                    is_done=0,
-                    due_at=due_at,
-                    assignee_id=assignee_id
+                record = self.repo.add_group_task(
+                    self.group_id, self.user_id, title, note=note, due_at=due_at,
+                    assignee_id=assignee_id,
+                    assignee_name=self.member_selector.currentText() if assignee_id else None
                 )
             else:
                 return
@@ -547,59 +416,90 @@ class DoNowView(QWidget):
             self.title_input.clear(); self.estimated_input.clear()
             self.note_input.clear()
             self._set_priority(4)
-            self.load_data_from_db()
-            # Nếu lịch đang mở trong main window, refresh để task mới thêm xuất hiện
-            try:
-                win = self.window()
-                cw = getattr(win, 'calendar_widget', None)
-                if cw and getattr(cw, 'current_view_mode', '') == 'group':
-                    try:
-                        cw.set_group_context(self.group_id)
-                        cw.populate_calendar()
-                    except Exception:
-                        pass
-            except Exception:
-                pass
+            # task mới được chèn vào danh sách (và lịch) qua tín hiệu task_added
+            if record is None:
+                self._reminder_scope = None
+                self.load_data_from_db()
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể thêm nhiệm vụ: {e}")
     
+    def _insert_task(self, record):
+        """Thêm một task mới vào danh sách đang hiển thị nếu nó khớp bộ lọc."""
+        if not self._matches_current_filter(record):
+            return
+        self.total_tasks += 1
+        self.task_list_view.task_model.insert_task(record)
+        self._update_task_count()
+
+    def _accepts(self, record):
+        """record thuộc danh sách đang xem (chế độ, nhóm, người được giao)?"""
+        if self.view_mode == 'personal':
+            return not record.is_group
+        return (record.is_group and record.group_id == self.group_id
+                and self._assignee_filter in (None, record.assignee_id))
+
+    def _on_task_added(self, record):
+        """TaskRepository.task_added: chèn đúng một dòng vào vị trí của nó."""
+        if not self._accepts(record):
+            return
+        self._insert_task(record)
+        self.reminders.schedule(record.task_id, record.title, record.due_epoch)
+
+    def _on_task_updated(self, record):
+        """TaskRepository.task_updated: dời dòng tới vị trí mới hoặc gỡ/chèn theo bộ lọc."""
+        if record.is_group != (self.view_mode == 'group'):
+            return
+        model = self.task_list_view.task_model
+        task = model.task_by_id(record.task_id)
+        if task is None:
+            if record.title and self._accepts(record):
+                self._insert_task(record)
+        else:
+            task.is_done = record.is_done
+            if self._matches_current_filter(task):
+                model.reposition_task(task.task_id)
+            elif model.remove_task(task.task_id) is not None:
+                self.total_tasks = max(0, self.total_tasks - 1)
+            self._update_task_count()
+        if record.is_done:
+            self.reminders.cancel(record.task_id)
+        elif task is not None or self._accepts(record):
+            self.reminders.schedule(record.task_id, record.title, record.due_epoch)
+
+    def _on_task_deleted(self, task_id, is_group):
+        """TaskRepository.task_deleted: gỡ dòng và nhắc nhở của task."""
+        if is_group != (self.view_mode == 'group'):
+            return
+        self.reminders.cancel(task_id)
+        self.meta.pop(task_id, None)
+        self.history.pop(task_id, None)
+        if self.task_list_view.remove_task(task_id) is not None:
+            self.total_tasks = max(0, self.total_tasks - 1)
+        self._update_task_count()
+
+    def _matches_current_filter(self, task):
+        if (self.filter_status == "pending" and task.is_done) or (self.filter_status == "done" and not task.is_done):
+            return False
+        if self.search_text and not search_tokens(self.search_text):
+            # chuỗi không có từ nào -> DB tìm bằng LIKE (chuỗi con)
+            needle = self.search_text.lower()
+            return needle in task.title.lower() or needle in task.note.lower()
+        return matches_search(self.search_text, task.title, task.note)
+
     def _handle_toggle_task(self, task_id):
-        task = next((t for t in self.tasks if t['id'] == task_id), None)
-        if not task: return
+        model = self.task_list_view.task_model
+        task = model.task_by_id(task_id)
+        if task is None: return
         
-        # Kiểm tra nếu task ở quá khứ và ngăn toggling
-        if task.get('due_at'):
-            try:
-                due_date = self._parse_iso_datetime(task['due_at'])
-                if due_date and due_date < datetime.now():
-                    QMessageBox.warning(self, "Không thể thay đổi", "Không thể thay đổi trạng thái công việc đã quá hạn.")
-                    return
-            except Exception:
-                pass
+        # Kiểm tra nếu task ở quá khứ và ngăn toggling (due_epoch đã parse sẵn khi tải)
+        if task.due_epoch is not None and task.due_epoch < time.time():
+            QMessageBox.warning(self, "Không thể thay đổi", "Không thể thay đổi trạng thái công việc đã quá hạn.")
+            return
         
-        new_status = not task['is_done']
+        new_status = not task.is_done
         try:
-            if self.view_mode == 'personal':
-                self.db.update_task_status(int(task_id), int(new_status))
-            elif self.view_mode == 'group':
-                self.db.update_group_task_status(int(task_id), int(new_status))
-                # cũng refresh lịch nếu visible
-                try:
-                    win = self.window()
-                    cw = getattr(win, 'calendar_widget', None)
-                    if cw and getattr(cw, 'current_view_mode', '') == 'group':
-                        try:
-                            cw.refresh_day(datetime.strptime(task.get('due_at') or '', '%Y-%m-%d %H:%M:%S').day if task.get('due_at') else None)
-                        except Exception:
-                            try:
-                                cw.populate_calendar()
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-
-            task['is_done'] = new_status
-            self.render_tasks()
+            # danh sách, lịch và nhắc nhở cập nhật qua tín hiệu task_updated
+            self.repo.set_done(task_id, new_status, is_group=self.view_mode == 'group')
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật trạng thái: {e}")
 
@@ -615,7 +515,7 @@ class DoNowView(QWidget):
                         return
                 except Exception:
                     pass
-                self.db.delete_task(int(task_id))
+                self.repo.delete(int(task_id))
             elif self.view_mode == 'group':
                 # chỉ group leader có thể xóa task nhóm
                 try:
@@ -626,49 +526,82 @@ class DoNowView(QWidget):
                 except Exception:
                     QMessageBox.warning(self, 'Lỗi', 'Không thể kiểm tra quyền xóa.')
                     return
-                self.db.delete_group_task(int(task_id))
-            
-            self.tasks = [t for t in self.tasks if t['id'] != task_id]
-            if task_id in self.meta: del self.meta[task_id]
-            if task_id in self.history: del self.history[task_id]
-            self.render_tasks()
-            # thông báo calendar refresh
-            try:
-                win = self.window()
-                cw = getattr(win, 'calendar_widget', None)
-                if cw and getattr(cw, 'current_view_mode', '') == 'group':
-                    try:
-                        cw.populate_calendar()
-                    except Exception:
-                        pass
-            except Exception:
-                pass
+                self.repo.delete(int(task_id), is_group=True)
+            else:
+                return
+            # dòng, nhắc nhở và ô lịch được gỡ qua tín hiệu task_deleted
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể xóa nhiệm vụ: {e}")
 
     # _handle_start_task removed: start functionality deprecated/removed
 
     def _handle_search_change(self, text):
-        self.search_text = text; self.page = 1; self.render_tasks()
+        # QLineEdit vẫn nhận mọi phím; chỉ lần gõ cuối cùng trong khoảng debounce được truy vấn
+        self._search_timer.start()
+
+    def _apply_search(self):
+        """Chạy tìm kiếm cho nội dung hiện tại của ô search.
+
+        Nếu chuỗi mới chỉ gõ thêm vào chuỗi cũ và danh sách hiện tại đã chứa đủ mọi
+        kết quả của chuỗi cũ, lọc lại ngay trong bộ nhớ thay vì hỏi lại DB.
+        """
+        self._search_timer.stop()
+        text = self.search_input.text()
+        if text == self.search_text:
+            return
+        if self._can_refine_search(text):
+            previous_query = self._page_query
+            self.search_text = text
+            refined = [t for t in self.tasks if matches_search(text, t.title, t.note)]
+            self.total_tasks = len(refined)
+            self._page_query = previous_query[:3] + (text,) + previous_query[4:]
+            self.render_tasks(refined)
+            return
+        self.load_data_from_db()
+
+    def _can_refine_search(self, text):
+        if self._page_query is None or self._page_cursor is not None:
+            return False  # chưa tải hết kết quả của truy vấn trước
+        if self.db_worker.is_pending(self._load_request):
+            return False  # danh sách đang hiển thị chưa phải kết quả mới nhất
+        mode, group_id, status, previous, sort = self._page_query
+        if (mode, group_id, status, sort) != (self.view_mode, self.group_id, self.filter_status, self.sort_order):
+            return False
+        return is_refinement(previous, text)
 
     def _handle_filter_change(self, index):
         self.filter_status = {0: "all", 1: "pending", 2: "done"}.get(index)
-        self.page = 1; self.render_tasks()
-        
-    def _handle_page_change(self, delta):
-        self.page = max(1, self.page + delta); self.render_tasks()
+        self.load_data_from_db()
         
-    def _check_deadlines(self):
-        now_utc = datetime.utcnow()
-        for task in self.tasks:
-            if not task['is_done'] and task['due_at']:
-                try:
-                    due_date = self._parse_iso_datetime(task['due_at'])
-                    if due_date is None:
-                        continue
-                    time_left = due_date - now_utc
-                    if timedelta(minutes=0) < time_left <= timedelta(minutes=15):
-                        QMessageBox.warning(self, "Deadline Reminder", f"Task sắp đến hạn: {task['title']}\nCòn khoảng {time_left.seconds // 60} phút.")
-                except Exception:
-                    continue
+    def _reload_reminders(self):
+        """Nạp lại các task chưa xong có hạn trong REMINDER_HORIZON_HOURS tới vào scheduler."""
+        self.db_worker.cancel(self._reminder_request)
+        self._reminder_scope = (self.view_mode, self.group_id)
+        if self.view_mode == 'group' and not self.group_id:
+            self._reminder_request = None
+            self.reminders.clear()
+            return
+        now = datetime.now()
+        start = now.strftime('%Y-%m-%d %H:%M:%S')
+        end = (now + timedelta(hours=REMINDER_HORIZON_HOURS)).strftime('%Y-%m-%d %H:%M:%S')
+        self._reminder_request = self.db_worker.submit(
+            self._fetch_reminders, self._reminder_scope, start, end,
+            on_result=self._on_reminders_loaded)
+
+    def _fetch_reminders(self, scope, start, end):
+        """Chạy trên worker thread: [(task_id, title, due_epoch)] cho scheduler."""
+        mode, group_id = scope
+        if mode == 'group':
+            rows = self.db.get_tasks_due_between(self.user_id, start, end, group_id=group_id,
+                                                 assignee_id=self._assignee_filter_for(group_id))
+        else:
+            rows = self.db.get_tasks_due_between(self.user_id, start, end)
+        return [(task_id, title, parse_due_epoch(due_at)) for task_id, title, due_at in rows]
+
+    def _on_reminders_loaded(self, items):
+        self._reminder_request = None
+        self.reminders.set_reminders(items)
 
+    def _show_deadline_reminder(self, task_id, title, due_epoch):
+        minutes_left = max(0, int((due_epoch - time.time()) // 60))
+        show_toast(self, "Deadline Reminder", f"Task sắp đến hạn: {title}\nCòn khoảng {minutes_left} phút.")
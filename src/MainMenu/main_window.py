@@ -7,16 +7,18 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, 
                              QVBoxLayout, QLabel, QMessageBox, 
                              QSizePolicy, QStackedWidget, QDialog)
-from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QGuiApplication
-import shutil
+import logging
 from pathlib import Path
 
 # --- Nhập các module và widget tùy chỉnh của dự án ---
+# CalendarWidget / StatisticsPage được import khi trang tương ứng được dựng (xem _page)
 from MainMenu.side_panel import SidePanel
-from MainMenu.calendar_widget import CalendarWidget
-from MainMenu.statistics_page import StatisticsPage
+from MainMenu.avatar_utils import ingest_avatar, load_avatar_pixmap
 from Managers.database_manager import Database
+from Managers.db_worker import get_db_worker
+from Managers.task_repository import TaskRepository
 from MainMenu.home_page import DoNowView
 from MainMenu.group_dialogs import GroupSelectionDialog, MemberListDialog, AddMemberDialog
 from config import *
@@ -65,7 +67,6 @@ STYLESHEET = """
     #ExitButton:hover { background-color: #ffcccc; }
     
     /* --- CSS cho các thành phần trong CalendarWidget --- */
-    DayWidget { background-color: #ffffff; border: 1px solid #e0e0e0; border-radius: 4px; }
     TaskWidget { background-color: white; border: 1px solid #d0d0d0; border-radius: 8px; padding: 5px; margin-bottom: 3px; }
     #WeekDayLabel { font-weight: bold; color: #555; padding-bottom: 5px; }
     #DateLabel { font-size: 11px; font-weight: bold; padding: 2px; color: #333; }
@@ -125,6 +126,11 @@ class MainWindow(QMainWindow):
 
         # Tạo một đối tượng quản lý CSDL duy nhất để chia sẻ cho các widget con
         self.db = Database()
+        # Worker nền dùng chung cho các truy vấn đọc (không chặn GUI thread)
+        self.db_worker = get_db_worker()
+        self._stats_request = None
+        # Kho task dùng chung: trang chủ và lịch ghi qua đây và nghe tín hiệu thay đổi của nó
+        self.task_repo = TaskRepository(self.db, self)
 
 
          # Cài đặt thuộc tính cơ bản cho cửa sổ
@@ -189,17 +195,19 @@ class MainWindow(QMainWindow):
         right_panel_layout.addWidget(self.content_stack)
         self.main_layout.addLayout(right_panel_layout, 1)
 
-        # Khu vực trang chủ
-        self.home_widget = DoNowView(self.user_id, db=self.db)
-        self.content_stack.addWidget(self.home_widget)
+        # Các trang của content_stack: tên -> hàm dựng. Trang được dựng khi lần
+        # đầu cần tới (_page); lịch và thống kê được dựng sẵn lúc rảnh sau khi
+        # cửa sổ hiện ra (_warm_up_pages), nên mở cửa sổ chỉ tốn chi phí trang chủ.
+        self._page_factories = {
+            'home': self._build_home_page,
+            'calendar': self._build_calendar_page,
+            'statistics': self._build_statistics_page,
+        }
+        self._pages = {}
+        self._warm_up_queue = ['calendar', 'statistics']
 
-        # Khu vực thống kê
-        self.statistics_page = StatisticsPage()
-        self.content_stack.addWidget(self.statistics_page)
-
-        # Khu vực lịch
-        self.calendar_widget = CalendarWidget(self.user_id, self.db)
-        self.content_stack.addWidget(self.calendar_widget)
+        # Khu vực trang chủ (trang mặc định nên dựng ngay)
+        self.home_widget = self._page('home')
 
         # Mặc định hiển thị trang chủ
         self.content_stack.setCurrentWidget(self.home_widget)
@@ -220,6 +228,56 @@ class MainWindow(QMainWindow):
         # Sau khi đã thiết lập SidePanel, cố gắng load avatar nếu đã tồn tại
         self.load_user_avatar_if_exists()
     
+    # ----- Trang nội dung (dựng khi cần) -----
+
+    def _page(self, name):
+        """Trang `name` của content_stack, dựng và thêm vào stack ở lần gọi đầu."""
+        page = self._pages.get(name)
+        if page is None:
+            page = self._page_factories[name]()
+            self._pages[name] = page
+            self.content_stack.addWidget(page)
+            if name in self._warm_up_queue:
+                self._warm_up_queue.remove(name)
+        return page
+
+    @property
+    def calendar_widget(self):
+        return self._page('calendar')
+
+    @property
+    def statistics_page(self):
+        return self._page('statistics')
+
+    def _build_home_page(self):
+        return DoNowView(self.user_id, db=self.db, repository=self.task_repo)
+
+    def _build_calendar_page(self):
+        from MainMenu.calendar_widget import CalendarWidget
+
+        calendar = CalendarWidget(self.user_id, self.db, repository=self.task_repo)
+        # giữ cùng giới hạn chiều rộng showEvent đã đặt cho content_stack
+        if self.content_stack.maximumWidth() < calendar.maximumWidth():
+            calendar.setMaximumWidth(self.content_stack.maximumWidth())
+        return calendar
+
+    def _build_statistics_page(self):
+        from MainMenu.statistics_page import StatisticsPage
+
+        return StatisticsPage()
+
+    def _warm_up_pages(self):
+        """Dựng lần lượt các trang chưa dựng, mỗi lượt rảnh một trang để không khựng UI."""
+        if not self._warm_up_queue or self._is_logging_out:
+            return
+        try:
+            self._page(self._warm_up_queue[0])
+        except Exception:
+            logging.exception("[MAIN WINDOW] lỗi dựng sẵn trang %s", self._warm_up_queue[0])
+            self._warm_up_queue.pop(0)
+        if self._warm_up_queue:
+            QTimer.singleShot(0, self._warm_up_pages)
+
     def vi_tri_screen(self):
         """Chỉnh cửa sổ chính phù hợp vị trí màn hình."""
         screen = QGuiApplication.primaryScreen()
@@ -238,6 +296,8 @@ class MainWindow(QMainWindow):
             self.vi_tri_screen()
         except Exception:
             pass
+        if PAGE_WARM_UP_DELAY_MS > 0 and self._warm_up_queue:
+            QTimer.singleShot(PAGE_WARM_UP_DELAY_MS, self._warm_up_pages)
         try:
             # Bảo vệ chống lại các widget con yêu cầu sizeHints quá lớn bằng cách
             # giới hạn khu vực nội dung theo chiều rộng màn hình có sẵn trừ đi thanh bên.
@@ -255,8 +315,10 @@ class MainWindow(QMainWindow):
                     except Exception:
                         pass
                     try:
-                        if hasattr(self, 'calendar_widget') and self.calendar_widget:
-                            self.calendar_widget.setMaximumWidth(avail)
+                        # chỉ chỉnh lịch nếu đã dựng (không dựng trang chỉ để giới hạn)
+                        calendar = self._pages.get('calendar')
+                        if calendar is not None:
+                            calendar.setMaximumWidth(avail)
                     except Exception:
                         pass
                 except Exception:
@@ -367,7 +429,6 @@ class MainWindow(QMainWindow):
                 self.calendar_widget.switch_view_mode('personal')
             except Exception:
                 pass
-            self.load_personal_tasks()
 
     def _handle_group_view(self):
         """Mở dialog cho người dùng chọn nhóm, rồi set group context khi có lựa chọn."""
@@ -377,11 +438,10 @@ class MainWindow(QMainWindow):
             self._load_group_context(group_id, group_name)
             
             # Sau khi chọn nhóm, load dữ liệu tùy thuộc vào trang đang hiển thị
+            # (lịch đã tự tải tháng trong _load_group_context -> switch_view_mode)
             if self.current_content == 'home':
                 self.home_widget.user_id = self.user_id
                 self.home_widget.load_data()
-            elif self.current_content == 'calendar':
-                self.load_group_tasks(group_id)
         else: # Nếu người dùng hủy hoặc không chọn nhóm, quay lại view cũ
             is_leader = self.is_leader_of_current_group if self.current_view == 'group' else False
             self.side_panel.update_view(self.current_view, is_leader)
@@ -416,20 +476,18 @@ class MainWindow(QMainWindow):
         is_leader = self.is_leader_of_current_group if self.current_view == 'group' else False
         self.side_panel.update_view(self.current_view, is_leader)
         
-        # Cập nhật dữ liệu cho lịch
+        # Cập nhật dữ liệu cho lịch: switch_view_mode lấy tháng từ cache hoặc tự gửi truy vấn
         if self.current_view == 'personal':
             try:
                 self.calendar_widget.switch_view_mode('personal')
             except Exception:
                 pass
-            self.load_personal_tasks()
         elif self.current_view == 'group' and self.current_group_id:
             try:
                 self.calendar_widget.set_group_context(self.current_group_id)
                 self.calendar_widget.switch_view_mode('group')
             except Exception:
                 pass
-            self.load_group_tasks(self.current_group_id)
 
     def _show_member_list(self):
         if self.current_group_id:
@@ -442,148 +500,67 @@ class MainWindow(QMainWindow):
             dialog.member_added.connect(self.home_widget._populate_member_selector)
             dialog.exec_()
 
-    def load_personal_tasks(self):
-        """
-            Tải và hiển thị các công việc cá nhân từ cơ sở dữ liệu.
-        """
-        tasks_by_day = {}
-        try:
-            month_str = self.calendar_widget.current_date.strftime('%Y-%m')
-            tasks = self.db.get_tasks_for_user_month(self.user_id, month_str)
-            for task in tasks:
-                # task: (task_id, title, is_done, note, due_at)
-                task_id, title, is_done, note, due_at_str = task
-                if due_at_str:
-                    task_date = QDate.fromString(due_at_str[:10], "yyyy-MM-dd")
-                    if task_date.year() == self.calendar_widget.current_date.year and \
-                       task_date.month() == self.calendar_widget.current_date.month:
-                        day = task_date.day()
-                        if day not in tasks_by_day:
-                            tasks_by_day[day] = []
-                        tasks_by_day[day].append({'task_id': task_id, 'title': title, 'is_done': is_done, 'note': note, 'due_at': due_at_str})
-
-            # Cũng bao gồm các task nhóm được giao cho user này trong cùng tháng
-            # Chế độ xem cá nhân chỉ nên hiển thị các task cá nhân.
-            # Không bao gồm task nhóm ở đây; task nhóm được hiển thị qua chế độ xem nhóm.
-            self.calendar_widget.populate_calendar(tasks_by_day)
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi CSDL", f"Lỗi khi tải công việc cá nhân: {e}")
+    def _fetch_statistics(self):
+        """Chạy trên worker thread: (thống kê cá nhân, danh sách thống kê theo nhóm).
 
-    def load_group_tasks(self, group_id):
+        Mỗi dict có thêm 'trend': số task chưa xong đến hạn theo ngày (sparkline).
         """
-            Tải và hiển thị các công việc nhóm từ cơ sở dữ liệu.
-        """
-        tasks_by_day = {}
-        try:
-            month_str = self.calendar_widget.current_date.strftime('%Y-%m')
-            all_tasks = self.db.get_group_tasks_for_month(group_id, month_str)
-            # Xác định xem user hiện tại có phải là leader của nhóm này không
-            try:
-                leader_id = self.db.get_group_leader(group_id)
-            except Exception:
-                leader_id = None
-
-            for task in all_tasks:
-                # (task_id, group_id, assignee_id, title, note, is_done, due_at)
-                task_id, group_id, assignee_id, title, note, is_done, due_at_str = task
-                # Nếu user hiện tại không phải leader, chỉ bao gồm các task được giao cho user này
-                if leader_id is None or self.user_id != leader_id:
-                    if assignee_id is None or assignee_id != self.user_id:
-                        continue
-                if due_at_str:
-                    task_date = QDate.fromString(due_at_str[:10], "yyyy-MM-dd")
-                    if task_date.year() == self.calendar_widget.current_date.year and \
-                       task_date.month() == self.calendar_widget.current_date.month:
-                        day = task_date.day()
-                        if day not in tasks_by_day:
-                            tasks_by_day[day] = []
-                        assignee_name = self.db.get_user_name(assignee_id) or "Chưa phân công"
-                        tasks_by_day[day].append({
-                            'task_id': task_id,
-                            'title': title,
-                            'is_done': is_done,
-                            'note': note,
-                            'due_at': due_at_str,
-                            'assignee_name': assignee_name,
-                            'assignee_id': assignee_id
-                        })
-
-            self.calendar_widget.populate_calendar(tasks_by_day)
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi CSDL", f"Lỗi khi tải công việc nhóm: {e}")
+        personal = self.db._get_personal_completion_stats(self.user_id)
+        groups = self.db._get_stats_per_group(self.user_id)
+        personal['trend'], group_trends = self.db.get_open_due_trend(self.user_id, STATS_TREND_DAYS)
+        for group in groups:
+            group['trend'] = group_trends.get(group['group_id'], [0] * STATS_TREND_DAYS)
+        return personal, groups
 
     def show_statistics_page(self):
         """
         Hiển thị trang thống kê công việc cá nhân VÀ chi tiết từng nhóm.
+        Số liệu được tính ở worker nền; trang được cập nhật khi có kết quả.
+        Luôn tính lại mỗi lần mở: phần quá hạn/chưa tới hạn đổi theo giờ và
+        thành viên nhóm khác có thể đã ghi (các bộ đếm task_stats đọc rất rẻ).
         """
         
         if self.current_view != 'personal':
             self._handle_personal_view()
 
-        # 1. Lấy dữ liệu thống kê cá nhân
-        personal_stats_data = self.db._get_personal_completion_stats(self.user_id)
+        def on_result(result):
+            self._stats_request = None
+            # Cập nhật toàn bộ giao diện thống kê
+            personal_stats_data, group_stats_list = result
+            self.statistics_page.update_all_stats(personal_stats_data, group_stats_list)
 
-        # 2. Lấy danh sách dữ liệu thống kê của từng nhóm
-        group_stats_list = self.db._get_stats_per_group(self.user_id)
+        def on_error(e):
+            self._stats_request = None
+            QMessageBox.critical(self, "Lỗi CSDL", f"Không thể tải thống kê: {e}")
 
-        # 3. Cập nhật toàn bộ giao diện thống kê
-        self.statistics_page.update_all_stats(personal_stats_data, group_stats_list)
-        
-        # 4. Hiển thị trang thống kê
+        self.db_worker.cancel(self._stats_request)
+        self._stats_request = self.db_worker.submit(self._fetch_statistics, on_result=on_result, on_error=on_error)
+
+        # Hiển thị trang thống kê ngay, số liệu sẽ được điền khi truy vấn xong
         self.content_stack.setCurrentWidget(self.statistics_page)
 
     def _on_avatar_changed(self, src_path: str):
         """
-        Sao chép ảnh đại diện người dùng từ src_path vào thư mục assets/avatars
-        với tên định dạng user_{user_id}.ext (giữ nguyên đuôi gốc).
-        Nếu đã có ảnh đại diện cho user_id, ghi đè lên.
+        Lưu ảnh đại diện người dùng chọn (src_path) vào assets/avatars qua
+        avatar_utils.ingest_avatar: ảnh được thu nhỏ, thay ảnh cũ của user_id và
+        tạo sẵn thumbnail tròn ở các cỡ UI dùng (AVATAR_THUMB_SIZES).
         """
         try:
-            src = Path(src_path)
-            if not src.exists():
+            if not Path(src_path).exists():
                 return
-            avatars_dir = Path(__file__).resolve().parents[2] / 'src' / 'assets' / 'avatars'
-            avatars_dir.mkdir(parents=True, exist_ok=True)
-            # Xóa bất kỳ file avatar nào hiện có cho user này (các extension khác nhau)
-            for old in avatars_dir.glob(f'user_{self.user_id}.*'):
-                old.unlink()
-            ext = src.suffix.lower() or '.png'
-            dest = avatars_dir / f'user_{self.user_id}{ext}'
-            # Sao chép avatar mới vào vị trí
-            shutil.copyfile(str(src), str(dest))
-            try:
-                # Yêu cầu side panel hiển thị avatar vừa lưu
-                self.side_panel.set_avatar_from_path(str(dest))
-            except Exception:
-                pass
+            ingest_avatar(self.user_id, src_path)
+            # Yêu cầu side panel hiển thị avatar vừa lưu (đọc từ thumbnail)
+            self.load_user_avatar_if_exists()
         except Exception as e:
             QMessageBox.warning(self, "Lỗi lưu ảnh", f"Không thể lưu ảnh đại diện: {e}")
 
     def load_user_avatar_if_exists(self):
         """
-        Trên hệ thống tệp, tìm ảnh đại diện cho user_id trong assets/avatars.
-        Nếu tìm thấy, tải ảnh này vào SidePanel.
+        Tải avatar tròn của user_id (thumbnail cỡ SidePanel nếu đã có) vào SidePanel.
         """
         try:
-            avatars_dir = Path(__file__).resolve().parents[2] / 'src' / 'assets' / 'avatars'
-            if not avatars_dir.exists():
-                return
-            # tìm bất kỳ extension nào (png/jpg/jpeg/bmp)
-            pattern = f'user_{self.user_id}.*' 
-            matches = list(avatars_dir.glob(f'user_{self.user_id}.*'))
-            if not matches:
-                return
-            # Ưu tiên các định dạng phổ biến theo thứ tự
-            preferred = None
-            for ext in ['.png', '.jpg', '.jpeg', '.bmp']:
-                for m in matches:
-                    if m.suffix.lower() == ext:
-                        preferred = m
-                        break
-                if preferred:
-                    break
-            if not preferred:
-                preferred = matches[0]
-            self.side_panel.set_avatar_from_path(str(preferred))
+            pixmap = load_avatar_pixmap(self.user_id, size=AVATAR_PANEL_SIZE)
+            if pixmap is not None:
+                self.side_panel.set_avatar_pixmap(pixmap)
         except Exception:
             pass
\ No newline at end of file
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+    Cache LRU cho dữ liệu lịch theo tháng.
+
+    Mỗi entry là dict tasks_by_day (ngày -> list TaskRecord) mà CalendarWidget
+    dùng để vẽ lưới, với khóa (chế độ xem, user/group id, 'YYYY-MM'). Lật qua lại
+    giữa các tháng đã xem (hoặc đã prefetch) không phải truy vấn DB lần nữa.
+"""
+from collections import OrderedDict
+
+
+class MonthTaskCache:
+    """LRU tối đa `capacity` tháng.
+
+    Ghi vào DB phải cập nhật cache bằng add_task/update_task/remove_task với
+    đúng dòng vừa ghi. Mỗi lần thay đổi như vậy tăng `generation`; kết quả
+    truy vấn gửi đi trước đó mang generation cũ nên put() bỏ qua, tránh ghi
+    đè dữ liệu vừa cập nhật bằng bản cũ.
+    """
+
+    def __init__(self, capacity=12):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """tasks_by_day của key (đánh dấu vừa dùng) hoặc None nếu chưa có."""
+        tasks = self._entries.get(key)
+        if tasks is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return tasks
+
+    def put(self, key, tasks_by_day, generation=None):
+        """Lưu tasks_by_day; trả về False nếu kết quả đã cũ (generation khác)."""
+        if generation is not None and generation != self.generation:
+            return False
+        self._entries[key] = tasks_by_day
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return True
+
+    def peek(self, key):
+        """Như get() nhưng không đổi thứ tự LRU và không tính hit/miss."""
+        return self._entries.get(key)
+
+    def add_task(self, key, day, task):
+        """Thêm task vừa ghi vào tháng key (nếu tháng đó đang có trong cache)."""
+        self.generation += 1
+        tasks_by_day = self._entries.get(key)
+        if tasks_by_day is not None:
+            tasks_by_day.setdefault(day, []).append(task)
+        return tasks_by_day
+
+    def update_task(self, mode, task_id, **fields):
+        """Sửa tại chỗ các trường của task_id trong mọi tháng của mode; trả về số bản ghi đã sửa."""
+        self.generation += 1
+        updated = 0
+        for task in self._iter_task(mode, task_id):
+            for name, value in fields.items():
+                setattr(task, name, value)
+            updated += 1
+        return updated
+
+    def remove_task(self, mode, task_id):
+        """Bỏ task_id khỏi mọi tháng của mode; trả về số bản ghi đã bỏ."""
+        self.generation += 1
+        removed = 0
+        for (key_mode, _owner, _month), tasks_by_day in self._entries.items():
+            if key_mode != mode:
+                continue
+            for day, tasks in tasks_by_day.items():
+                kept = [t for t in tasks if t.task_id != task_id]
+                if len(kept) != len(tasks):
+                    removed += len(tasks) - len(kept)
+                    tasks_by_day[day] = kept
+        return removed
+
+    def _iter_task(self, mode, task_id):
+        for (key_mode, _owner, _month), tasks_by_day in self._entries.items():
+            if key_mode != mode:
+                continue
+            for tasks in tasks_by_day.values():
+                for task in tasks:
+                    if task.task_id == task_id:
+                        yield task
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self):
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+    Lưới lịch tháng vẽ bằng QPainter.
+
+    Một widget duy nhất vẽ tiêu đề tuần, các ô ngày và badge task; tự hit-test
+    cho click, double-click, context menu và tooltip. Không có QObject nào cho
+    từng ô hay từng task, nên tháng nhóm nhiều task vẫn vẽ tức thì và đổi
+    trạng thái một task chỉ vẽ lại đúng ô chứa nó.
+"""
+import calendar
+from datetime import date
+
+from PyQt5.QtWidgets import QWidget, QMenu, QToolTip
+from PyQt5.QtCore import Qt, QEvent, QRectF, QSize, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QFontMetrics, QLinearGradient
+
+from config import CALENDAR_BG_GRADIENT_START, CALENDAR_BG_GRADIENT_END
+
+WEEKDAY_NAMES = ["Chủ Nhật", "Thứ Hai", "Thứ Ba", "Thứ Tư", "Thứ Năm", "Thứ Sáu", "Thứ Bảy"]
+
+HEADER_HEIGHT = 36
+CELL_SPACING = 10
+CELL_PADDING = 6
+DATE_HEIGHT = 22
+BADGE_HEIGHT = 28
+BADGE_SPACING = 4
+BADGE_RADIUS = 10
+CHECK_SIZE = 18
+MARKER_SIZE = 18
+
+COLOR_PERSONAL = "#66bb6a"
+COLOR_ASSIGNED = "#5c6bc0"
+COLOR_DONE = "#bdbdbd"
+COLOR_CELL_BORDER = "#cde7f5"
+COLOR_CELL_HOVER = "#4A90E2"
+COLOR_TODAY = QColor(255, 0, 0, 60)
+COLOR_HEADER_TEXT = "#02457a"
+COLOR_HEADER_START = "#bfe9ff"
+COLOR_HEADER_END = "#e6f7ff"
+COLOR_DATE_TEXT = "#2E3A4B"
+COLOR_OVERFLOW_BG = "#f5f5f5"
+COLOR_OVERFLOW_TEXT = "#444444"
+
+# Chủ nhật là cột đầu tiên, giống lưới cũ
+_MONTH_CALENDAR = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+
+class MonthGridView(QWidget):
+    """Lưới tháng: 7 cột (Chủ Nhật đầu tuần), 4–6 hàng tùy tháng.
+
+    Dữ liệu là list TaskRecord theo ngày (Managers.task_records). Mỗi ô hiện
+    nhiều badge nhất có thể theo chiều cao, phần còn lại gộp thành "+N".
+    Tương tác được báo ra ngoài bằng tín hiệu; widget không truy cập DB.
+    """
+    day_clicked = pyqtSignal(int)              # click ô trống / số ngày / "+N"
+    task_toggle_requested = pyqtSignal(object)  # click ô check của badge
+    task_activated = pyqtSignal(object)        # double-click badge
+    task_delete_requested = pyqtSignal(object)  # context menu trên badge
+    add_task_requested = pyqtSignal(int)       # context menu trên ô
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setMinimumSize(7 * 48 + 6 * CELL_SPACING, 360)
+        self._year = self._month = None
+        self._positions = {}        # day -> (row, col)
+        self._rows = 5
+        self._tasks_by_day = {}     # day -> [TaskRecord]
+        self._day_by_task = {}      # task_id -> day
+        self._today = date.today()
+        self._hover = None          # (day, task_id, part)
+
+    # ----- dữ liệu -----
+
+    def set_month(self, year, month):
+        """Chuyển sang tháng khác; xóa hết task đang hiển thị."""
+        self._year, self._month = year, month
+        weeks = _MONTH_CALENDAR.monthdayscalendar(year, month)
+        self._rows = len(weeks)
+        self._positions = {day: (row, col) for row, week in enumerate(weeks)
+                           for col, day in enumerate(week) if day}
+        self._tasks_by_day.clear()
+        self._day_by_task.clear()
+        self._today = date.today()
+        self._hover = None
+        self.update()
+
+    def set_tasks(self, tasks_by_day):
+        """Thay task của các ngày có trong tasks_by_day rồi vẽ lại một lần."""
+        for day, day_tasks in tasks_by_day.items():
+            self._store_day(day, day_tasks)
+        self.update()
+
+    def set_day_tasks(self, day, day_tasks):
+        """Thay toàn bộ task của một ngày và chỉ vẽ lại ô đó."""
+        self._store_day(day, day_tasks)
+        self._update_day(day)
+
+    def set_task_done(self, task_id, is_done):
+        """Đổi trạng thái một task đang hiển thị; trả về False nếu không có trên lưới."""
+        task = self.task(task_id)
+        if task is None:
+            return False
+        task.is_done = bool(is_done)
+        self._update_day(self._day_by_task[task_id])
+        return True
+
+    def day_tasks(self, day):
+        return list(self._tasks_by_day.get(day, ()))
+
+    def task(self, task_id):
+        """TaskRecord đang hiển thị với task_id (kể cả task bị gộp vào "+N"), hoặc None."""
+        day = self._day_by_task.get(task_id)
+        if day is None:
+            return None
+        for task in self._tasks_by_day.get(day, ()):
+            if task.task_id == task_id:
+                return task
+        return None
+
+    def day_of_task(self, task_id):
+        return self._day_by_task.get(task_id)
+
+    def _store_day(self, day, day_tasks):
+        if day not in self._positions:
+            return
+        for task in self._tasks_by_day.pop(day, ()):
+            if self._day_by_task.get(task.task_id) == day:
+                del self._day_by_task[task.task_id]
+        tasks = list(day_tasks or ())
+        if tasks:
+            self._tasks_by_day[day] = tasks
+            for task in tasks:
+                self._day_by_task[task.task_id] = day
+
+    def _update_day(self, day):
+        if day in self._positions:
+            self.update(self._cell_rect(*self._positions[day]).toAlignedRect().adjusted(-2, -2, 2, 2))
+
+    # ----- hình học -----
+
+    def sizeHint(self):
+        return QSize(980, 760)
+
+    def _column_width(self):
+        return (self.width() - 6 * CELL_SPACING) / 7.0
+
+    def _cell_rect(self, row, col):
+        top = HEADER_HEIGHT + CELL_SPACING
+        width = self._column_width()
+        height = (self.height() - top - (self._rows - 1) * CELL_SPACING) / float(self._rows)
+        return QRectF(col * (width + CELL_SPACING), top + row * (height + CELL_SPACING), width, height)
+
+    def _cell_layout(self, rect, tasks):
+        """(list (task, badge_rect) được hiện, rect của "+N" hoặc None, số task bị ẩn)."""
+        top = rect.top() + CELL_PADDING + DATE_HEIGHT
+        available = rect.bottom() - CELL_PADDING - top
+        slots = max(1, int((available + BADGE_SPACING) // (BADGE_HEIGHT + BADGE_SPACING)))
+        shown = tasks if len(tasks) <= slots else tasks[:slots - 1]
+        width = rect.width() - 2 * CELL_PADDING
+        step = BADGE_HEIGHT + BADGE_SPACING
+        badges = [(task, QRectF(rect.left() + CELL_PADDING, top + i * step, width, BADGE_HEIGHT))
+                  for i, task in enumerate(shown)]
+        hidden = len(tasks) - len(shown)
+        overflow = QRectF(rect.left() + CELL_PADDING, top + len(shown) * step, width, BADGE_HEIGHT) if hidden else None
+        return badges, overflow, hidden
+
+    @staticmethod
+    def _check_rect(badge_rect):
+        return QRectF(badge_rect.right() - 6 - CHECK_SIZE, badge_rect.center().y() - CHECK_SIZE / 2.0,
+                      CHECK_SIZE, CHECK_SIZE)
+
+    def hit_test(self, pos):
+        """(day, task, part) dưới pos; part là 'check', 'badge', 'overflow' hoặc 'cell'.
+
+        None nếu pos không nằm trên ô nào của tháng.
+        """
+        if pos.y() < HEADER_HEIGHT + CELL_SPACING:
+            return None
+        width = self._column_width()
+        col = int(pos.x() // (width + CELL_SPACING))
+        if not 0 <= col < 7:
+            return None
+        for day, (row, day_col) in self._positions.items():
+            if day_col != col:
+                continue
+            rect = self._cell_rect(row, col)
+            if not rect.contains(pos):
+                continue
+            badges, overflow, _hidden = self._cell_layout(rect, self._tasks_by_day.get(day, []))
+            for task, badge_rect in badges:
+                if badge_rect.contains(pos):
+                    part = 'check' if self._check_rect(badge_rect).adjusted(-3, -3, 3, 3).contains(pos) else 'badge'
+                    return day, task, part
+            if overflow is not None and overflow.contains(pos):
+                return day, None, 'overflow'
+            return day, None, 'cell'
+        return None
+
+    # ----- vẽ -----
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        dirty = QRectF(event.rect())
+        if dirty.top() < HEADER_HEIGHT:
+            self._paint_header(painter)
+        for day, (row, col) in self._positions.items():
+            rect = self._cell_rect(row, col)
+            if rect.intersects(dirty):
+                self._paint_cell(painter, rect, day)
+
+    def _paint_header(self, painter):
+        font = QFont(self.font())
+        font.setBold(True)
+        painter.setFont(font)
+        width = self._column_width()
+        for col, name in enumerate(WEEKDAY_NAMES):
+            rect = QRectF(col * (width + CELL_SPACING), 0, width, HEADER_HEIGHT)
+            gradient = QLinearGradient(rect.topLeft(), rect.bottomLeft())
+            gradient.setColorAt(0, QColor(COLOR_HEADER_START))
+            gradient.setColorAt(1, QColor(COLOR_HEADER_END))
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(gradient)
+            painter.drawRoundedRect(rect, 6, 6)
+            painter.setPen(QColor(COLOR_HEADER_TEXT))
+            painter.drawText(rect, Qt.AlignCenter, QFontMetrics(font).elidedText(name, Qt.ElideRight, int(width) - 8))
+
+    def _paint_cell(self, painter, rect, day):
+        hover_day, hover_task, hover_part = self._hover or (None, None, None)
+        gradient = QLinearGradient(rect.topLeft(), rect.bottomRight())
+        gradient.setColorAt(0, QColor(CALENDAR_BG_GRADIENT_START))
+        gradient.setColorAt(1, QColor(CALENDAR_BG_GRADIENT_END))
+        painter.setBrush(gradient)
+        painter.setPen(QPen(QColor(COLOR_CELL_HOVER if hover_day == day else COLOR_CELL_BORDER), 1))
+        painter.drawRoundedRect(rect.adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+        if self._year and date(self._year, self._month, day) == self._today:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(COLOR_TODAY)
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 6, 6)
+
+        base_font = QFont(self.font())
+        date_font = QFont(base_font)
+        date_font.setBold(True)
+        painter.setFont(date_font)
+        painter.setPen(QColor(COLOR_DATE_TEXT))
+        date_rect = QRectF(rect.left() + CELL_PADDING, rect.top() + CELL_PADDING / 2.0,
+                           rect.width() - 2 * CELL_PADDING, DATE_HEIGHT)
+        painter.drawText(date_rect, Qt.AlignRight | Qt.AlignVCenter, str(day))
+
+        badges, overflow, hidden = self._cell_layout(rect, self._tasks_by_day.get(day, []))
+        for task, badge_rect in badges:
+            hovered = hover_day == day and hover_task == task.task_id and hover_part in ('badge', 'check')
+            self._paint_badge(painter, badge_rect, task, base_font, hovered)
+        if overflow is not None:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(COLOR_OVERFLOW_BG))
+            painter.drawRoundedRect(overflow, 8, 8)
+            painter.setFont(base_font)
+            painter.setPen(QColor(COLOR_OVERFLOW_TEXT))
+            painter.drawText(overflow, Qt.AlignCenter, f"+{hidden}")
+
+    def _paint_badge(self, painter, rect, task, base_font, hovered):
+        done = task.is_done
+        color = COLOR_DONE if done else (COLOR_ASSIGNED if task.assignee_name else COLOR_PERSONAL)
+        painter.setPen(QPen(QColor(255, 255, 255, 110), 1) if hovered else Qt.NoPen)
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(rect, BADGE_RADIUS, BADGE_RADIUS)
+
+        left = rect.left() + 8
+        if task.is_group:
+            # dấu tròn với chữ cái đầu của người được giao
+            marker = QRectF(left, rect.center().y() - MARKER_SIZE / 2.0, MARKER_SIZE, MARKER_SIZE)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(0, 0, 0, 30))
+            painter.drawEllipse(marker)
+            painter.setPen(Qt.white)
+            painter.setFont(base_font)
+            initial = (task.assignee_name or '–')[:1].upper()
+            painter.drawText(marker, Qt.AlignCenter, initial)
+            left = marker.right() + 6
+
+        check = self._check_rect(rect)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(255, 255, 255) if done else QColor(255, 255, 255, 40))
+        painter.drawRoundedRect(check, 5, 5)
+        if done:
+            painter.setPen(QColor("#2b2b2b"))
+            painter.drawText(check, Qt.AlignCenter, "✓")
+
+        title_font = QFont(base_font)
+        title_font.setBold(not done)
+        title_font.setStrikeOut(done)
+        painter.setFont(title_font)
+        painter.setPen(Qt.white)
+        title_rect = QRectF(left, rect.top(), check.left() - 6 - left, rect.height())
+        title = QFontMetrics(title_font).elidedText(task.title, Qt.ElideRight, max(0, int(title_rect.width())))
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignVCenter, title)
+
+    # ----- tương tác -----
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return super().mousePressEvent(event)
+        hit = self.hit_test(event.pos())
+        if hit is None:
+            return
+        day, task, part = hit
+        if part == 'check':
+            self.task_toggle_requested.emit(task)
+        elif part in ('cell', 'overflow'):
+            self.day_clicked.emit(day)
+
+    def mouseDoubleClickEvent(self, event):
+        hit = self.hit_test(event.pos()) if event.button() == Qt.LeftButton else None
+        if hit is not None and hit[2] == 'badge':
+            self.task_activated.emit(hit[1])
+
+    def contextMenuEvent(self, event):
+        hit = self.hit_test(event.pos())
+        if hit is None:
+            return
+        day, task, _part = hit
+        menu = QMenu(self)
+        if task is not None:
+            action = menu.addAction('Xóa công việc này')
+            if menu.exec_(event.globalPos()) == action:
+                self.task_delete_requested.emit(task)
+        else:
+            action = menu.addAction("Thêm công việc mới")
+            if menu.exec_(event.globalPos()) == action:
+                self.add_task_requested.emit(day)
+
+    def mouseMoveEvent(self, event):
+        hit = self.hit_test(event.pos())
+        hover = (hit[0], hit[1].task_id if hit[1] else None, hit[2]) if hit else None
+        if hover != self._hover:
+            previous, self._hover = self._hover, hover
+            for state in (previous, hover):
+                if state is not None:
+                    self._update_day(state[0])
+            self.setCursor(Qt.PointingHandCursor if hover and hover[2] != 'badge' else Qt.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self._hover is not None:
+            previous, self._hover = self._hover, None
+            self._update_day(previous[0])
+        super().leaveEvent(event)
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            hit = self.hit_test(event.pos())
+            text = ""
+            if hit is not None and hit[1] is not None:
+                task = hit[1]
+                text = task.title + (f"\n{task.note}" if task.note else "")
+            elif hit is not None and hit[2] == 'overflow':
+                text = "Xem tất cả công việc trong ngày"
+            if text:
+                QToolTip.showText(event.globalPos(), text, self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+    Thông báo dạng toast ở góc dưới bên phải cửa sổ.
+
+    Khác QMessageBox, toast không chặn vòng lặp sự kiện: người dùng vẫn thao tác
+    bình thường, toast tự ẩn sau vài giây (hoặc bấm × để đóng).
+"""
+from PyQt5.QtWidgets import QFrame, QLabel, QPushButton, QHBoxLayout, QVBoxLayout
+from PyQt5.QtCore import Qt, QTimer
+
+from config import COLOR_WHITE, COLOR_DANGER, COLOR_TEXT_PRIMARY, COLOR_TEXT_SECONDARY, COLOR_BORDER
+
+TOAST_WIDTH = 320
+TOAST_MARGIN = 16
+TOAST_SPACING = 8
+
+
+class ToastNotification(QFrame):
+    """Một toast; các toast cùng cửa sổ xếp chồng từ dưới lên."""
+
+    def __init__(self, parent, title, message, duration_ms=8000):
+        super().__init__(parent)
+        self.setObjectName("toast")
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setFixedWidth(TOAST_WIDTH)
+        self.setStyleSheet(f"""
+            QFrame#toast {{ background-color: {COLOR_WHITE}; border: 1px solid {COLOR_BORDER};
+                            border-left: 4px solid {COLOR_DANGER}; border-radius: 8px; }}
+            QLabel {{ border: none; background: transparent; }}
+        """)
+
+        title_label = QLabel(title)
+        title_label.setStyleSheet(f"font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
+        close_btn = QPushButton("×")
+        close_btn.setFixedSize(20, 20)
+        close_btn.setCursor(Qt.PointingHandCursor)
+        close_btn.setStyleSheet(f"border: none; color: {COLOR_TEXT_SECONDARY}; font-size: 14pt;")
+        close_btn.clicked.connect(self.close)
+        message_label = QLabel(message)
+        message_label.setWordWrap(True)
+        message_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY};")
+
+        header = QHBoxLayout()
+        header.addWidget(title_label, 1)
+        header.addWidget(close_btn)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(12, 8, 8, 10)
+        layout.addLayout(header)
+        layout.addWidget(message_label)
+
+        QTimer.singleShot(duration_ms, self.close)
+
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        parent = self.parentWidget()
+        self.hide()
+        if parent is not None:
+            _layout_toasts(parent)
+
+
+def _layout_toasts(window):
+    """Đặt lại vị trí các toast đang hiện của window, mới nhất ở dưới cùng."""
+    y = window.height() - TOAST_MARGIN
+    for toast in reversed(window.findChildren(ToastNotification, options=Qt.FindDirectChildrenOnly)):
+        if not toast.isVisible():
+            continue
+        toast.adjustSize()
+        y -= toast.height()
+        toast.move(window.width() - toast.width() - TOAST_MARGIN, y)
+        y -= TOAST_SPACING
+
+
+def show_toast(widget, title, message, duration_ms=8000):
+    """Hiện toast trên cửa sổ chứa widget; trả về toast vừa tạo."""
+    window = widget.window() if widget is not None else None
+    if window is None:
+        return None
+    toast = ToastNotification(window, title, message, duration_ms)
+    toast.show()
+    toast.raise_()
+    _layout_toasts(window)
+    return toast
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+    Lịch nhắc hạn chót dựa trên min-heap + một QTimer duy nhất.
+
+    Thay cho việc quét toàn bộ task mỗi 60 giây: mỗi nhắc nhở là một phần tử
+    (thời điểm nhắc, seq, key) trong heap, timer chỉ được hẹn tới phần tử sớm
+    nhất. Số lần thức dậy tỉ lệ với số nhắc nhở, không phụ thuộc số task.
+"""
+import heapq
+import itertools
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# QTimer nhận interval kiểu int (ms); hẹn tối đa 6 giờ rồi hẹn lại để an toàn
+_MAX_INTERVAL_MS = 6 * 3600 * 1000
+
+
+class ReminderScheduler(QObject):
+    """Hàng đợi nhắc nhở theo hạn chót (epoch giây, giờ máy).
+
+    Mỗi task (theo key) được nhắc một lần, lead_seconds trước hạn chót; nếu đã
+    lọt vào khoảng đó thì nhắc ngay. Chủ sở hữu nạp các task có hạn trong
+    horizon_seconds tới qua set_reminders(); khi hết horizon scheduler phát
+    refill_needed để nạp đợt tiếp theo. Thêm/đổi/xóa task chỉ cần gọi
+    schedule() hoặc cancel() cho đúng task đó.
+    """
+    # (key, title, due_epoch)
+    reminder_due = pyqtSignal(object, str, float)
+    refill_needed = pyqtSignal()
+
+    def __init__(self, lead_seconds, horizon_seconds, parent=None):
+        super().__init__(parent)
+        self.lead_seconds = lead_seconds
+        self.horizon_seconds = horizon_seconds
+        self._heap = []        # (fire_at, seq, key)
+        self._entries = {}     # key -> (fire_at, seq, title, due_epoch)
+        self._seq = itertools.count()
+        self._fired = set()    # (key, due_epoch) đã nhắc, tránh nhắc lại sau khi nạp lại
+        self._refill_at = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def set_reminders(self, items, now=None):
+        """Thay toàn bộ nhắc nhở bằng items: iterable (key, title, due_epoch)."""
+        now = time.time() if now is None else now
+        self._heap, self._entries = [], {}
+        keys = set()
+        for key, title, due_epoch in items:
+            keys.add(key)
+            entry = self._make_entry(key, title, due_epoch, now)
+            if entry is not None:
+                self._entries[key] = entry
+                self._heap.append((entry[0], entry[1], key))
+        heapq.heapify(self._heap)
+        self._fired = {fired for fired in self._fired if fired[0] in keys}
+        self._refill_at = now + self.horizon_seconds
+        self._arm()
+
+    def schedule(self, key, title, due_epoch):
+        """Thêm hoặc cập nhật nhắc nhở cho một task."""
+        now = time.time()
+        self._entries.pop(key, None)
+        entry = self._make_entry(key, title, due_epoch, now)
+        if entry is not None and (self._refill_at is None or due_epoch <= self._refill_at):
+            self._entries[key] = entry
+            heapq.heappush(self._heap, (entry[0], entry[1], key))
+        self._arm()
+
+    def cancel(self, key):
+        """Bỏ nhắc nhở của task (phần tử trong heap bị bỏ qua khi tới lượt)."""
+        if self._entries.pop(key, None) is not None:
+            self._arm()
+
+    def clear(self):
+        self._heap, self._entries, self._refill_at = [], {}, None
+        self._timer.stop()
+
+    def pending_count(self):
+        return len(self._entries)
+
+    def next_fire_time(self):
+        """Epoch của lần nhắc gần nhất (None nếu không còn nhắc nhở)."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _make_entry(self, key, title, due_epoch, now):
+        if due_epoch is None or due_epoch <= now or (key, due_epoch) in self._fired:
+            return None
+        return (max(now, due_epoch - self.lead_seconds), next(self._seq), title, due_epoch)
+
+    def _drop_stale(self):
+        # phần tử đã bị cancel/schedule lại: seq không còn khớp
+        while self._heap:
+            fire_at, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _arm(self):
+        self._drop_stale()
+        targets = [t for t in (self._heap[0][0] if self._heap else None, self._refill_at) if t is not None]
+        if not targets:
+            self._timer.stop()
+            return
+        delay_ms = int(max(0.0, min(targets) - time.time()) * 1000)
+        self._timer.start(min(delay_ms, _MAX_INTERVAL_MS))
+
+    def _on_timeout(self):
+        now = time.time()
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != seq:
+                continue
+            del self._entries[key]
+            self._fired.add((key, entry[3]))
+            due.append((key, entry[2], entry[3]))
+        for key, title, due_epoch in due:
+            self.reminder_due.emit(key, title, due_epoch)
+        if self._refill_at is not None and self._refill_at <= now:
+            self._refill_at = None
+            self.refill_needed.emit()
+        self._arm()
@@ -8,7 +8,7 @@
 
 from PyQt5.QtWidgets import QFrame, QVBoxLayout, QLabel, QPushButton, QSpacerItem, QSizePolicy, QFileDialog, QHBoxLayout
 from PyQt5.QtGui import QPainter, QBrush, QColor, QPixmap, QPainterPath, QPen
-from config import COLOR_GRAY, COLOR_PRIMARY_BLUE, COLOR_SECONDARY_BLUE, COLOR_BORDER, COLOR_HOVER, COLOR_WHITE
+from config import COLOR_GRAY, COLOR_PRIMARY_BLUE, COLOR_SECONDARY_BLUE, COLOR_BORDER, COLOR_HOVER, COLOR_WHITE, AVATAR_PANEL_SIZE
 from PyQt5.QtCore import Qt, QRectF, pyqtSignal
 
 class ClickableLabel(QLabel):
@@ -137,7 +137,7 @@ class SidePanel(QFrame):
 
         # Avatar (có thể click)
         self.avatar = ClickableLabel()
-        self.avatar.setFixedSize(120, 120)
+        self.avatar.setFixedSize(AVATAR_PANEL_SIZE, AVATAR_PANEL_SIZE)
         self.avatar.setAlignment(Qt.AlignCenter)
         self.create_circular_avatar()
         self.layout.addWidget(self.avatar, 0, Qt.AlignCenter)
@@ -307,6 +307,10 @@ class SidePanel(QFrame):
         painter.end()
 
         self.avatar.setPixmap(target)
+
+    def set_avatar_pixmap(self, pixmap):
+        """Hiển thị avatar tròn đã dựng sẵn (avatar_utils.load_avatar_pixmap)."""
+        self.avatar.setPixmap(pixmap)
         
     def _create_circular_avatar(self):
         """
@@ -1,21 +1,51 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QScrollArea
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+from MainMenu.charts import DonutChart, StackedBarChart, Sparkline
+from config import COLOR_TEXT_SECONDARY, STATS_TREND_DAYS
+
+
+def _stats_key(stat_data):
+    """Bộ số của biểu đồ: (hoàn thành, quá hạn, chưa tới hạn)."""
+    return (stat_data.get('completed', 0), stat_data.get('overdue', 0), stat_data.get('upcoming', 0))
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 
 class StatItemWidget(QFrame):
     def __init__(self, stat_data, parent=None):
         super().__init__(parent)
         self.setObjectName("StatItemWidget")
         self.setFrameShape(QFrame.StyledPanel)
-        
+
         main_layout = QHBoxLayout(self)
-        
+
         info_layout = QVBoxLayout()
-        name_label = QLabel(stat_data.get('name', 'N/A'))
-        name_label.setObjectName("StatNameLabel")
-        
+        self.name_label = QLabel()
+        self.name_label.setObjectName("StatNameLabel")
+        self.stats_label = QLabel()
+        self.progress_bar = StackedBarChart()
+        trend_caption = QLabel(f"Việc chưa xong sắp đến hạn ({STATS_TREND_DAYS} ngày tới)")
+        trend_caption.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY};")
+        self.trend_line = Sparkline()
+
+        info_layout.addWidget(self.name_label)
+        info_layout.addWidget(self.stats_label)
+        info_layout.addWidget(self.progress_bar)
+        info_layout.addSpacing(12)
+        info_layout.addWidget(trend_caption)
+        info_layout.addWidget(self.trend_line)
+        info_layout.addStretch()
+
+        self.donut = DonutChart()
+
+        main_layout.addLayout(info_layout, 1)
+        main_layout.addWidget(self.donut, 2)
+
+        self.set_stats(stat_data)
+
+    def set_stats(self, stat_data):
+        """Cập nhật nhãn + biểu đồ tại chỗ (biểu đồ chỉ vẽ lại nếu bộ số đổi)."""
+        self.name_label.setText(stat_data.get('name', 'N/A'))
+
         # Lấy dữ liệu từ 3 key mới
         completed = stat_data.get('completed', 0)
         overdue = stat_data.get('overdue', 0)
@@ -32,45 +62,13 @@ class StatItemWidget(QFrame):
             f"Quá hạn: {overdue}\n"
             f"Chưa tới hạn: {upcoming}"
         )
-        stats_label = QLabel(stats_text)
-        
-        info_layout.addWidget(name_label)
-        info_layout.addWidget(stats_label)
-        info_layout.addStretch()
-
-        figure = Figure(figsize=(5, 5)) 
-        canvas = FigureCanvas(figure)
-        
-        self._draw_pie_chart(figure, canvas, stat_data)
+        self.stats_label.setText(stats_text)
 
-        main_layout.addLayout(info_layout, 1)
-        main_layout.addWidget(canvas, 2) 
-
-    def _draw_pie_chart(self, figure, canvas, stats_data):
-        figure.clear()
-        ax = figure.add_subplot(111)
-        
-        # Cập nhật labels, sizes, và colors cho 3 thành phần
-        labels = ['Hoàn thành', 'Quá hạn', 'Chưa tới hạn']
-        sizes = [
-            stats_data.get('completed', 0), 
-            stats_data.get('overdue', 0), 
-            stats_data.get('upcoming', 0)
-        ]
-        # Xanh lá (hoàn thành), Đỏ (quá hạn), Vàng (sắp tới)
-        colors = ['#2ecc71', '#e74c3c', '#f1c40f']
-        
-        if sum(sizes) > 0:
-            ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90,
-                   textprops={'fontsize': 11})
-        else:
-            ax.text(0.5, 0.5, 'Không có công việc', ha='center', va='center', color='gray')
-            ax.axis('off')
-            
-        ax.axis('equal')
-        
-        figure.tight_layout()
-        canvas.draw()
+        values = _stats_key(stat_data)
+        self.progress_bar.set_values(values)
+        self.donut.set_values(values)
+        self.donut.title = stat_data.get('name', '')
+        self.trend_line.set_values(stat_data.get('trend', ()))
 
 class StatisticsPage(QWidget):
     """Trang thống kê: hiển thị tổng quan tiến độ cá nhân và các nhóm dưới dạng biểu đồ."""
@@ -98,6 +96,12 @@ class StatisticsPage(QWidget):
         self.scroll_layout.setSpacing(0)
         self.scroll_area.setWidget(scroll_content)
 
+        self._items = []
+        self.no_group_label = QLabel("Bạn chưa tham gia nhóm nào có công việc.")
+        self.no_group_label.setAlignment(Qt.AlignCenter)
+        self.no_group_label.hide()
+        self.scroll_layout.addWidget(self.no_group_label)
+
     # [THÊM] Ghi đè sự kiện resizeEvent
     def resizeEvent(self, event):
         """Được gọi mỗi khi kích thước của StatisticsPage thay đổi."""
@@ -118,35 +122,40 @@ class StatisticsPage(QWidget):
             return
 
         # Lặp qua tất cả các widget trong layout và đặt chiều cao cố định cho chúng
-        for i in range(self.scroll_layout.count()):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if isinstance(widget, StatItemWidget):
-                widget.setFixedHeight(visible_height)
+        for widget in self._items:
+            widget.setFixedHeight(visible_height)
 
     def update_all_stats(self, personal_stats, group_stats_list):
-        # Xóa các widget cũ
-        for i in reversed(range(self.scroll_layout.count())): 
-            widget_to_remove = self.scroll_layout.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
+        """Hiển thị số liệu mới, dùng lại các StatItemWidget đã có.
 
-        # Thêm widget cá nhân
+        Biểu đồ vẽ bằng QPainter (MainMenu.charts) trong paintEvent, nên chỉ các
+        widget đang hiện trong vùng cuộn mới được vẽ và widget có bộ số không đổi
+        không vẽ lại.
+        """
         personal_stats['name'] = "Cá nhân"
-        personal_widget = StatItemWidget(personal_stats)
-        self.scroll_layout.addWidget(personal_widget)
-        
-        # Thêm các widget của nhóm
-        if not group_stats_list:
-            no_group_label = QLabel("Bạn chưa tham gia nhóm nào có công việc.")
-            no_group_label.setAlignment(Qt.AlignCenter)
-            self.scroll_layout.addWidget(no_group_label)
-        else:
-            for group_data in group_stats_list:
-                group_data['name'] = group_data.pop('group_name')
-                group_widget = StatItemWidget(group_data)
-                self.scroll_layout.addWidget(group_widget)
+        rows = [personal_stats]
+        for group_data in group_stats_list or []:
+            group_data['name'] = group_data.pop('group_name')
+            rows.append(group_data)
+
+        # Dùng lại widget theo vị trí; bỏ các widget thừa
+        for i, stat_data in enumerate(rows):
+            if i < len(self._items):
+                self._items[i].set_stats(stat_data)
+            else:
+                item = StatItemWidget(stat_data)
+                self._items.append(item)
+                self.scroll_layout.insertWidget(i, item)
+        for item in self._items[len(rows):]:
+            self.scroll_layout.removeWidget(item)
+            item.deleteLater()
+        del self._items[len(rows):]
+
+        # Thông báo khi chưa có nhóm: luôn nằm cuối layout, chỉ ẩn/hiện
+        self.no_group_label.setVisible(not group_stats_list)
+        # đặt chiều cao ngay để các widget mới không hiện (và vẽ) ở kích thước tạm
+        self._update_children_height()
 
         # [THÊM] Cập nhật chiều cao của các widget ngay sau khi thêm chúng vào
         # Dùng singleShot để đảm bảo giao diện đã được cập nhật trước khi lấy kích thước
-        from PyQt5.QtCore import QTimer
-        QTimer.singleShot(0, self._update_children_height)
\ No newline at end of file
+        QTimer.singleShot(0, self._update_children_height)
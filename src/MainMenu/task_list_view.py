@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+    Danh sách task dạng model/view cho DoNowView.
+
+    Thay cho việc tạo một QFrame (kèm stylesheet + shadow) cho mỗi task: dữ liệu
+    nằm trong TaskListModel, còn TaskItemDelegate tự vẽ từng dòng bằng QPainter.
+    QListView chỉ gọi paint() cho các dòng đang hiển thị nên một view cuộn mượt
+    thay được cho phân trang, kể cả khi có hàng nghìn task.
+"""
+import os
+from bisect import bisect_left
+
+from PyQt5.QtCore import (Qt, QAbstractListModel, QModelIndex, QRect, QRectF,
+                          QSize, QEvent, pyqtSignal)
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QIcon, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate, QToolTip
+
+from config import (
+    ICON_DIR, COLOR_SUCCESS, COLOR_DANGER, COLOR_TEXT_PRIMARY,
+    COLOR_TEXT_SECONDARY, COLOR_BORDER, PRIORITY_COLORS, COLOR_WHITE
+)
+
+# Role trả về TaskRecord của một dòng
+TaskRole = Qt.UserRole + 1
+TaskIdRole = Qt.UserRole + 2
+
+# Kích thước một dòng (card + margin); cố định để QListView dùng uniformItemSizes
+ROW_HEIGHT = 84
+CARD_MARGIN_X, CARD_MARGIN_Y = 8, 4
+CARD_PADDING = 12
+BUTTON_SIZE = 28
+BUTTON_SPACING = 5
+
+
+def _format_due(due_at):
+    """'YYYY-MM-DD HH:MM:SS' -> 'dd/mm HH:MM' (giữ nguyên chuỗi nếu lạ)."""
+    s = str(due_at)
+    if len(s) >= 16 and s[4] == '-' and s[7] == '-':
+        return f"{s[8:10]}/{s[5:7]} {s[11:16]}"
+    if len(s) == 10 and s[4] == '-' and s[7] == '-':
+        return f"{s[8:10]}/{s[5:7]} 00:00"
+    return s
+
+
+class TaskListModel(QAbstractListModel):
+    """Model danh sách TaskRecord, luôn giữ đúng thứ tự của sort_key.
+
+    Trang tải từ SQL đã được sắp xếp sẵn nên chỉ cần tính khóa cho từng dòng;
+    sau đó thêm/xóa/đổi trạng thái chỉ chèn hoặc gỡ đúng một dòng bằng bisect,
+    không bao giờ sắp xếp lại cả danh sách.
+
+    Dữ liệu được nạp theo trang: khi view cuộn gần cuối, Qt gọi fetchMore() và
+    model phát fetch_more_requested để chủ sở hữu tải trang kế tiếp rồi gọi
+    append_tasks().
+    """
+    fetch_more_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = []
+        self._keys = []     # khóa sắp xếp, song song với _tasks
+        self._by_id = {}    # task_id -> TaskRecord
+        self._meta = {}
+        self._sort_key = lambda task: task.task_id
+        self._has_more = False
+        self._fetching = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._tasks)):
+            return None
+        task = self._tasks[index.row()]
+        if role == Qt.DisplayRole:
+            return task.title
+        if role == TaskRole:
+            return task
+        if role == TaskIdRole:
+            return task.task_id
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
+
+    def set_sort_key(self, key):
+        """Hàm khóa của thứ tự hiện tại (phải khớp thứ tự SQL trả về)."""
+        self._sort_key = key
+
+    def set_tasks(self, tasks, meta=None, has_more=False):
+        """Thay toàn bộ dữ liệu (một lần reset, không tạo widget nào)."""
+        self.beginResetModel()
+        self._tasks = list(tasks)
+        self._keys = [self._sort_key(t) for t in self._tasks]
+        self._by_id = {t.task_id: t for t in self._tasks}
+        self._meta = meta or {}
+        self._has_more = has_more
+        self._fetching = False
+        self.endResetModel()
+
+    def append_tasks(self, tasks, has_more=False):
+        """Nối thêm một trang vào cuối danh sách."""
+        self._fetching = False
+        self._has_more = has_more
+        tasks = [t for t in tasks if t.task_id not in self._by_id]
+        if not tasks:
+            return
+        first = len(self._tasks)
+        self.beginInsertRows(QModelIndex(), first, first + len(tasks) - 1)
+        self._tasks.extend(tasks)
+        self._keys.extend(self._sort_key(t) for t in tasks)
+        self._by_id.update((t.task_id, t) for t in tasks)
+        self.endInsertRows()
+
+    def insert_task(self, task):
+        """Chèn một task vào đúng vị trí; False nếu nó thuộc phần chưa tải."""
+        key = self._sort_key(task)
+        row = bisect_left(self._keys, key)
+        if row == len(self._tasks) and self._has_more:
+            return False  # sẽ xuất hiện khi tải tới trang chứa nó
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._tasks.insert(row, task)
+        self._keys.insert(row, key)
+        self._by_id[task.task_id] = task
+        self.endInsertRows()
+        return True
+
+    def remove_task(self, task_id):
+        """Gỡ task khỏi danh sách; trả về TaskRecord đã gỡ hoặc None."""
+        row = self.row_of(task_id)
+        if row < 0:
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        task = self._tasks.pop(row)
+        del self._keys[row]
+        del self._by_id[task_id]
+        self.endRemoveRows()
+        return task
+
+    def reposition_task(self, task_id):
+        """Task đã đổi dữ liệu (ví dụ is_done): đưa nó về đúng vị trí mới.
+
+        Trả về True nếu task vẫn nằm trong phần đã tải.
+        """
+        row = self.row_of(task_id)
+        if row < 0:
+            return False
+        task = self._tasks[row]
+        key = self._sort_key(task)
+        # vị trí mới tính trên danh sách khi đã bỏ dòng cũ
+        new_row = bisect_left(self._keys, key, 0, row) if key < self._keys[row] else \
+            bisect_left(self._keys, key, row + 1) - 1
+        if new_row == row:
+            self._keys[row] = key
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return True
+        if new_row == len(self._tasks) - 1 and self._has_more:
+            # rơi ra sau dòng cuối đã tải: thuộc các trang chưa tải
+            self.remove_task(task_id)
+            return False
+        dest = new_row if new_row < row else new_row + 1
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), dest)
+        del self._tasks[row]
+        del self._keys[row]
+        self._tasks.insert(new_row, task)
+        self._keys.insert(new_row, key)
+        self.endMoveRows()
+        index = self.index(new_row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetching = True
+            self.fetch_more_requested.emit()
+
+    def cancel_fetch(self):
+        """Trang đang tải bị hủy/lỗi: cho phép fetchMore() thử lại."""
+        self._fetching = False
+
+    def tasks(self):
+        return self._tasks
+
+    def task_at(self, row):
+        return self._tasks[row] if 0 <= row < len(self._tasks) else None
+
+    def task_by_id(self, task_id):
+        return self._by_id.get(task_id)
+
+    def meta_for(self, task_id):
+        return self._meta.get(task_id)
+
+    def row_of(self, task_id):
+        """Vị trí của task theo bisect trên khóa đã lưu (O(log n))."""
+        task = self._by_id.get(task_id)
+        if task is None:
+            return -1
+        row = bisect_left(self._keys, self._sort_key(task))
+        if row < len(self._tasks) and self._tasks[row] is task:
+            return row
+        # dữ liệu task đã đổi mà chưa reposition: dò tuyến tính
+        for row, other in enumerate(self._tasks):
+            if other is task:
+                return row
+        return -1
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    """Vẽ một dòng task (card, tiêu đề, ghi chú, chi tiết, 2 nút icon).
+
+    Click vào nút được xử lý trong editorEvent và phát ra task_toggled /
+    task_deleted với id của task, giống tín hiệu của TaskItemWidget trước đây.
+    """
+    task_toggled = pyqtSignal(int)
+    task_deleted = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # icon được nạp một lần và dùng lại cho mọi dòng
+        self._icons = {}
+        for key, name in (('done', 'check-circle.svg'), ('undo', 'rotate-ccw.svg'), ('delete', 'x-circle.svg')):
+            path = os.path.join(ICON_DIR, name)
+            self._icons[key] = QIcon(path) if os.path.exists(path) else QIcon()
+        self._title_font = QFont()
+        self._title_font.setPixelSize(15)
+        self._title_font_bold = QFont(self._title_font)
+        self._title_font_bold.setBold(True)
+        self._title_font_done = QFont(self._title_font)
+        self._title_font_done.setStrikeOut(True)
+        self._note_font = QFont()
+        self._note_font.setPixelSize(12)
+        self._details_font = QFont()
+        self._details_font.setPixelSize(11)
+        self._details_font_bold = QFont(self._details_font)
+        self._details_font_bold.setBold(True)
+        # (row, 'toggle' | 'delete') của nút đang được hover
+        self._hover = None
+
+    # --- hình học ---
+    def _card_rect(self, option_rect):
+        return option_rect.adjusted(CARD_MARGIN_X, CARD_MARGIN_Y, -CARD_MARGIN_X, -CARD_MARGIN_Y)
+
+    def _button_rects(self, option_rect):
+        card = self._card_rect(option_rect)
+        top = card.center().y() - BUTTON_SIZE // 2 + 1
+        delete_rect = QRect(card.right() - CARD_PADDING - BUTTON_SIZE, top, BUTTON_SIZE, BUTTON_SIZE)
+        toggle_rect = QRect(delete_rect.left() - BUTTON_SPACING - BUTTON_SIZE, top, BUTTON_SIZE, BUTTON_SIZE)
+        return toggle_rect, delete_rect
+
+    def _hit_test(self, option_rect, pos):
+        toggle_rect, delete_rect = self._button_rects(option_rect)
+        if toggle_rect.contains(pos):
+            return 'toggle'
+        if delete_rect.contains(pos):
+            return 'delete'
+        return None
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    # --- vẽ ---
+    def paint(self, painter, option, index):
+        task = index.data(TaskRole)
+        if task is None:
+            return
+        is_done = task.is_done
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        card = QRectF(self._card_rect(option.rect))
+        # bóng đổ nhẹ thay cho QGraphicsDropShadowEffect
+        shadow = QPainterPath()
+        shadow.addRoundedRect(card.translated(0, 2), 8, 8)
+        painter.fillPath(shadow, QColor(0, 0, 0, 18))
+        path = QPainterPath()
+        path.addRoundedRect(card.adjusted(0.5, 0.5, -0.5, -0.5), 8, 8)
+        painter.fillPath(path, QColor("#F8F9FA" if is_done else COLOR_WHITE))
+        painter.setPen(QPen(QColor(COLOR_BORDER), 1))
+        painter.drawPath(path)
+
+        toggle_rect, delete_rect = self._button_rects(option.rect)
+        text_left = int(card.left()) + CARD_PADDING
+        text_width = max(0, toggle_rect.left() - 8 - text_left)
+        note = task.note
+        details = self._details_segments(task, index)
+
+        # chiều cao các dòng chữ, căn giữa theo chiều dọc trong card
+        lines = [('title', 20)]
+        if note:
+            lines.append(('note', 16))
+        if details:
+            lines.append(('details', 16))
+        total_h = sum(h for _, h in lines) + 4 * (len(lines) - 1)
+        y = int(card.center().y() - total_h / 2)
+
+        for kind, h in lines:
+            rect = QRect(text_left, y, text_width, h)
+            if kind == 'title':
+                font = self._title_font_done if is_done else self._title_font_bold
+                painter.setFont(font)
+                painter.setPen(QColor(COLOR_TEXT_SECONDARY if is_done else COLOR_TEXT_PRIMARY))
+                text = QFontMetrics(font).elidedText(task.title, Qt.ElideRight, text_width)
+                painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+            elif kind == 'note':
+                painter.setFont(self._note_font)
+                painter.setPen(QColor(COLOR_TEXT_SECONDARY))
+                text = QFontMetrics(self._note_font).elidedText(note.replace('\n', ' '), Qt.ElideRight, text_width)
+                painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+            else:
+                self._paint_details(painter, rect, details)
+            y += h + 4
+
+        row = index.row()
+        self._paint_button(painter, toggle_rect, self._icons['undo' if is_done else 'done'],
+                           COLOR_TEXT_SECONDARY if is_done else COLOR_SUCCESS,
+                           self._hover == (row, 'toggle'))
+        self._paint_button(painter, delete_rect, self._icons['delete'], COLOR_DANGER,
+                           self._hover == (row, 'delete'))
+        painter.restore()
+
+    def _details_segments(self, task, index):
+        """Các đoạn (text, màu, đậm?) của dòng chi tiết."""
+        segments = []
+        priority = task.priority
+        if priority < 4:
+            segments.append((f"P{priority}", PRIORITY_COLORS.get(priority, COLOR_TEXT_SECONDARY), True))
+        assignee_name = task.assignee_name or ("Unassigned" if task.is_group else None)
+        if assignee_name:
+            segments.append((f"👤 {assignee_name}", None, False))
+        if task.due_at:
+            segments.append((f"📅 {_format_due(task.due_at)}", None, False))
+        if task.estimated_minutes:
+            segments.append((f"⏱️ {task.estimated_minutes}m", None, False))
+        model = index.model()
+        meta = model.meta_for(task.task_id) if hasattr(model, 'meta_for') else None
+        if meta and 'actual' in meta:
+            segments.append((f"✅ {meta['actual']}m", None, False))
+        return segments
+
+    def _paint_details(self, painter, rect, segments):
+        x = rect.left()
+        separator = "  •  "
+        for i, (text, color, bold) in enumerate(segments):
+            parts = [(separator, None, False)] if i else []
+            parts.append((text, color, bold))
+            for part, part_color, part_bold in parts:
+                available = rect.right() - x
+                if available <= 0:
+                    return
+                font = self._details_font_bold if part_bold else self._details_font
+                metrics = QFontMetrics(font)
+                painter.setFont(font)
+                painter.setPen(QColor(part_color or COLOR_TEXT_SECONDARY))
+                part = metrics.elidedText(part, Qt.ElideRight, available)
+                painter.drawText(QRect(x, rect.top(), available, rect.height()),
+                                 Qt.AlignLeft | Qt.AlignVCenter, part)
+                x += metrics.horizontalAdvance(part)
+
+    def _paint_button(self, painter, rect, icon, hover_color, hovered):
+        if hovered:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(hover_color))
+            painter.drawEllipse(QRectF(rect))
+        if not icon.isNull():
+            icon.paint(painter, rect.adjusted(6, 6, -6, -6))
+
+    # --- tương tác ---
+    def editorEvent(self, event, model, option, index):
+        etype = event.type()
+        if etype == QEvent.MouseMove:
+            part = self._hit_test(option.rect, event.pos())
+            self._set_hover((index.row(), part) if part else None, option.widget)
+            return False
+        if etype == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            part = self._hit_test(option.rect, event.pos())
+            task_id = index.data(TaskIdRole)
+            if part == 'toggle':
+                self.task_toggled.emit(task_id)
+                return True
+            if part == 'delete':
+                self.task_deleted.emit(task_id)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            part = self._hit_test(option.rect, event.pos())
+            if part:
+                task = index.data(TaskRole)
+                if part == 'delete':
+                    tip = "Delete Task"
+                else:
+                    tip = "Mark as Pending" if task is not None and task.is_done else "Mark as Complete"
+                QToolTip.showText(event.globalPos(), tip, view)
+                return True
+            QToolTip.hideText()
+            return True
+        return super().helpEvent(event, view, option, index)
+
+    def _set_hover(self, hover, viewport):
+        if hover == self._hover:
+            return
+        self._hover = hover
+        if viewport is not None:
+            viewport.update()
+
+    def clear_hover(self, viewport=None):
+        self._set_hover(None, viewport)
+
+
+class TaskListView(QListView):
+    """QListView cấu hình sẵn cho TaskListModel + TaskItemDelegate."""
+    task_toggled = pyqtSignal(int)
+    task_deleted = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("TaskListView")
+        self.task_model = TaskListModel(self)
+        self.delegate = TaskItemDelegate(self)
+        self.setModel(self.task_model)
+        self.setItemDelegate(self.delegate)
+        # mọi dòng cao bằng nhau -> view không phải hỏi sizeHint cho từng dòng
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setFrameShape(QListView.NoFrame)
+        self.setStyleSheet("QListView#TaskListView { background-color: transparent; border: none; }")
+        self.delegate.task_toggled.connect(self.task_toggled)
+        self.delegate.task_deleted.connect(self.task_deleted)
+
+    def set_tasks(self, tasks, meta=None, has_more=False):
+        self.delegate.clear_hover()
+        self.task_model.set_tasks(tasks, meta, has_more)
+
+    def append_tasks(self, tasks, has_more=False):
+        self.task_model.append_tasks(tasks, has_more)
+
+    def remove_task(self, task_id):
+        return self.task_model.remove_task(task_id)
+
+    def leaveEvent(self, event):
+        self.delegate.clear_hover(self.viewport())
+        super().leaveEvent(event)
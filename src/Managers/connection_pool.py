@@ -0,0 +1,107 @@
+import atexit
+import logging
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+class ConnectionPool:
+    """Quản lý kết nối SQLite dùng lâu dài: mỗi thread một kết nối.
+
+    Kết nối được tạo lười (lần đầu thread cần tới) và được giữ lại cho các
+    truy vấn sau, thay vì mở/đóng file DB ở mỗi câu lệnh. Tất cả kết nối được
+    đóng khi gọi close_all() hoặc khi tiến trình kết thúc.
+    """
+    def __init__(self, db_path: str, timeout: float = 5.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # thread ident -> connection, để có thể đóng tất cả khi shutdown
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._stats = {'created': 0, 'reused': 0, 'closed': 0}
+
+    def get(self) -> sqlite3.Connection:
+        """Trả về kết nối của thread hiện tại, tạo mới nếu chưa có."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._lock:
+                self._stats['reused'] += 1
+            return conn
+        # check_same_thread=False chỉ để close_all() đóng được từ thread khác;
+        # mỗi kết nối vẫn chỉ được dùng bởi thread đã tạo ra nó.
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        self._local.conn = conn
+        with self._lock:
+            self._connections[threading.get_ident()] = conn
+            self._stats['created'] += 1
+        logging.debug("[DB POOL] mở kết nối mới cho thread %s (%s)", threading.get_ident(), self.db_path)
+        return conn
+
+    def release_current(self) -> None:
+        """Đóng kết nối của thread hiện tại (dùng khi một worker thread kết thúc)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+            self._stats['closed'] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            logging.exception("[DB POOL] lỗi khi đóng kết nối")
+
+    def close_all(self) -> None:
+        """Đóng toàn bộ kết nối đang mở (gọi khi ứng dụng tắt)."""
+        with self._lock:
+            conns = list(self._connections.values())
+            self._connections.clear()
+            self._stats['closed'] += len(conns)
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                logging.exception("[DB POOL] lỗi khi đóng kết nối")
+        # kết nối của thread hiện tại đã bị đóng ở trên
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, int]:
+        """Số liệu của pool: số kết nối đã tạo, dùng lại, đã đóng và đang mở."""
+        with self._lock:
+            data = dict(self._stats)
+            data['open'] = len(self._connections)
+        return data
+
+
+# Một pool cho mỗi file DB, dùng chung giữa các instance Database trong tiến trình
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Lấy (hoặc tạo) pool dùng chung cho db_path."""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[db_path] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """Đóng mọi kết nối của mọi pool; được đăng ký với atexit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+def pool_stats(db_path: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Trả về stats theo từng db_path (hoặc chỉ một pool nếu truyền db_path)."""
+    with _pools_lock:
+        items = [(p, pool) for p, pool in _pools.items() if db_path is None or p == db_path]
+    return {p: pool.stats() for p, pool in items}
+
+
+atexit.register(close_all_pools)
@@ -1,18 +1,128 @@
 import os
 import sqlite3
-from typing import List, Optional, Tuple, Dict
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional, Tuple, Dict
+
+from Managers.connection_pool import get_pool
+from Managers.migrations import migrate, FTS_TABLE
+from Managers.search_text import search_tokens, last_token_is_prefix
+
+# Các file DB đã được migrate trong tiến trình này
+_schema_checked = set()
+# db_path -> có bảng FTS5 task_fts hay không (False -> tìm kiếm bằng LIKE)
+_fts_available: Dict[str, bool] = {}
+
+# Câu lệnh INSERT cố định cho schema chuẩn (xem Managers/migrations.py);
+# giữ nguyên chuỗi để sqlite3 dùng lại statement đã biên dịch trong cache.
+_INSERT_TASK = (
+    "INSERT INTO tasks (user_id, title, note, is_done, priority, estimate_minutes, due_at, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+)
+_INSERT_GROUP_TASK = (
+    "INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, due_at, creator_id, estimated_minutes, priority, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+)
+
+
+def _month_range(month_str: str) -> Tuple[str, str]:
+    """Đổi 'YYYY-MM' thành khoảng nửa mở ['YYYY-MM-01', 'YYYY-(MM+1)-01').
+
+    Dùng cho điều kiện `due_at >= ? AND due_at < ?` để SQLite quét theo chỉ mục
+    thay vì gọi strftime() trên từng dòng.
+    """
+    year, month = (int(part) for part in month_str.split('-')[:2])
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def _day_range(day_str: str) -> Tuple[str, str]:
+    """Đổi 'YYYY-MM-DD' thành khoảng nửa mở [ngày đó, ngày hôm sau) — như _month_range."""
+    start = date.fromisoformat(day_str[:10])
+    return start.isoformat(), (start + timedelta(days=1)).isoformat()
+
+
+# Các kiểu sắp xếp cho get_tasks_page / get_group_tasks_page: (chiều, các khóa).
+# Mọi khóa cùng một chiều và khóa cuối là task_id (duy nhất), nên cursor keyset
+# chỉ cần một phép so sánh row value `(k0, k1, ...) > (:c0, :c1, ...)`.
+# 'urgency' tái hiện thứ tự cũ của DoNowView: chưa xong trước, priority tăng dần,
+# rồi task quá hạn / không hạn / hạn trong 1 giờ (:soon) trước, còn lại theo due_at.
+# Các khóa CASE/COALESCE (và NOCASE của 'title') không chỉ mục nào phục vụ được:
+# mỗi trang lọc theo owner qua idx_*_due rồi sắp xếp các dòng của owner đó trong
+# B-tree tạm (quét theo số task của một người/nhóm, không phải cả bảng). COUNT(*)
+# chỉ chạy ở trang đầu; các trang sau lấy tổng từ cursor.
+_PAGE_SORTS = {
+    'urgency': ('ASC', (
+        "{t}.is_done",
+        "COALESCE({t}.priority, 4)",
+        "CASE WHEN {t}.due_at IS NULL OR {t}.due_at <= :soon THEN 0 ELSE 1 END",
+        "CASE WHEN {t}.due_at IS NULL OR {t}.due_at <= :soon THEN '' ELSE {t}.due_at END",
+        "{t}.task_id",
+    )),
+    'due': ('ASC', ("{t}.due_at IS NULL", "COALESCE({t}.due_at, '')", "{t}.task_id")),
+    'newest': ('DESC', ("{t}.task_id",)),
+    'title': ('ASC', ("{t}.title COLLATE NOCASE", "{t}.task_id")),
+}
+
+
+def _fts_query(text: str, owner: str) -> Optional[str]:
+    """Chuỗi người dùng gõ -> biểu thức MATCH của FTS5 trong phạm vi owner.
+
+    Các từ đã gõ xong khớp nguyên từ, từ cuối cùng (đang gõ dở) khớp tiền tố,
+    ghép bằng AND và chỉ tìm trong title/note. owner là biểu thức trên cột owner,
+    ví dụ 'u3' hoặc 'g5 AND a7' (xem Managers/migrations.py). Trả None nếu
+    không có từ nào. Cách tách từ dùng chung với Managers/search_text.py.
+    """
+    tokens = search_tokens(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    if last_token_is_prefix(text):
+        terms[-1] += "*"
+    return f"owner : ({owner}) AND {{title note}} : ({' '.join(terms)})"
+
+
+def _like_pattern(text: str) -> str:
+    """Chuỗi tìm kiếm -> mẫu LIKE '%...%' (escape %, _ và \\)."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
 
 class Database:
     """Trợ giúp SQLite cho app: users, tasks, groups, group_members, group_tasks.
     Dùng _execute_query để tập trung thao tác và xử lý lỗi SQL.
+    Kết nối được lấy từ ConnectionPool dùng chung (mỗi thread một kết nối lâu dài).
     """
     def __init__(self):
         # Đường dẫn mặc định đến file DB
         base_dir = os.path.dirname(os.path.dirname(__file__))
         self.db_path = os.path.join(base_dir, "Data", "todolist_database.db")
+        self._pool = get_pool(self.db_path)
+        if self.db_path not in _schema_checked:
+            _schema_checked.add(self.db_path)
+            try:
+                migrate(self._connection())
+            except sqlite3.Error:
+                logging.exception("[DB ERROR] không thể migrate schema cho %s", self.db_path)
+        if self.db_path not in _fts_available:
+            row = self._execute_query("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                      (FTS_TABLE,), fetch="one")
+            _fts_available[self.db_path] = bool(row)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Kết nối lâu dài của thread hiện tại (tạo lười trong pool)."""
+        return self._pool.get()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Số liệu của pool kết nối (created/reused/closed/open)."""
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Đóng mọi kết nối của pool; gọi khi ứng dụng tắt."""
+        self._pool.close_all()
 
 
-    def _execute_query(self, query, params=(), commit=False, fetch=None):
+    def _execute_query(self, query, params=(), commit=False, fetch=None, raise_errors=False):
         """Thực thi truy vấn SQL.
 
         Args:
@@ -20,15 +130,17 @@ class Database:
             params (tuple): tham số truyền vào query.
             commit (bool): nếu True thì commit transaction.
             fetch (None|'one'|'all'): cách trả về kết quả.
+            raise_errors (bool): nếu True thì ném lại sqlite3.Error sau khi log và rollback
+                (dùng cho các lệnh ghi mà nơi gọi cần biết có thành công hay không).
 
         Returns:
             kết quả fetch theo tham số fetch hoặc None.
 
         Lưu ý: In lỗi SQL ra stdout khi có exception.
         """
+        conn = self._connection()
+        cur = conn.cursor()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cur = conn.cursor()
             cur.execute(query, params)
             if commit:
                 conn.commit()
@@ -37,37 +149,31 @@ class Database:
             if fetch == "all":
                 return cur.fetchall()
         except sqlite3.Error as e:
-            import logging
             logging.exception("[DB ERROR] %s | %s %s", e, query, params)
+            # không để transaction dở dang trên kết nối dùng lại
+            conn.rollback()
+            if raise_errors:
+                raise
         finally:
-            conn.close()
+            cur.close()
 
     def _execute_insert(self, query, params=()):
         """Thực thi INSERT và trả về lastrowid hoặc None nếu lỗi.
 
         Dùng để giữ nhất quán khi cần id của hàng vừa thêm.
         """
+        conn = self._connection()
+        cur = conn.cursor()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cur = conn.cursor()
             cur.execute(query, params)
             conn.commit()
-            last = cur.lastrowid
-            cur.close()
-            conn.close()
-            return last
+            return cur.lastrowid
         except sqlite3.Error as e:
-            import logging
             logging.exception("[DB ERROR] %s | %s %s", e, query, params)
-            try:
-                cur.close()
-            except Exception:
-                pass
-            try:
-                conn.close()
-            except Exception:
-                pass
+            conn.rollback()
             return None
+        finally:
+            cur.close()
 
     def get_login_user(self, email: str, password: str) -> Optional[Tuple]:
         """Tìm user theo email và mật khẩu.
@@ -112,35 +218,35 @@ class Database:
         self._execute_query(query, (new_password, email), commit=True)
 
     # ----------------- Công việc (cá nhân) ---------------------
-    def add_task(self, user_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, estimated_minutes: Optional[int] = None, priority: int = 2) -> None:
+    def add_task(self, user_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, estimated_minutes: Optional[int] = None, priority: int = 2) -> Optional[int]:
         """Wrapper tương thích cho add_task_with_meta.
 
         Giữ tương thích với code cũ.
         """
         return self.add_task_with_meta(user_id, title, note, is_done, due_at, estimated_minutes, priority)
 
-    def add_task_with_meta(self, user_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, estimated_minutes: Optional[int] = None, priority: int = 2) -> None:
+    def add_task_with_meta(self, user_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, estimated_minutes: Optional[int] = None, priority: int = 2) -> Optional[int]:
         """Thêm task với metadata (note, due_at, estimate, priority).
 
-        Không trả về; ném lỗi khi DB thất bại.
+        Trả về task_id mới (để UI chèn thẳng vào danh sách) hoặc None nếu lỗi.
         """
-        if due_at is None:
-            query = "INSERT INTO tasks (user_id, title, note, is_done, priority, estimate_minutes, created_at) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-            params = (user_id, title, note, is_done, priority, estimated_minutes)
-        else:
-            query = "INSERT INTO tasks (user_id, title, note, is_done, priority, estimate_minutes, due_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-            params = (user_id, title, note, is_done, priority, estimated_minutes, due_at)
-        self._execute_query(query, params, commit=True)
+        params = (user_id, title, note, is_done, priority, estimated_minutes, due_at)
+        return self._execute_insert(_INSERT_TASK, params)
 
     def get_tasks_for_user_month(self, user_id: int, month_str: str) -> List[Tuple]:
         """Lấy tasks của user trong tháng (format 'YYYY-MM').
 
         Trả về danh sách tuple hoặc [] nếu không có.
         """
-        query = "SELECT task_id, title, is_done, note, due_at FROM tasks WHERE user_id = ? AND strftime('%Y-%m', due_at) = ?"
-        res = self._execute_query(query, (user_id, month_str), fetch="all")
+        query = "SELECT task_id, title, is_done, note, due_at FROM tasks WHERE user_id = ? AND due_at >= ? AND due_at < ?"
+        res = self._execute_query(query, (user_id, *_month_range(month_str)), fetch="all")
         return res or []
 
+    def get_tasks_for_user_day(self, user_id: int, day_str: str) -> List[Tuple]:
+        """Như get_tasks_for_user_month nhưng chỉ một ngày ('YYYY-MM-DD')."""
+        query = "SELECT task_id, title, is_done, note, due_at FROM tasks WHERE user_id = ? AND due_at >= ? AND due_at < ?"
+        return self._execute_query(query, (user_id, *_day_range(day_str)), fetch="all") or []
+
     def get_tasks_for_user(self, user_id: int) -> List[Tuple]:
         """Lấy tất cả tasks của user.
 
@@ -150,13 +256,142 @@ class Database:
         res = self._execute_query(query, (user_id,), fetch="all")
         return res or []
 
+    def get_tasks_page(self, user_id: int, status: str = "all", search: str = "", sort: str = "urgency",
+                       cursor: Optional[Dict[str, Any]] = None, limit: int = 50,
+                       soon: Optional[str] = None) -> Tuple[List[Tuple], int, Optional[Dict[str, Any]]]:
+        """Một trang task cá nhân đã lọc/sắp xếp trong SQL.
+
+        Args:
+            status: 'all' | 'pending' | 'done'.
+            search: từ khóa tìm trong tiêu đề và ghi chú (FTS5, khớp tiền tố).
+            sort: một khóa của _PAGE_SORTS.
+            cursor: next_cursor của trang trước (None cho trang đầu).
+            limit: số dòng tối đa của trang.
+            soon: mốc "bây giờ + 1 giờ" ('YYYY-MM-DD HH:MM:SS') của thứ tự 'urgency';
+                mặc định tính lúc gọi, các trang sau lấy lại từ cursor.
+
+        Returns:
+            (rows, total, next_cursor). rows cùng dạng get_tasks_for_user;
+            total là số task khớp bộ lọc, chỉ đếm ở trang đầu (các trang sau trả lại
+            giá trị mang trong cursor); next_cursor là None khi hết dữ liệu.
+        """
+        return self._task_page(
+            "task_id, title, is_done, due_at, estimate_minutes, priority, note",
+            "tasks", "t", f"u{int(user_id)}", "t.user_id = :owner", {'owner': user_id},
+            status, search, sort, cursor, limit, soon=soon)
+
+    def _task_page(self, columns: str, table: str, alias: str, fts_owner: str, where: str, params: Dict[str, Any],
+                   status: str, search: str, sort: str, cursor: Optional[Dict[str, Any]],
+                   limit: int, joins: str = "", soon: Optional[str] = None) -> Tuple[List[Tuple], int, Optional[Dict[str, Any]]]:
+        """Phần chung của get_tasks_page / get_group_tasks_page (phân trang keyset)."""
+        if sort not in _PAGE_SORTS:
+            sort = 'urgency'
+        direction, keys = _PAGE_SORTS[sort]
+        keys = [k.format(t=alias) for k in keys]
+        params = dict(params)
+        # mốc "1 giờ nữa" được giữ trong cursor để các trang sau dùng cùng một thứ tự
+        params['soon'] = ((cursor or {}).get('soon') or soon
+                          or (datetime.now() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'))
+
+        conditions = [where]
+        if status == "pending":
+            conditions.append(f"{alias}.is_done = 0")
+        elif status == "done":
+            conditions.append(f"{alias}.is_done = 1")
+        if search:
+            conditions.append(self._search_condition(alias, fts_owner, search, params))
+        filter_sql = " AND ".join(conditions)
+
+        continuing = bool(cursor and cursor.get('sort') == sort and cursor.get('key'))
+        if continuing and cursor.get('total') is not None:
+            # tổng đã đếm ở trang đầu, đi kèm cursor
+            total = cursor['total']
+        else:
+            total_row = self._execute_query(f"SELECT COUNT(*) FROM {table} {alias} WHERE {filter_sql}", params, fetch="one")
+            total = total_row[0] if total_row else 0
+
+        page_conditions = filter_sql
+        if continuing:
+            placeholders = ", ".join(f":c{i}" for i in range(len(keys)))
+            op = ">" if direction == "ASC" else "<"
+            page_conditions += f" AND ({', '.join(keys)}) {op} ({placeholders})"
+            params.update({f"c{i}": value for i, value in enumerate(cursor['key'])})
+        params['limit'] = limit + 1  # lấy dư một dòng để biết còn trang sau hay không
+
+        key_columns = ", ".join(f"{k} AS _k{i}" for i, k in enumerate(keys))
+        order_by = ", ".join(f"_k{i} {direction}" for i in range(len(keys)))
+        query = (f"SELECT {columns}, {key_columns} FROM {table} {alias} {joins} "
+                 f"WHERE {page_conditions} ORDER BY {order_by} LIMIT :limit")
+        res = self._execute_query(query, params, fetch="all") or []
+
+        next_cursor = None
+        if len(res) > limit:
+            res = res[:limit]
+            next_cursor = {'sort': sort, 'soon': params['soon'], 'total': total,
+                           'key': tuple(res[-1][-len(keys):])}
+        rows = [tuple(r[:-len(keys)]) for r in res]
+        return rows, total, next_cursor
+
+    def _search_condition(self, alias: str, fts_owner: str, search: str, params: Dict[str, Any]) -> str:
+        """Điều kiện WHERE cho ô tìm kiếm; ghi tham số :search vào params.
+
+        Dùng chỉ mục FTS5 khi có; nếu DB không có FTS5 hoặc chuỗi không có từ nào
+        (ví dụ chỉ gõ "%"), quay về LIKE trên tiêu đề + ghi chú.
+        """
+        match = _fts_query(search, fts_owner)
+        if match and _fts_available.get(self.db_path):
+            params['search'] = match
+            return f"{alias}.task_id IN (SELECT rowid >> 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :search)"
+        params['search'] = _like_pattern(search)
+        return (f"({alias}.title LIKE :search ESCAPE '\\' "
+                f"OR COALESCE({alias}.note, '') LIKE :search ESCAPE '\\')")
+
+    def search_tasks(self, user_id: int, text: str, limit: int = 20) -> List[Tuple]:
+        """Tìm task theo tiêu đề/ghi chú, xếp theo độ liên quan (bm25).
+
+        Phạm vi: task cá nhân của user và task nhóm user được giao hoặc làm trưởng nhóm.
+        Trả về (kind, task_id, title, note, is_done, due_at) với kind 'personal' | 'group';
+        tiêu đề được tính nặng hơn ghi chú khi xếp hạng.
+        """
+        if not search_tokens(text):
+            return []
+        if not _fts_available.get(self.db_path):
+            pattern = _like_pattern(text)
+            query = """
+                SELECT 'personal', task_id, title, note, is_done, due_at FROM tasks
+                WHERE user_id = :uid AND (title LIKE :q ESCAPE '\\' OR COALESCE(note, '') LIKE :q ESCAPE '\\')
+                UNION ALL
+                SELECT 'group', gt.task_id, gt.title, gt.note, gt.is_done, gt.due_at
+                FROM group_tasks gt JOIN groups g ON g.group_id = gt.group_id
+                WHERE (gt.assignee_id = :uid OR g.leader_id = :uid)
+                  AND (gt.title LIKE :q ESCAPE '\\' OR COALESCE(gt.note, '') LIKE :q ESCAPE '\\')
+                LIMIT :limit
+            """
+            return self._execute_query(query, {'uid': user_id, 'q': pattern, 'limit': limit}, fetch="all") or []
+        led_groups = self._execute_query("SELECT group_id FROM groups WHERE leader_id = ?", (user_id,), fetch="all") or []
+        owner = " OR ".join([f"u{int(user_id)}", f"a{int(user_id)}"] + [f"g{int(g[0])}" for g in led_groups])
+        query = f"""
+            SELECT CASE WHEN (m.rowid & 1) = 0 THEN 'personal' ELSE 'group' END,
+                   m.rowid >> 1, COALESCE(t.title, gt.title), COALESCE(t.note, gt.note),
+                   COALESCE(t.is_done, gt.is_done), COALESCE(t.due_at, gt.due_at)
+            FROM (
+                SELECT rowid, bm25({FTS_TABLE}, 10.0, 1.0, 0.0) AS score
+                FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q
+                ORDER BY score LIMIT :limit
+            ) m
+            LEFT JOIN tasks t ON (m.rowid & 1) = 0 AND t.task_id = m.rowid >> 1
+            LEFT JOIN group_tasks gt ON (m.rowid & 1) = 1 AND gt.task_id = m.rowid >> 1
+            ORDER BY m.score
+        """
+        return self._execute_query(query, {'q': _fts_query(text, owner), 'limit': limit}, fetch="all") or []
+
     def update_task_status(self, task_id: int, is_done: int) -> None:
         """Cập nhật cờ is_done của task.
 
-        Args: task_id (int), is_done (0/1).
+        Args: task_id (int), is_done (0/1). Ném sqlite3.Error khi DB thất bại.
         """
         query = "UPDATE tasks SET is_done = ? WHERE task_id = ?"
-        self._execute_query(query, (is_done, task_id), commit=True)
+        self._execute_query(query, (is_done, task_id), commit=True, raise_errors=True)
 
     def delete_task(self, task_id: int) -> None:
         """Xóa task theo id.
@@ -164,7 +399,7 @@ class Database:
         Không trả về; ném lỗi khi DB thất bại.
         """
         query = "DELETE FROM tasks WHERE task_id = ?"
-        self._execute_query(query, (task_id,), commit=True)
+        self._execute_query(query, (task_id,), commit=True, raise_errors=True)
 
     # ----------------- Nhóm & thành viên -----------------------
     def create_group(self, group_name: str, leader_id: int) -> Optional[int]:
@@ -201,53 +436,14 @@ class Database:
         return self._execute_query(query, (group_id,), fetch="all") or []
 
     # ----------------- Công việc nhóm --------------------------
-    def add_group_task(self, group_id: int, creator_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, assignee_id: Optional[int] = None, estimated_minutes: Optional[int] = None, priority: int = 4) -> None:
+    def add_group_task(self, group_id: int, creator_id: int, title: str, note: str = "", is_done: int = 0, due_at: Optional[str] = None, assignee_id: Optional[int] = None, estimated_minutes: Optional[int] = None, priority: int = 4) -> Optional[int]:
         """Thêm công việc nhóm; assignee_id có thể None.
 
-        Không trả về; commit khi thành công.
+        Trả về task_id mới hoặc None nếu lỗi.
         """
-        # Phòng thủ: một số instance DB có thể không có cột creator_id (hoặc leader_id)
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cur = conn.cursor()
-            cur.execute("PRAGMA table_info(group_tasks)")
-            cols = [r[1] for r in cur.fetchall()]
-            cur.close()
-            conn.close()
-        except Exception:
-            cols = []
-
-        # ưu tiên cột có tên 'creator_id', quay về 'leader_id' nếu có
-        has_creator = 'creator_id' in cols or 'leader_id' in cols
-        creator_col = 'creator_id' if 'creator_id' in cols else ('leader_id' if 'leader_id' in cols else None)
-
-        has_estimate = 'estimated_minutes' in cols or 'estimate_minutes' in cols
-        estimate_col = 'estimated_minutes' if 'estimated_minutes' in cols else ('estimate_minutes' if 'estimate_minutes' in cols else None)
-
-        has_priority = 'priority' in cols
-
-        if due_at is None:
-            if has_creator and creator_col and has_estimate and estimate_col and has_priority:
-                query = f"INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, {creator_col}, {estimate_col}, priority, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done, creator_id, estimated_minutes, priority)
-            elif has_creator and creator_col:
-                query = f"INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, {creator_col}, created_at) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done, creator_id)
-            else:
-                query = "INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, created_at) VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done)
-        else:
-            if has_creator and creator_col and has_estimate and estimate_col and has_priority:
-                query = f"INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, due_at, {creator_col}, {estimate_col}, priority, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done, due_at, creator_id, estimated_minutes, priority)
-            elif has_creator and creator_col:
-                query = f"INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, due_at, {creator_col}, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done, due_at, creator_id)
-            else:
-                query = "INSERT INTO group_tasks (group_id, assignee_id, title, note, is_done, due_at, created_at) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
-                params = (group_id, assignee_id, title, note, is_done, due_at)
-
-        self._execute_query(query, params, commit=True)
+        # Schema đã được chuẩn hóa khi khởi động nên chỉ cần một câu INSERT duy nhất
+        params = (group_id, assignee_id, title, note, is_done, due_at, creator_id, estimated_minutes, priority)
+        return self._execute_insert(_INSERT_GROUP_TASK, params)
 
     def get_group_tasks(self, group_id: int) -> List[Tuple]:
         """Lấy tất cả các task của một nhóm."""
@@ -261,18 +457,94 @@ class Database:
 
     def get_group_tasks_for_month(self, group_id: int, month_str: str) -> List[Tuple]:
         """Lấy tasks của nhóm trong tháng (format 'YYYY-MM')."""
-        query = "SELECT task_id, group_id, assignee_id, title, note, is_done, due_at FROM group_tasks WHERE group_id = ? AND strftime('%Y-%m', due_at) = ?"
-        return self._execute_query(query, (group_id, month_str), fetch="all") or []
+        query = "SELECT task_id, group_id, assignee_id, title, note, is_done, due_at FROM group_tasks WHERE group_id = ? AND due_at >= ? AND due_at < ?"
+        return self._execute_query(query, (group_id, *_month_range(month_str)), fetch="all") or []
+
+    def get_group_tasks_with_assignee(self, group_id: int) -> List[Tuple]:
+        """Giống get_group_tasks nhưng kèm tên người được giao (LEFT JOIN users).
+
+        Trả về (task_id, group_id, assignee_id, title, note, is_done, due_at, assignee_name, priority);
+        assignee_name là None khi task chưa được giao, priority mặc định 4 như khi sắp xếp.
+        """
+        query = """
+            SELECT gt.task_id, gt.group_id, gt.assignee_id, gt.title, gt.note, gt.is_done, gt.due_at, u.user_name,
+                   COALESCE(gt.priority, 4)
+            FROM group_tasks gt
+            LEFT JOIN users u ON u.user_id = gt.assignee_id
+            WHERE gt.group_id = ?
+            ORDER BY gt.is_done ASC, gt.due_at DESC
+        """
+        return self._execute_query(query, (group_id,), fetch="all") or []
+
+    def get_group_tasks_for_month_with_assignee(self, group_id: int, month_str: str) -> List[Tuple]:
+        """Giống get_group_tasks_for_month nhưng kèm assignee_name và priority (một truy vấn duy nhất)."""
+        query = """
+            SELECT gt.task_id, gt.group_id, gt.assignee_id, gt.title, gt.note, gt.is_done, gt.due_at, u.user_name,
+                   COALESCE(gt.priority, 4)
+            FROM group_tasks gt
+            LEFT JOIN users u ON u.user_id = gt.assignee_id
+            WHERE gt.group_id = ? AND gt.due_at >= ? AND gt.due_at < ?
+        """
+        return self._execute_query(query, (group_id, *_month_range(month_str)), fetch="all") or []
+
+    def get_group_tasks_for_day_with_assignee(self, group_id: int, day_str: str) -> List[Tuple]:
+        """Như get_group_tasks_for_month_with_assignee nhưng chỉ một ngày ('YYYY-MM-DD')."""
+        query = """
+            SELECT gt.task_id, gt.group_id, gt.assignee_id, gt.title, gt.note, gt.is_done, gt.due_at, u.user_name,
+                   COALESCE(gt.priority, 4)
+            FROM group_tasks gt
+            LEFT JOIN users u ON u.user_id = gt.assignee_id
+            WHERE gt.group_id = ? AND gt.due_at >= ? AND gt.due_at < ?
+        """
+        return self._execute_query(query, (group_id, *_day_range(day_str)), fetch="all") or []
+
+    def get_group_tasks_page(self, group_id: int, assignee_id: Optional[int] = None, status: str = "all",
+                             search: str = "", sort: str = "urgency", cursor: Optional[Dict[str, Any]] = None,
+                             limit: int = 50, soon: Optional[str] = None) -> Tuple[List[Tuple], int, Optional[Dict[str, Any]]]:
+        """Như get_tasks_page nhưng cho công việc nhóm.
+
+        assignee_id khác None thì chỉ lấy task giao cho người đó (góc nhìn thành viên).
+        rows cùng dạng get_group_tasks_with_assignee.
+        """
+        where = "gt.group_id = :owner"
+        params: Dict[str, Any] = {'owner': group_id}
+        fts_owner = f"g{int(group_id)}"
+        if assignee_id is not None:
+            where += " AND gt.assignee_id = :assignee"
+            params['assignee'] = assignee_id
+            fts_owner += f" AND a{int(assignee_id)}"
+        return self._task_page(
+            "gt.task_id, gt.group_id, gt.assignee_id, gt.title, gt.note, gt.is_done, gt.due_at, u.user_name, "
+            "COALESCE(gt.priority, 4)",
+            "group_tasks", "gt", fts_owner, where, params, status, search, sort, cursor, limit,
+            joins="LEFT JOIN users u ON u.user_id = gt.assignee_id", soon=soon)
+
+    def get_tasks_due_between(self, user_id: int, start: str, end: str, group_id: Optional[int] = None,
+                              assignee_id: Optional[int] = None) -> List[Tuple]:
+        """Task chưa xong có start < due_at <= end: (task_id, title, due_at).
+
+        group_id None -> task cá nhân của user_id; ngược lại là task của nhóm
+        (lọc thêm theo assignee_id nếu có).
+        """
+        if group_id is None:
+            query = "SELECT task_id, title, due_at FROM tasks WHERE user_id = ? AND is_done = 0 AND due_at > ? AND due_at <= ?"
+            return self._execute_query(query, (user_id, start, end), fetch="all") or []
+        query = "SELECT task_id, title, due_at FROM group_tasks WHERE group_id = ? AND is_done = 0 AND due_at > ? AND due_at <= ?"
+        params: Tuple = (group_id, start, end)
+        if assignee_id is not None:
+            query += " AND assignee_id = ?"
+            params += (assignee_id,)
+        return self._execute_query(query, params, fetch="all") or []
 
     def delete_group_task(self, task_id: int) -> None:
-        """Xóa công việc nhóm theo id."""
+        """Xóa công việc nhóm theo id; ném sqlite3.Error khi DB thất bại."""
         query = "DELETE FROM group_tasks WHERE task_id = ?"
-        self._execute_query(query, (task_id,), commit=True)
+        self._execute_query(query, (task_id,), commit=True, raise_errors=True)
 
     def update_group_task_status(self, task_id: int, is_done: int) -> None:
-        """Cập nhật trạng thái is_done cho công việc nhóm."""
+        """Cập nhật trạng thái is_done cho công việc nhóm; ném sqlite3.Error khi DB thất bại."""
         query = "UPDATE group_tasks SET is_done = ? WHERE task_id = ?"
-        self._execute_query(query, (is_done, task_id), commit=True)
+        self._execute_query(query, (is_done, task_id), commit=True, raise_errors=True)
 
     def get_task_by_id(self, task_id: int) -> Optional[Tuple]:
         """Lấy task cá nhân theo id. Trả về row hoặc None."""
@@ -289,8 +561,8 @@ class Database:
         """Lấy công việc nhóm được giao cho user trong tháng.
         Trả về danh sách hoặc [].
         """
-        query = "SELECT task_id, group_id, assignee_id, title, note, is_done, due_at FROM group_tasks WHERE assignee_id = ? AND strftime('%Y-%m', due_at) = ?"
-        return self._execute_query(query, (user_id, month_str), fetch="all") or []
+        query = "SELECT task_id, group_id, assignee_id, title, note, is_done, due_at FROM group_tasks WHERE assignee_id = ? AND due_at >= ? AND due_at < ?"
+        return self._execute_query(query, (user_id, *_month_range(month_str)), fetch="all") or []
 
     # ----------------- Tiện ích --------------------------------
     def get_user_name(self, user_id: int) -> Optional[str]:
@@ -312,59 +584,90 @@ class Database:
 
     # Thống kê hoàn thành công việc cá nhân
     def _get_personal_completion_stats(self, user_id: int) -> Dict[str, int]:
-        """Lấy số liệu 3 trạng thái: hoàn thành, quá hạn, và sắp tới."""
+        """Lấy số liệu 3 trạng thái: hoàn thành, quá hạn, và sắp tới.
+
+        Đọc từ bộ đếm task_stats (trigger cập nhật khi ghi tasks), mỗi dòng là
+        một ngày hạn của user nên không phụ thuộc số lượng task.
+        """
         stats = {'completed': 0, 'overdue': 0, 'upcoming': 0}
-        
-        # Sử dụng một câu truy vấn duy nhất với CASE để tăng hiệu suất
+
         query = """
             SELECT
-                SUM(CASE WHEN is_done = 1 THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN is_done = 0 AND due_at < date('now', 'localtime') THEN 1 ELSE 0 END) as overdue,
-                SUM(CASE WHEN is_done = 0 AND due_at >= date('now', 'localtime') THEN 1 ELSE 0 END) as upcoming
-            FROM tasks
-            WHERE user_id = ?
+                SUM(done_count) as completed,
+                SUM(CASE WHEN due_day <> '' AND due_day < date('now', 'localtime') THEN open_count ELSE 0 END) as overdue,
+                SUM(CASE WHEN due_day >= date('now', 'localtime') THEN open_count ELSE 0 END) as upcoming
+            FROM task_stats
+            WHERE kind = 0 AND owner_id = ?
         """
-        
+
         result = self._execute_query(query, (user_id,), fetch="one")
-        
+
         if result:
             stats['completed'] = result[0] if result[0] is not None else 0
             stats['overdue'] = result[1] if result[1] is not None else 0
             stats['upcoming'] = result[2] if result[2] is not None else 0
-            
+
         return stats
 
-    # Thay thế hàm _get_stats_per_group cũ bằng hàm này
     def _get_stats_per_group(self, user_id: int) -> List[Dict[str, any]]:
         """
         Lấy số liệu 3 trạng thái cho TỪNG NHÓM mà người dùng tham gia.
-        Trả về danh sách các dictionary.
+        Trả về danh sách các dictionary (đọc từ bộ đếm task_stats như trên).
         """
         stats_list = []
-        
-        # Cập nhật câu truy vấn để tính toán cả 3 trạng thái
+
         query = """
             SELECT
                 g.group_name,
-                SUM(CASE WHEN gt.is_done = 1 THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN gt.is_done = 0 AND gt.due_at < date('now', 'localtime') THEN 1 ELSE 0 END) as overdue,
-                SUM(CASE WHEN gt.is_done = 0 AND gt.due_at >= date('now', 'localtime') THEN 1 ELSE 0 END) as upcoming
-            FROM group_tasks gt
-            JOIN groups g ON gt.group_id = g.group_id
-            WHERE gt.group_id IN (SELECT group_id FROM group_members WHERE user_id = ?)
-            GROUP BY g.group_name
+                g.group_id,
+                SUM(s.done_count) as completed,
+                SUM(CASE WHEN s.due_day <> '' AND s.due_day < date('now', 'localtime') THEN s.open_count ELSE 0 END) as overdue,
+                SUM(CASE WHEN s.due_day >= date('now', 'localtime') THEN s.open_count ELSE 0 END) as upcoming
+            FROM group_members gm
+            JOIN groups g ON g.group_id = gm.group_id
+            JOIN task_stats s ON s.kind = 1 AND s.owner_id = gm.group_id
+            WHERE gm.user_id = ?
+            GROUP BY g.group_id
         """
-        
+
         results = self._execute_query(query, (user_id,), fetch="all")
         for row in results:
             if not row:
                 continue
             stats_list.append({
                 'group_name': row[0],
-                'completed': int(row[1]) if row[1] is not None else 0,
-                'overdue': int(row[2]) if row[2] is not None else 0,
-                'upcoming': int(row[3]) if row[3] is not None else 0
+                'group_id': row[1],
+                'completed': int(row[2]) if row[2] is not None else 0,
+                'overdue': int(row[3]) if row[3] is not None else 0,
+                'upcoming': int(row[4]) if row[4] is not None else 0
             })
-            
+
         return stats_list
 
+    def get_open_due_trend(self, user_id: int, days: int = 14) -> Tuple[List[int], Dict[int, List[int]]]:
+        """Số task chưa xong đến hạn mỗi ngày trong `days` ngày tới (tính cả hôm nay).
+
+        Trả về (list cho task cá nhân, {group_id: list} cho các nhóm user tham gia);
+        đọc từ task_stats theo khoảng due_day nên chỉ chạm tối đa `days` dòng mỗi owner.
+        """
+        today = date.today()
+        start, end = today.isoformat(), (today + timedelta(days=days - 1)).isoformat()
+        personal = [0] * days
+        groups: Dict[int, List[int]] = {}
+        query = """
+            SELECT s.kind, s.owner_id, s.due_day, s.open_count
+            FROM task_stats s
+            WHERE s.kind = 0 AND s.owner_id = :user_id AND s.due_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT s.kind, s.owner_id, s.due_day, s.open_count
+            FROM group_members gm
+            JOIN task_stats s ON s.kind = 1 AND s.owner_id = gm.group_id
+            WHERE gm.user_id = :user_id AND s.due_day BETWEEN :start AND :end
+        """
+        rows = self._execute_query(query, {'user_id': user_id, 'start': start, 'end': end}, fetch="all")
+        for kind, owner_id, due_day, open_count in rows or []:
+            index = (date.fromisoformat(due_day) - today).days
+            series = personal if kind == 0 else groups.setdefault(owner_id, [0] * days)
+            series[index] = open_count
+        return personal, groups
+
@@ -0,0 +1,117 @@
+"""
+    Worker truy cập CSDL chạy nền.
+
+    Mọi truy vấn gửi qua DatabaseWorker được thực thi tuần tự trên một thread
+    riêng (có kết nối SQLite riêng trong ConnectionPool), kết quả được trả về
+    GUI thread qua tín hiệu Qt. Nhờ vậy thao tác đĩa chậm không làm đứng cửa sổ.
+"""
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Managers.database_manager import Database
+
+
+class DatabaseWorker(QObject):
+    """Hàng đợi truy vấn chạy nền, trả kết quả qua tín hiệu Qt.
+
+    Ví dụ:
+        worker.submit(db.get_tasks_for_user, user_id, on_result=self._on_tasks)
+
+    Callback luôn được gọi trên GUI thread. Một worker thread duy nhất đảm bảo
+    các lệnh đọc/ghi được thực thi đúng thứ tự đã gửi.
+    """
+    # (request_id, thành công?, kết quả hoặc exception) — phát từ worker thread
+    _delivered = pyqtSignal(int, bool, object)
+    # Tín hiệu công khai cho ai muốn theo dõi mọi kết quả
+    request_finished = pyqtSignal(int, object)
+    request_failed = pyqtSignal(int, object)
+
+    def __init__(self, db: Optional[Database] = None, parent=None):
+        super().__init__(parent)
+        self.db = db or Database()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-worker')
+        self._ids = itertools.count(1)
+        self._callbacks: Dict[int, Tuple[Optional[Callable], Optional[Callable]]] = {}
+        self._closed = False
+        # Tín hiệu phát từ worker thread tới QObject thuộc GUI thread -> queued connection
+        self._delivered.connect(self._dispatch)
+
+    def submit(self, fn: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, **kwargs) -> int:
+        """Đưa fn(*args, **kwargs) vào hàng đợi; trả về request_id (dùng cho cancel)."""
+        request_id = next(self._ids)
+        if self._closed:
+            logging.warning("DatabaseWorker đã dừng, bỏ qua request %s", request_id)
+            return request_id
+        self._callbacks[request_id] = (on_result, on_error)
+        self._executor.submit(self._run, request_id, fn, args, kwargs)
+        return request_id
+
+    def cancel(self, request_id: Optional[int]) -> None:
+        """Bỏ callback của request (kết quả trễ sẽ bị bỏ qua)."""
+        if request_id is not None:
+            self._callbacks.pop(request_id, None)
+
+    def is_pending(self, request_id: Optional[int]) -> bool:
+        return request_id in self._callbacks
+
+    def shutdown(self) -> None:
+        """Dừng worker: chờ lệnh đang chạy, đóng kết nối của worker thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._callbacks.clear()
+        try:
+            self._executor.submit(self.db._pool.release_current)
+        except RuntimeError:
+            pass
+        self._executor.shutdown(wait=True)
+
+    def _run(self, request_id, fn, args, kwargs):
+        # Chạy trên worker thread
+        if request_id not in self._callbacks:
+            return  # đã bị hủy trước khi tới lượt
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logging.exception("[DB WORKER] request %s thất bại", request_id)
+            self._delivered.emit(request_id, False, e)
+            return
+        self._delivered.emit(request_id, True, result)
+
+    def _dispatch(self, request_id, ok, payload):
+        # Chạy trên GUI thread
+        on_result, on_error = self._callbacks.pop(request_id, (None, None))
+        callback = on_result if ok else on_error
+        (self.request_finished if ok else self.request_failed).emit(request_id, payload)
+        if callback is None:
+            return
+        try:
+            callback(payload)
+        except Exception:
+            # ví dụ widget nhận kết quả đã bị đóng trước khi truy vấn xong
+            logging.exception("[DB WORKER] callback của request %s lỗi", request_id)
+
+
+_shared_worker: Optional[DatabaseWorker] = None
+
+
+def get_db_worker() -> DatabaseWorker:
+    """Worker dùng chung của ứng dụng (tạo lười, cần QApplication đã tồn tại)."""
+    global _shared_worker
+    if _shared_worker is None:
+        _shared_worker = DatabaseWorker()
+    return _shared_worker
+
+
+def shutdown_db_worker() -> None:
+    """Dừng worker dùng chung; gọi khi ứng dụng thoát."""
+    global _shared_worker
+    if _shared_worker is not None:
+        _shared_worker.shutdown()
+        _shared_worker = None
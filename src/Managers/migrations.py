@@ -0,0 +1,371 @@
+"""
+    Migration schema theo phiên bản, dựa trên `PRAGMA user_version`.
+
+    Mỗi bước là một cặp (version, hàm); migrate() chạy lần lượt các bước có
+    version lớn hơn user_version hiện tại trong một transaction, rồi ghi lại
+    user_version mới. Nhờ vậy mọi file todolist_database.db cũ đều được đưa về
+    cùng một schema chuẩn khi khởi động, và code truy vấn không cần dò cột lúc chạy.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+# Schema chuẩn của group_tasks (phiên bản mới nhất)
+GROUP_TASKS_COLUMNS = [
+    ("task_id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    ("group_id", "INTEGER NOT NULL"),
+    ("assignee_id", "INTEGER"),
+    ("title", "TEXT NOT NULL"),
+    ("note", "TEXT"),
+    ("is_done", "INTEGER DEFAULT 0"),
+    ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("due_at", "TIMESTAMP"),
+    ("creator_id", "INTEGER"),
+    ("estimated_minutes", "INTEGER"),
+    ("priority", "INTEGER NOT NULL DEFAULT 4"),
+]
+
+# Chỉ mục phụ cho các truy vấn theo tháng (user/group/assignee + khoảng due_at).
+# task_id là rowid nên đã nằm sẵn trong mỗi chỉ mục.
+INDEXES = [
+    ("idx_tasks_user_due", "tasks", "user_id, due_at"),
+    ("idx_group_tasks_group_due", "group_tasks", "group_id, due_at"),
+    ("idx_group_tasks_assignee_due", "group_tasks", "assignee_id, due_at"),
+]
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _m001_base_schema(conn: sqlite3.Connection) -> None:
+    """Các bảng gốc (giống Data/database.py); không đổi gì nếu đã tồn tại."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_name TEXT UNIQUE NOT NULL,
+            user_password TEXT NOT NULL,
+            email TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS groups (
+            group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_name TEXT UNIQUE NOT NULL,
+            leader_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (leader_id) REFERENCES users(user_id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            note TEXT,
+            is_done INTEGER DEFAULT 0,
+            priority INTEGER NOT NULL DEFAULT 4,
+            estimate_minutes INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            due_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS group_members (
+            user_id INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, group_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (group_id) REFERENCES groups(group_id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS group_tasks (
+            task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER NOT NULL,
+            assignee_id INTEGER,
+            title TEXT NOT NULL,
+            note TEXT,
+            is_done INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            due_at TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups(group_id),
+            FOREIGN KEY (assignee_id) REFERENCES users(user_id)
+        )
+    """)
+
+
+def _m002_group_task_meta(conn: sqlite3.Connection) -> None:
+    """Chuẩn hóa group_tasks: creator_id, estimated_minutes, priority.
+
+    Một số DB cũ dùng tên leader_id / estimate_minutes (có thể NOT NULL, không
+    default); khi gặp, bảng được dựng lại theo schema chuẩn và dữ liệu được
+    chép sang. Nếu không, chỉ cần ADD COLUMN các cột còn thiếu.
+    """
+    cols = _table_columns(conn, "group_tasks")
+    canonical = [name for name, _ in GROUP_TASKS_COLUMNS]
+    legacy = [c for c in cols if c not in canonical]
+    if not legacy:
+        for name, decl in GROUP_TASKS_COLUMNS:
+            if name not in cols:
+                conn.execute(f"ALTER TABLE group_tasks ADD COLUMN {name} {decl}")
+        return
+
+    logging.info("[DB MIGRATION] dựng lại group_tasks (cột cũ: %s)", ", ".join(legacy))
+
+    def source(name: str, fallback: str) -> str:
+        if name in cols:
+            return name
+        return fallback if fallback in cols else "NULL"
+
+    select_exprs = []
+    for name, _ in GROUP_TASKS_COLUMNS:
+        if name == "creator_id":
+            select_exprs.append(source("creator_id", "leader_id"))
+        elif name == "estimated_minutes":
+            select_exprs.append(source("estimated_minutes", "estimate_minutes"))
+        elif name == "priority":
+            select_exprs.append(f"COALESCE({source('priority', 'priority')}, 4)")
+        elif name == "created_at":
+            select_exprs.append(f"COALESCE({source('created_at', 'created_at')}, CURRENT_TIMESTAMP)")
+        else:
+            select_exprs.append(source(name, name))
+
+    column_defs = ",\n            ".join(f"{name} {decl}" for name, decl in GROUP_TASKS_COLUMNS)
+    conn.execute(f"""
+        CREATE TABLE group_tasks_new (
+            {column_defs},
+            FOREIGN KEY (group_id) REFERENCES groups(group_id),
+            FOREIGN KEY (assignee_id) REFERENCES users(user_id)
+        )
+    """)
+    conn.execute(
+        f"INSERT INTO group_tasks_new ({', '.join(canonical)}) "
+        f"SELECT {', '.join(select_exprs)} FROM group_tasks"
+    )
+    conn.execute("DROP TABLE group_tasks")
+    conn.execute("ALTER TABLE group_tasks_new RENAME TO group_tasks")
+
+
+def _m003_month_indexes(conn: sqlite3.Connection) -> None:
+    """Chỉ mục (owner, due_at) cho truy vấn khoảng tháng."""
+    for name, table, columns in INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+# Chỉ mục full-text chung cho tiêu đề + ghi chú của tasks và group_tasks.
+# rowid = task_id * 2 + kind (0: tasks, 1: group_tasks) để trigger xóa/sửa tra
+# thẳng theo rowid. Cột owner chứa token phạm vi ('u<user_id>' cho task cá nhân,
+# 'g<group_id>' và 'a<assignee_id>' cho task nhóm) để MATCH chỉ đọc doclist của
+# đúng người dùng/nhóm thay vì toàn bộ bảng. remove_diacritics 2 cho phép gõ
+# "lam" tìm ra "Làm"; prefix='2 3' tăng tốc truy vấn tiền tố ngắn khi đang gõ.
+FTS_TABLE = "task_fts"
+FTS_SOURCES = [
+    # (bảng, kind, cột kích hoạt cập nhật, biểu thức owner theo {row})
+    ("tasks", 0, "title, note, user_id", "'u' || {row}.user_id"),
+    ("group_tasks", 1, "title, note, group_id, assignee_id",
+     "'g' || {row}.group_id || CASE WHEN {row}.assignee_id IS NULL THEN '' ELSE ' a' || {row}.assignee_id END"),
+]
+
+
+def _m004_task_fts(conn: sqlite3.Connection) -> None:
+    """Bảng FTS5 task_fts + trigger đồng bộ, nạp dữ liệu có sẵn."""
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                title, note, owner,
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite build không có FTS5: tìm kiếm sẽ dùng LIKE (xem Database._search_condition);
+        # ensure_task_fts() thử tạo lại mỗi lần khởi động
+        logging.warning("[DB MIGRATION] SQLite không hỗ trợ FTS5, bỏ qua chỉ mục tìm kiếm")
+        return
+    for table, kind, watched, owner in FTS_SOURCES:
+        new_owner, new_rowid = owner.format(row="new"), f"new.task_id * 2 + {kind}"
+        old_rowid = f"old.task_id * 2 + {kind}"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {FTS_TABLE} (rowid, title, note, owner)
+                VALUES ({new_rowid}, new.title, COALESCE(new.note, ''), {new_owner});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid = {old_rowid};
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_au AFTER UPDATE OF {watched} ON {table} BEGIN
+                UPDATE {FTS_TABLE} SET title = new.title, note = COALESCE(new.note, ''), owner = {new_owner}
+                WHERE rowid = {old_rowid};
+            END
+        """)
+        conn.execute(f"DELETE FROM {FTS_TABLE} WHERE (rowid & 1) = {kind}")
+        conn.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, note, owner) "
+            f"SELECT task_id * 2 + {kind}, title, COALESCE(note, ''), {owner.format(row=table)} FROM {table}"
+        )
+
+
+
+# Bộ đếm thống kê duy trì bằng trigger: mỗi (kind, owner_id, due_day) giữ số task
+# đã xong / chưa xong. kind 0: tasks (owner = user_id), 1: group_tasks (owner =
+# group_id); due_day là 10 ký tự đầu của due_at ('' nếu không có hạn). Trang thống
+# kê chỉ cộng vài dòng theo owner thay vì quét toàn bộ tasks/group_tasks, còn
+# quá hạn/sắp tới được tách bằng due_day so với ngày hiện tại lúc đọc.
+STATS_TABLE = "task_stats"
+STATS_SOURCES = [
+    # (bảng, kind, cột owner, cột kích hoạt cập nhật)
+    ("tasks", 0, "user_id", "is_done, due_at, user_id"),
+    ("group_tasks", 1, "group_id", "is_done, due_at, group_id"),
+]
+
+
+def _stats_delta(kind: int, owner_col: str, row: str, sign: str) -> str:
+    """Câu upsert cộng/trừ một task ({row} = new/old) vào bộ đếm."""
+    done = f"CASE WHEN {row}.is_done = 1 THEN {sign}1 ELSE 0 END"
+    open_ = f"CASE WHEN {row}.is_done = 1 THEN 0 ELSE {sign}1 END"
+    return f"""
+        INSERT INTO {STATS_TABLE} (kind, owner_id, due_day, done_count, open_count)
+        VALUES ({kind}, {row}.{owner_col}, COALESCE(substr({row}.due_at, 1, 10), ''), {done}, {open_})
+        ON CONFLICT (kind, owner_id, due_day) DO UPDATE SET
+            done_count = done_count + excluded.done_count,
+            open_count = open_count + excluded.open_count;
+    """
+
+
+def _stats_prune(kind: int, owner_col: str) -> str:
+    """Bỏ dòng đếm đã về 0 (giữ bảng nhỏ sau khi xóa/dời hạn)."""
+    return f"""
+        DELETE FROM {STATS_TABLE}
+        WHERE kind = {kind} AND owner_id = old.{owner_col}
+          AND due_day = COALESCE(substr(old.due_at, 1, 10), '')
+          AND done_count = 0 AND open_count = 0;
+    """
+
+
+def _m005_task_stats(conn: sqlite3.Connection) -> None:
+    """Bảng task_stats + trigger cập nhật bộ đếm, nạp từ dữ liệu có sẵn."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            kind INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            due_day TEXT NOT NULL,
+            done_count INTEGER NOT NULL DEFAULT 0,
+            open_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, owner_id, due_day)
+        ) WITHOUT ROWID
+    """)
+    for table, kind, owner_col, watched in STATS_SOURCES:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN
+                {_stats_delta(kind, owner_col, "new", "+")}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN
+                {_stats_delta(kind, owner_col, "old", "-")}
+                {_stats_prune(kind, owner_col)}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_{table}_au AFTER UPDATE OF {watched} ON {table} BEGIN
+                {_stats_delta(kind, owner_col, "old", "-")}
+                {_stats_delta(kind, owner_col, "new", "+")}
+                {_stats_prune(kind, owner_col)}
+            END
+        """)
+        conn.execute(f"DELETE FROM {STATS_TABLE} WHERE kind = {kind}")
+        conn.execute(f"""
+            INSERT INTO {STATS_TABLE} (kind, owner_id, due_day, done_count, open_count)
+            SELECT {kind}, {owner_col}, COALESCE(substr(due_at, 1, 10), ''),
+                   SUM(CASE WHEN is_done = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN is_done = 1 THEN 0 ELSE 1 END)
+            FROM {table}
+            WHERE {owner_col} IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+
+# Danh sách bước theo thứ tự; KHÔNG sửa bước đã phát hành, chỉ thêm bước mới ở cuối.
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _m001_base_schema),
+    (2, _m002_group_task_meta),
+    (3, _m003_month_indexes),
+    (4, _m004_task_fts),
+    (5, _m005_task_stats),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Đưa DB lên LATEST_VERSION; trả về phiên bản sau khi chạy.
+
+    Mỗi bước chạy trong transaction riêng, cùng với việc cập nhật user_version,
+    nên nếu một bước lỗi thì DB vẫn ở phiên bản hợp lệ trước đó.
+    """
+    current = get_version(conn)
+    if current >= LATEST_VERSION:
+        ensure_task_fts(conn)
+        return current
+    previous_isolation = conn.isolation_level
+    # tự quản lý BEGIN/COMMIT để DDL và user_version nằm cùng một transaction
+    conn.isolation_level = None
+    try:
+        for version, step in MIGRATIONS:
+            if version <= current:
+                continue
+            conn.execute("BEGIN")
+            try:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                logging.exception("[DB MIGRATION] bước %s (%s) thất bại", version, step.__name__)
+                raise
+            logging.info("[DB MIGRATION] đã áp dụng bước %s: %s", version, step.__name__)
+            current = version
+    finally:
+        conn.isolation_level = previous_isolation
+    ensure_task_fts(conn)
+    return current
+
+
+def ensure_task_fts(conn: sqlite3.Connection) -> bool:
+    """Tạo task_fts nếu DB đã qua bước 4 mà vẫn chưa có bảng; trả về có bảng hay không.
+
+    Bước 4 bỏ qua chỉ mục khi SQLite không có FTS5 nhưng user_version vẫn tăng,
+    nên việc kiểm tra dựa vào sqlite_master chứ không dựa vào phiên bản: mở lại
+    DB bằng bản SQLite có FTS5 thì chỉ mục được tạo (và nạp dữ liệu) lúc đó.
+    """
+    if _table_exists(conn, FTS_TABLE):
+        return True
+    if get_version(conn) < 4:
+        return False
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN")
+        try:
+            _m004_task_fts(conn)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            logging.exception("[DB MIGRATION] không tạo được %s", FTS_TABLE)
+            return False
+    finally:
+        conn.isolation_level = previous_isolation
+    return _table_exists(conn, FTS_TABLE)
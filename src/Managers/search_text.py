@@ -0,0 +1,63 @@
+"""
+    Quy tắc tách từ cho ô tìm kiếm task.
+
+    Dùng chung giữa Database (dựng biểu thức MATCH cho FTS5) và DoNowView (lọc
+    lại trong bộ nhớ khi người dùng gõ tiếp), để hai nơi luôn cho cùng kết quả.
+    Tách từ mô phỏng tokenizer `unicode61 remove_diacritics 2` của task_fts:
+    từ là dãy chữ/số, bỏ dấu, không phân biệt hoa thường.
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+
+# chữ/số Unicode, không gồm '_' (unicode61 coi '_' là dấu phân cách)
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def fold(text: str) -> str:
+    """Chữ thường, bỏ dấu ('Làm Bài' -> 'lam bai')."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def search_tokens(text: str) -> List[str]:
+    """Các từ trong chuỗi tìm kiếm (đã fold)."""
+    return _TOKEN.findall(fold(text or ""))
+
+
+def last_token_is_prefix(text: str) -> bool:
+    """Từ cuối còn đang gõ dở (chuỗi không kết thúc bằng khoảng trắng)."""
+    return bool(text) and not text[-1].isspace()
+
+
+def matches(query: str, *fields: Optional[str]) -> bool:
+    """query có khớp nội dung các fields không, theo đúng luật của FTS.
+
+    Mọi từ phải xuất hiện nguyên vẹn trong một field, riêng từ cuối (nếu đang
+    gõ dở) chỉ cần là tiền tố của một từ.
+    """
+    terms = search_tokens(query)
+    if not terms:
+        return True
+    words = set()
+    for field in fields:
+        if field:
+            words.update(search_tokens(field))
+    *complete, last = terms
+    if any(term not in words for term in complete):
+        return False
+    if last_token_is_prefix(query):
+        return any(word.startswith(last) for word in words)
+    return last in words
+
+
+def is_refinement(previous: str, current: str) -> bool:
+    """Kết quả của current chắc chắn là tập con kết quả của previous.
+
+    Đúng khi current chỉ gõ thêm vào sau previous và cả hai đều tìm theo từ
+    (chuỗi không có từ nào dùng LIKE, không lọc lại được bằng matches()).
+    """
+    if not current.startswith(previous) or not search_tokens(current):
+        return False
+    return previous == "" or bool(search_tokens(previous))
@@ -0,0 +1,125 @@
+"""
+    Kiểu bản ghi task gọn nhẹ dùng chung cho mọi view (trang chủ, lịch, hộp thoại).
+
+    Mỗi dòng SQL được chuyển thành TaskRecord đúng một lần khi tải; due_at được
+    parse sẵn thành epoch (giờ địa phương) nên việc sắp xếp/so sánh hạn chót về
+    sau không phải parse lại chuỗi. Task cá nhân và task nhóm dùng cùng một kiểu,
+    phân biệt bằng is_group.
+"""
+
+import string
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_DUE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+# COLLATE NOCASE của SQLite chỉ gộp hoa/thường cho A-Z
+_NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def parse_due_epoch(due_at) -> Optional[float]:
+    """'YYYY-MM-DD HH:MM:SS' (hoặc ISO) -> epoch giây; None nếu rỗng/không hợp lệ."""
+    if not due_at:
+        return None
+    if isinstance(due_at, datetime):
+        return due_at.timestamp()
+    s = str(due_at).replace('T', ' ').rstrip('Z')
+    for fmt in _DUE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).timestamp()
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(s).timestamp()
+    except ValueError:
+        return None
+
+
+class TaskRecord:
+    """Một task (cá nhân hoặc nhóm) đã chuẩn hóa cho các view.
+
+    assignee_name là None khi task nhóm chưa được giao; view tự chọn nhãn hiển thị.
+    """
+    __slots__ = ('task_id', 'title', 'note', 'is_done', 'due_at', 'due_epoch',
+                 'priority', 'estimated_minutes', 'assignee_id', 'assignee_name',
+                 'is_group', 'group_id')
+
+    def __init__(self, task_id: int, title: str, note: str = "", is_done: bool = False,
+                 due_at: Optional[str] = None, priority: int = 4,
+                 estimated_minutes: Optional[int] = None, assignee_id: Optional[int] = None,
+                 assignee_name: Optional[str] = None, is_group: bool = False,
+                 group_id: Optional[int] = None):
+        self.task_id = int(task_id)
+        self.title = title or ""
+        self.note = note or ""
+        self.is_done = bool(is_done)
+        self.due_at = due_at
+        self.due_epoch = parse_due_epoch(due_at)
+        self.priority = priority if priority is not None else 4
+        self.estimated_minutes = estimated_minutes
+        self.assignee_id = assignee_id
+        self.assignee_name = assignee_name or None
+        self.is_group = bool(is_group)
+        self.group_id = group_id
+
+    @classmethod
+    def from_personal_row(cls, r: Sequence) -> 'TaskRecord':
+        """(task_id, title, is_done, due_at, estimate_minutes, priority, note) — xem Database.get_tasks_page."""
+        return cls(r[0], r[1], note=r[6], is_done=r[2], due_at=r[3],
+                   priority=r[5], estimated_minutes=r[4])
+
+    @classmethod
+    def from_month_row(cls, r: Sequence) -> 'TaskRecord':
+        """(task_id, title, is_done, note, due_at) — xem Database.get_tasks_for_user_month."""
+        return cls(r[0], r[1], note=r[3], is_done=r[2], due_at=r[4])
+
+    @classmethod
+    def from_group_row(cls, r: Sequence) -> 'TaskRecord':
+        """(task_id, group_id, assignee_id, title, note, is_done, due_at, assignee_name, priority)
+        — xem Database.get_group_tasks_with_assignee."""
+        assignee_id = r[2]
+        return cls(r[0], r[3], note=r[4], is_done=r[5], due_at=r[6], priority=r[8],
+                   assignee_id=assignee_id, assignee_name=r[7] if assignee_id else None,
+                   is_group=True, group_id=r[1])
+
+    @property
+    def due_datetime(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.due_epoch) if self.due_epoch is not None else None
+
+    def set_due_at(self, due_at: Optional[str]) -> None:
+        self.due_at = due_at
+        self.due_epoch = parse_due_epoch(due_at)
+
+    def __repr__(self):
+        kind = "group" if self.is_group else "personal"
+        return f"TaskRecord({self.task_id}, {self.title!r}, {kind}, done={self.is_done}, due={self.due_at!r})"
+
+
+def group_by_day(tasks: Iterable[TaskRecord]) -> Dict[int, List[TaskRecord]]:
+    """{ngày trong tháng: [task]} theo hạn chót; bỏ task không có hạn chót hợp lệ."""
+    tasks_by_day = {}
+    for task in tasks:
+        if task.due_epoch is not None:
+            tasks_by_day.setdefault(datetime.fromtimestamp(task.due_epoch).day, []).append(task)
+    return tasks_by_day
+
+
+def urgency_key(task: TaskRecord, soon_epoch: float) -> Tuple:
+    """Khóa sắp xếp 'urgency', khớp với _PAGE_SORTS['urgency'] trong Database.
+
+    (chưa xong trước, priority, quá hạn/không hạn/hạn trong 1 giờ trước,
+    rồi theo hạn chót, task_id). soon_epoch là mốc "bây giờ + 1 giờ" được cố
+    định cho cả danh sách để thứ tự không trôi theo thời gian.
+    """
+    due = task.due_epoch
+    urgent = due is None or due <= soon_epoch
+    return (task.is_done, task.priority, 0 if urgent else 1, 0.0 if urgent else due, task.task_id)
+
+
+def nocase_key(text: Optional[str]) -> str:
+    """Khóa so sánh giống COLLATE NOCASE của SQLite (thứ tự 'title' trong Database).
+
+    Chỉ hạ chữ hoa ASCII; 'Đ', 'Ư', 'Ơ'... giữ nguyên như SQLite, nên task chèn
+    bằng bisect nằm đúng chỗ so với các trang tải từ SQL. Thứ tự code point của
+    str trùng với thứ tự byte UTF-8 mà SQLite so sánh.
+    """
+    return (text or "").translate(_NOCASE_FOLD)
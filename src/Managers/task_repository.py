@@ -0,0 +1,119 @@
+"""
+    Kho task dùng chung cho các view, ghi thẳng xuống Database.
+
+    Mọi thao tác thêm/đổi trạng thái/xóa task đi qua TaskRepository: một lệnh
+    ghi SQL, cập nhật TaskRecord trong cache rồi phát đúng một tín hiệu
+    (task_added / task_updated / task_deleted). Trang chủ, lịch và thống kê
+    tự cập nhật phần của mình từ tín hiệu đó thay vì tải lại từ SQLite hay gọi
+    trực tiếp vào nhau.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Managers.database_manager import Database
+from Managers.task_records import TaskRecord
+
+# các trường mọi truy vấn task đều trả về; priority/estimate chỉ có ở một số truy vấn
+_SHARED_FIELDS = ('title', 'note', 'is_done', 'due_at', 'due_epoch', 'assignee_id', 'assignee_name')
+
+
+class TaskRepository(QObject):
+    """Cache TaskRecord theo (is_group, task_id) + ghi xuyên xuống DB.
+
+    Các view đăng ký record đã tải qua track() để cùng dùng một đối tượng
+    cho cùng một task. Tín hiệu được phát đồng bộ trên GUI thread ngay sau
+    khi lệnh ghi thành công; lỗi ghi (sqlite3.Error) được ném lại cho nơi gọi
+    và khi đó cache không đổi, không có tín hiệu nào được phát.
+    """
+    task_added = pyqtSignal(object)          # TaskRecord
+    task_updated = pyqtSignal(object)        # TaskRecord (đã mang giá trị mới)
+    task_deleted = pyqtSignal(int, bool)     # (task_id, is_group)
+
+    def __init__(self, db: Optional[Database] = None, parent=None):
+        super().__init__(parent)
+        self.db = db or Database()
+        self._records: Dict[Tuple[bool, int], TaskRecord] = {}
+
+    # ----- cache -----
+
+    def track(self, records: Iterable[TaskRecord], full: bool = True) -> List[TaskRecord]:
+        """Đăng ký các record vừa tải; trả về list record dùng chung.
+
+        Nếu task đã có trong cache, bản đang giữ được cập nhật theo dữ liệu mới
+        và được trả về thay cho bản vừa tải. full=False: record đến từ truy vấn
+        không có priority/estimate (lịch tháng), chỉ cập nhật các trường chung.
+        """
+        fields = TaskRecord.__slots__ if full else _SHARED_FIELDS
+        shared = []
+        for record in records:
+            key = (record.is_group, record.task_id)
+            cached = self._records.get(key)
+            if cached is None or cached is record:
+                self._records[key] = record
+                shared.append(record)
+                continue
+            for name in fields:
+                setattr(cached, name, getattr(record, name))
+            shared.append(cached)
+        return shared
+
+    def cached(self, task_id: int, is_group: bool = False) -> Optional[TaskRecord]:
+        """Record trong cache (không truy vấn DB)."""
+        return self._records.get((bool(is_group), task_id))
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    # ----- ghi xuyên -----
+
+    def add_personal_task(self, user_id: int, title: str, note: str = "", due_at: Optional[str] = None,
+                          estimated_minutes: Optional[int] = None, priority: int = 4) -> Optional[TaskRecord]:
+        task_id = self.db.add_task_with_meta(user_id, title, note=note, is_done=0, due_at=due_at,
+                                             estimated_minutes=estimated_minutes, priority=priority)
+        if not task_id:
+            return None
+        return self._added(TaskRecord(task_id, title, note, False, due_at, priority, estimated_minutes))
+
+    def add_group_task(self, group_id: int, creator_id: int, title: str, note: str = "",
+                       due_at: Optional[str] = None, assignee_id: Optional[int] = None,
+                       assignee_name: Optional[str] = None) -> Optional[TaskRecord]:
+        task_id = self.db.add_group_task(group_id, creator_id=creator_id, title=title, note=note,
+                                         is_done=0, due_at=due_at, assignee_id=assignee_id)
+        if not task_id:
+            return None
+        if assignee_id and not assignee_name:
+            assignee_name = self.db.get_user_name(assignee_id)
+        return self._added(TaskRecord(task_id, title, note, False, due_at, assignee_id=assignee_id,
+                                      assignee_name=assignee_name if assignee_id else None,
+                                      is_group=True, group_id=group_id))
+
+    def set_done(self, task_id: int, is_done: bool, is_group: bool = False) -> TaskRecord:
+        """Đổi trạng thái xong/chưa xong (một lệnh UPDATE); lỗi DB được ném lại trước khi đụng cache."""
+        if is_group:
+            self.db.update_group_task_status(task_id, int(bool(is_done)))
+        else:
+            self.db.update_task_status(task_id, int(bool(is_done)))
+        record = self._records.get((bool(is_group), task_id))
+        if record is None:
+            # task chưa view nào tải: tín hiệu vẫn cần mang trạng thái mới
+            record = TaskRecord(task_id, "", is_done=is_done, is_group=is_group)
+        record.is_done = bool(is_done)
+        self.task_updated.emit(record)
+        return record
+
+    def delete(self, task_id: int, is_group: bool = False) -> None:
+        """Xóa task (một lệnh DELETE); lỗi DB được ném lại trước khi đụng cache."""
+        if is_group:
+            self.db.delete_group_task(task_id)
+        else:
+            self.db.delete_task(task_id)
+        self._records.pop((bool(is_group), task_id), None)
+        self.task_deleted.emit(task_id, bool(is_group))
+
+    def _added(self, record: TaskRecord) -> TaskRecord:
+        self._records[(record.is_group, record.task_id)] = record
+        self.task_added.emit(record)
+        return record
+
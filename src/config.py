@@ -54,4 +54,33 @@ COLOR_BORDER = "#EAECEF"
 COLOR_HOVER = "#5AA0F2"
 
 # Priority colors mapping used in home_page
-PRIORITY_COLORS = {1: "#d1453b", 2: "#09eb32", 3: "#4073d6", 4: "#808080"}
\ No newline at end of file
+PRIORITY_COLORS = {1: "#d1453b", 2: "#09eb32", 3: "#4073d6", 4: "#808080"}
+# Số task mỗi trang khi DoNowView tải danh sách từ SQL (cuộn tới cuối sẽ tải tiếp)
+TASK_PAGE_SIZE = 50
+
+# Thời gian chờ (ms) sau lần gõ phím cuối trước khi chạy tìm kiếm ở DoNowView
+SEARCH_DEBOUNCE_MS = 250
+
+# Nhắc hạn chót: báo trước bao nhiêu phút, và nạp trước các task có hạn trong bao nhiêu giờ tới
+REMINDER_LEAD_MINUTES = 15
+REMINDER_HORIZON_HOURS = 6
+
+# Số tháng lịch giữ trong cache LRU của CalendarWidget (gồm cả tháng prefetch)
+MONTH_CACHE_SIZE = 12
+
+# Số ngày tới hiển thị trên sparkline "sắp đến hạn" của trang thống kê
+STATS_TREND_DAYS = 14
+
+# Sau khi cửa sổ chính hiện ra bao lâu (ms) thì dựng sẵn trang lịch/thống kê lúc rảnh; 0 = chỉ dựng khi mở
+PAGE_WARM_UP_DELAY_MS = 1500
+
+# Giới hạn bộ nhớ (byte) của cache avatar tròn dùng chung (MainMenu/avatar_utils.py)
+AVATAR_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Kích thước avatar tròn mà UI dùng: danh sách task (TaskDetailItemWidget) và SidePanel.
+# Thumbnail PNG các cỡ này được tạo sẵn khi người dùng đổi avatar (assets/avatars/thumbs).
+AVATAR_LIST_SIZE = 44
+AVATAR_PANEL_SIZE = 120
+AVATAR_THUMB_SIZES = (AVATAR_LIST_SIZE, AVATAR_PANEL_SIZE)
+# Ảnh gốc được thu nhỏ về cạnh dài tối đa này trước khi lưu
+AVATAR_MASTER_MAX_PX = 512
@@ -2,15 +2,13 @@
 import os
 import random
 import re
-import smtplib
-import ssl
-from email.message import EmailMessage
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QStackedWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QDialog)
 from PyQt5.QtCore import Qt, QPropertyAnimation, QPoint
 from PyQt5.QtGui import QFont 
 from config import *
-from MainMenu.main_window import MainWindow
+# MainWindow (và các trang lịch/thống kê) chỉ được import sau khi đăng nhập thành công,
+# để cửa sổ đăng nhập hiện ra mà không phải nạp toàn bộ giao diện chính.
 from Managers.database_manager import Database
 from PyQt5.QtGui import QIcon
 
@@ -271,6 +269,11 @@ class ForgotPasswordDialog(QDialog):
         subject = 'Mã xác thực đặt lại mật khẩu của bạn'
         body = f"Mã xác thực của bạn là: {code}"
 
+        # smtplib/ssl chỉ cần khi thực sự gửi mail
+        import smtplib
+        import ssl
+        from email.message import EmailMessage
+
         em = EmailMessage()
         em['From'] = email_sender
         em['To'] = email_receiver
@@ -573,6 +576,8 @@ class LoginRegisterApp(QMainWindow):
             user = db.get_login_user(email, password)
             if user:
                 user_id, user_name = user[0], user[1]
+                from MainMenu.main_window import MainWindow
+
                 self._allow_close = True
                 self.close()
                 self.main_window = MainWindow(user_id, user_name)
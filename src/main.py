@@ -1,19 +1,49 @@
 # -*- coding: utf-8 -*-
 import sys
-import logging
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QFontDatabase, QFont
-from PyQt5.QtGui import QIcon
-from login import LoginRegisterApp
-from config import FONT_PATH
+import startup_profiler
+
+# Bật profiler khởi động (nếu được yêu cầu) trước các import nặng để đo được chi phí import
+PROFILER = startup_profiler.start_from_args(sys.argv)
+
+with startup_profiler.phase("main_imports"):
+    import logging
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QFontDatabase, QFont
+    from PyQt5.QtGui import QIcon
+    from login import LoginRegisterApp
+    from config import FONT_PATH
+    from Managers.connection_pool import close_all_pools
+    from Managers.db_worker import shutdown_db_worker
+
+
+def _open_profile_user_window(user_id):
+    """--profile-user (chỉ cùng --profile-headless): mở thẳng MainWindow của user
+    (bỏ qua đăng nhập) để đo phần còn lại."""
+    from Managers.database_manager import Database
+
+    user_name = Database().get_user_name(user_id) or str(user_id)
+    with startup_profiler.phase("main_window_import"):
+        from MainMenu.main_window import MainWindow
+    with startup_profiler.phase("main_window_init"):
+        main_window = MainWindow(user_id, user_name)
+    main_window.home_widget.first_page_loaded.connect(lambda: startup_profiler.mark("home_first_page"))
+    with startup_profiler.phase("main_window_show"):
+        main_window.show()
+    return main_window
+
 
 if __name__ == "__main__":
     # Tạo đối tượng ứng dụng
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("qapplication"):
+        app = QApplication(sys.argv)
+    # Dừng worker CSDL nền rồi đóng các kết nối SQLite dùng lâu dài khi ứng dụng thoát
+    app.aboutToQuit.connect(shutdown_db_worker)
+    app.aboutToQuit.connect(close_all_pools)
     
     # --- Tải và áp dụng font chữ với đường dẫn ĐÚNG ---
     # Sử dụng FONT_PATH tập trung từ config
-    font_id = QFontDatabase.addApplicationFont(FONT_PATH)
+    with startup_profiler.phase("font_registration"):
+        font_id = QFontDatabase.addApplicationFont(FONT_PATH)
     
     if font_id < 0:
         # Xử lý lỗi nếu không tải được font, sử dụng font mặc định
@@ -33,15 +63,28 @@ if __name__ == "__main__":
             }}
         """)
 
-    # Tạo và hiển thị cửa sổ đăng nhập
-    window = LoginRegisterApp()
-    # Đặt icon cho ứng dụng/cửa sổ (sử dụng icon bundled nếu có)
-    try:
-        icon_path = 'src/assets/images/window_icon.png'
-        window.setWindowIcon(QIcon(icon_path))
-    except Exception:
-        pass
-    window.show()
+    if PROFILER is not None:
+        # lần mở Database() đầu tiên chạy migrate schema; đo riêng ở đây thay vì trong Managers/
+        from Managers.database_manager import Database
+        with startup_profiler.phase("db_schema"):
+            Database()
+
+    if PROFILER is not None and PROFILER.user_id is not None:
+        window = _open_profile_user_window(PROFILER.user_id)
+        PROFILER.finish_when_ready(app, wait_for=("home_first_page",))
+    else:
+        # Tạo và hiển thị cửa sổ đăng nhập
+        with startup_profiler.phase("login_window"):
+            window = LoginRegisterApp()
+            # Đặt icon cho ứng dụng/cửa sổ (sử dụng icon bundled nếu có)
+            try:
+                icon_path = 'src/assets/images/window_icon.png'
+                window.setWindowIcon(QIcon(icon_path))
+            except Exception:
+                pass
+            window.show()
+        if PROFILER is not None:
+            PROFILER.finish_when_ready(app)
     
     # Bắt đầu vòng lặp sự kiện
     sys.exit(app.exec_())
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+    Profiler thời gian khởi động của ứng dụng (main.py).
+
+    Bật bằng biến môi trường hoặc tham số dòng lệnh:
+        TODOLIST_PROFILE_STARTUP=<file.json|1>   hoặc  --profile-startup[=file.json]
+        TODOLIST_PROFILE_HEADLESS=1              hoặc  --profile-headless
+        TODOLIST_PROFILE_USER=<user_id>          hoặc  --profile-user=<user_id>
+
+    Khi bật, profiler ghi lại:
+      - thời gian từng giai đoạn (phase) và các mốc (mark) như lần tải trang chủ đầu tiên;
+      - chi phí import từng module theo kiểu `-X importtime` (self / cumulative, độ sâu);
+    rồi ghi báo cáo JSON khi khởi động xong. Chế độ headless chạy với
+    QT_QPA_PLATFORM=offscreen và tự thoát sau khi ghi báo cáo, dùng cho CI.
+    --profile-user mở thẳng MainWindow của user đó (bỏ qua form đăng nhập) để đo
+    cả phần dựng cửa sổ chính và lần tải dữ liệu đầu tiên; vì bỏ qua xác thực nên
+    chỉ có hiệu lực cùng chế độ headless, lần chạy bình thường luôn qua đăng nhập.
+
+    Chỉ main.py gọi startup_profiler.phase()/mark() (các mốc bên trong MainWindow
+    được nối qua tín hiệu); khi profiler không bật thì đó là thao tác rỗng.
+"""
+import builtins
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENV_REPORT = "TODOLIST_PROFILE_STARTUP"
+ENV_HEADLESS = "TODOLIST_PROFILE_HEADLESS"
+ENV_USER = "TODOLIST_PROFILE_USER"
+DEFAULT_REPORT = "startup_profile.json"
+# Chờ tối đa bấy nhiêu ms cho các mốc (vd. trang chủ tải xong) trước khi ghi báo cáo
+READY_TIMEOUT_MS = 15000
+READY_POLL_MS = 20
+
+_active = None
+
+
+class StartupProfiler:
+    """Thu thập phase/mark/import của một lần khởi động; xem module docstring."""
+
+    def __init__(self, report_path=DEFAULT_REPORT, headless=False, user_id=None):
+        self.report_path = report_path
+        self.headless = headless
+        self.user_id = user_id
+        self._t0 = time.perf_counter()
+        self._started_at = time.time()
+        self.phases = []
+        self.marks = {}
+        self.imports = []
+        self._original_import = None
+        self._import_state = threading.local()
+        self.timed_out = []
+        self._written = False
+
+    def _ms(self, t):
+        return round((t - self._t0) * 1000, 3)
+
+    # ----- phase / mark -----
+
+    @contextmanager
+    def phase(self, name, once=False):
+        if once and any(p['name'] == name for p in self.phases):
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append({
+                'name': name,
+                'start_ms': self._ms(start),
+                'duration_ms': round((end - start) * 1000, 3),
+                'thread': threading.current_thread().name,
+            })
+
+    def mark(self, name):
+        """Ghi mốc thời gian (chỉ lần đầu tiên của mỗi tên)."""
+        self.marks.setdefault(name, self._ms(time.perf_counter()))
+
+    # ----- import -----
+
+    def install_import_hook(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import or builtins.__import__
+        # đường nhanh: module đã nạp, không có gì mới để đo
+        if not fromlist and name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        stack = getattr(self._import_state, 'stack', None)
+        if stack is None:
+            stack = self._import_state.stack = []
+        depth = len(stack)
+        stack.append(0.0)  # tổng thời gian của các import con
+        loaded_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            # chỉ ghi lại lệnh import thực sự nạp module mới (bỏ `from x import Tên`)
+            if len(sys.modules) > loaded_before:
+                module = name if level == 0 else "." * level + name
+                new = [f for f in fromlist or () if f != '*' and f"{name}.{f}" in sys.modules]
+                if new:
+                    module = f"{module}.{','.join(new)}" if len(new) == 1 else f"{module}.{{{','.join(new)}}}"
+                self.imports.append({
+                    'module': module,
+                    'self_ms': round((elapsed - children) * 1000, 3),
+                    'cumulative_ms': round(elapsed * 1000, 3),
+                    'depth': depth,
+                    'thread': threading.current_thread().name,
+                })
+
+    # ----- báo cáo -----
+
+    def report(self):
+        top_level = [i for i in self.imports if i['depth'] == 0]
+        return {
+            'started_at': self._started_at,
+            'total_ms': self._ms(time.perf_counter()),
+            'argv': sys.argv,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'qt_platform': os.environ.get('QT_QPA_PLATFORM', ''),
+            'headless': self.headless,
+            'profile_user': self.user_id,
+            'phases': self.phases,
+            'marks': self.marks,
+            'timed_out': self.timed_out,
+            'imports_total_ms': round(sum(i['cumulative_ms'] for i in top_level), 3),
+            'imports': self.imports,
+        }
+
+    def write_report(self):
+        """Ghi báo cáo JSON (một lần) và gỡ hook import; trả về đường dẫn file."""
+        if self._written:
+            return self.report_path
+        self._written = True
+        self.remove_import_hook()
+        data = self.report()
+        try:
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            logging.info("[STARTUP PROFILE] %.1f ms, báo cáo: %s", data['total_ms'], self.report_path)
+        except OSError:
+            logging.exception("[STARTUP PROFILE] không ghi được báo cáo %s", self.report_path)
+        return self.report_path
+
+    def finish_when_ready(self, app, wait_for=(), timeout_ms=READY_TIMEOUT_MS):
+        """Khi event loop rảnh và mọi mốc trong wait_for đã có: ghi báo cáo.
+
+        Ở chế độ headless thì thoát ứng dụng luôn sau khi ghi.
+        """
+        from PyQt5.QtCore import QTimer
+
+        deadline = time.perf_counter() + timeout_ms / 1000
+
+        def check():
+            self.mark('first_idle')
+            missing = [name for name in wait_for if name not in self.marks]
+            if missing and time.perf_counter() < deadline:
+                QTimer.singleShot(READY_POLL_MS, check)
+                return
+            if missing:
+                logging.warning("[STARTUP PROFILE] hết thời gian chờ các mốc: %s", ", ".join(missing))
+                self.timed_out = missing
+            self.write_report()
+            if self.headless:
+                app.quit()
+
+        QTimer.singleShot(0, check)
+
+
+def _flag_value(argv, flag):
+    """(có flag?, giá trị sau '=' nếu có); xóa flag khỏi argv."""
+    for i, arg in enumerate(argv):
+        if arg == flag or arg.startswith(flag + "="):
+            del argv[i]
+            return True, arg.partition("=")[2] or None
+    return False, None
+
+
+def start_from_args(argv=None):
+    """Bật profiler nếu biến môi trường / tham số yêu cầu; trả về profiler hoặc None.
+
+    Cần gọi trước các import nặng (PyQt, MainMenu...) để đo được chi phí import.
+    Các tham số --profile-* được gỡ khỏi argv trước khi đưa cho QApplication.
+    """
+    global _active
+    argv = sys.argv if argv is None else argv
+    enabled, report_path = _flag_value(argv, "--profile-startup")
+    headless, _ = _flag_value(argv, "--profile-headless")
+    has_user, user_id = _flag_value(argv, "--profile-user")
+
+    env_report = os.environ.get(ENV_REPORT, "")
+    if env_report and env_report.lower() not in ("0", "false", "no"):
+        enabled = True
+        if env_report not in ("1", "true", "yes"):
+            report_path = report_path or env_report
+    headless = headless or os.environ.get(ENV_HEADLESS, "") in ("1", "true", "yes")
+    user_id = user_id or os.environ.get(ENV_USER) or None
+    if (has_user or user_id) and not headless:
+        # bỏ qua đăng nhập chỉ dành cho chạy đo headless (CI), không cho lần chạy thường
+        logging.warning("[STARTUP PROFILE] --profile-user chỉ dùng được cùng --profile-headless, bỏ qua")
+        has_user, user_id = False, None
+    if not (enabled or headless or has_user):
+        return None
+
+    if headless:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        user_id = int(user_id) if user_id else None
+    except ValueError:
+        logging.warning("[STARTUP PROFILE] user id không hợp lệ: %s", user_id)
+        user_id = None
+    _active = StartupProfiler(report_path or DEFAULT_REPORT, headless=headless, user_id=user_id)
+    _active.install_import_hook()
+    return _active
+
+
+def active():
+    return _active
+
+
+def phase(name, once=False):
+    """Context manager đo một giai đoạn; rỗng nếu profiler không bật."""
+    if _active is None or _active._written:
+        return nullcontext()
+    return _active.phase(name, once=once)
+
+
+def mark(name):
+    if _active is not None and not _active._written:
+        _active.mark(name)